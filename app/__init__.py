@@ -1,37 +1,72 @@
-import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from dotenv import load_dotenv
-
-# Загрузка переменных окружения
-load_dotenv()
+from app.config import Config
+from app.database import RoutingSession
 
 # Инициализация расширений
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
 
-def create_app():
+def create_app(config_object=Config):
     app = Flask(__name__)
 
     # Конфигурация приложения
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
+    app.config.from_object(config_object)
+
+    # Быстрая JSON-сериализация ответов
+    from app.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    # Настройки пула соединений с БД
+    from app.database import STICKY_HEADER, configure_engine_options, init_database_handlers
+    configure_engine_options(app)
 
     # Инициализация расширений с приложением
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    CORS(app)
+    # Токен read-your-writes доступен скриптам на других доменах (см. app.database)
+    CORS(app, expose_headers=[STICKY_HEADER])
+    init_database_handlers(app)
+
+    # Проверка отзыва JWT
+    from app.tokens import init_tokens
+    init_tokens(app, jwt)
+
+    # Пул хеширования паролей
+    from app.hashing import init_hashing
+    init_hashing(app)
+
+    # Инструментирование запросов (Server-Timing, медленные запросы)
+    from app.instrumentation import init_instrumentation
+    from app.metrics import init_metrics
+    init_instrumentation(app)
+    init_metrics(app, db)
+
+    # Сжатие ответов и кэш снимков досок
+    from app.compression import init_compression
+    init_compression(app)
+
+    # Журнал изменений с фоновой записью
+    from app.audit import init_audit
+    init_audit(app, db)
+
+    # Исходящие вебхуки (outbox и фоновая доставка)
+    from app.webhooks import init_webhooks
+    init_webhooks(app)
+
+    # Ограничение частоты запросов и сброс нагрузки
+    from app.ratelimit import init_rate_limiting
+    init_rate_limiting(app, db)
 
     # Регистрация маршрутов
-    from app.routes import auth_bp, users_bp, projects_bp, boards_bp, columns_bp, tasks_bp
+    from app.routes import (auth_bp, users_bp, projects_bp, boards_bp, columns_bp, tasks_bp, archive_bp, audit_bp,
+                            webhooks_bp)
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
@@ -39,18 +74,16 @@ def create_app():
     app.register_blueprint(boards_bp, url_prefix='/api/boards')
     app.register_blueprint(columns_bp, url_prefix='/api/columns')
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
+    app.register_blueprint(archive_bp, url_prefix='/api/archive')
+    app.register_blueprint(audit_bp, url_prefix='/api/audit')
+    app.register_blueprint(webhooks_bp, url_prefix='/api/webhooks')
+
+    # Команды обслуживания БД (flask init-db, flask seed-roles)
+    from app.cli import init_cli
+    init_cli(app)
 
-    # Создание таблиц в БД
-    with app.app_context():
-        db.create_all()
-        from app.models import User, Role
-
-        # Создание ролей, если их нет
-        if not Role.query.first():
-            manager_role = Role(name='manager')
-            executor_role = Role(name='executor')
-            db.session.add(manager_role)
-            db.session.add(executor_role)
-            db.session.commit()
+    # Профилирование по запросу (только при PROFILING_ENABLED)
+    from app.profiling import init_profiling
+    init_profiling(app)
 
     return app
\ No newline at end of file
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+from app import db
+from app.audit import DELETE, record_rows
+from app.models import ArchivedTask, ArchivedTimeLog, Board, Column, Task, TimeLog
+
+# Колонка завершенных задач: только из нее задачи уходят в архив
+DONE_COLUMN = 'В продакшен'
+
+ARCHIVED_TASK_COLUMNS = (
+    'id', 'code', 'title', 'description', 'priority', 'estimated_time', 'remaining_time', 'spent_time',
+    'author_id', 'assignee_id', 'project_id', 'board_id', 'column_id', 'column_name',
+    'created_at', 'updated_at', 'started_at', 'completed_at', 'archived_at'
+)
+TIME_LOG_COLUMNS = (
+    'id', 'task_id', 'user_id', 'logged_by_id', 'spent_hours', 'remaining_hours', 'comment', 'created_at'
+)
+
+
+def archivable_tasks(cutoff, limit):
+    """Id завершенных задач, закрытых раньше cutoff"""
+    return select(Task.id).join(
+        Column, Task.column_id == Column.id
+    ).where(
+        Column.name == DONE_COLUMN,
+        Task.completed_at < cutoff
+    ).order_by(Task.id).limit(limit)
+
+
+def archive_tasks(older_than_days=None, batch_size=None):
+    """Переносит завершенные задачи старше older_than_days дней и их записи времени в архив.
+
+    Каждая пачка переносится INSERT ... SELECT и удаляется в одной транзакции,
+    так что задача всегда находится ровно в одной из таблиц. Возвращает
+    число перенесенных задач и записей времени.
+    """
+    config = current_app.config
+    if older_than_days is None:
+        older_than_days = config['ARCHIVE_TASK_AGE_DAYS']
+    if batch_size is None:
+        batch_size = config['ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    tasks_archived = logs_archived = 0
+    while True:
+        task_ids = db.session.execute(archivable_tasks(cutoff, batch_size)).scalars().all()
+        if not task_ids:
+            break
+
+        db.session.execute(insert(ArchivedTask).from_select(ARCHIVED_TASK_COLUMNS, select(
+            Task.id, Task.code, Task.title, Task.description, Task.priority,
+            Task.estimated_time, Task.remaining_time, Task.spent_time, Task.author_id, Task.assignee_id,
+            Board.project_id, Column.board_id, Task.column_id, Column.name,
+            Task.created_at, Task.updated_at, Task.started_at, Task.completed_at, literal(datetime.utcnow())
+        ).join(
+            Column, Task.column_id == Column.id
+        ).join(
+            Board, Column.board_id == Board.id
+        ).where(Task.id.in_(task_ids))))
+
+        logs_archived += db.session.execute(insert(ArchivedTimeLog).from_select(TIME_LOG_COLUMNS, select(
+            TimeLog.id, TimeLog.task_id, TimeLog.user_id, TimeLog.logged_by_id, TimeLog.spent_hours,
+            TimeLog.remaining_hours, TimeLog.comment, TimeLog.created_at
+        ).where(TimeLog.task_id.in_(task_ids)))).rowcount
+
+        db.session.execute(delete(TimeLog).where(TimeLog.task_id.in_(task_ids)))
+        db.session.execute(delete(Task).where(Task.id.in_(task_ids)))
+        record_rows(db.session, Task, DELETE, [{'id': task_id, 'archived': True} for task_id in task_ids])
+        db.session.commit()
+        tasks_archived += len(task_ids)
+
+    return tasks_archived, logs_archived
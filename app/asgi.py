@@ -0,0 +1,252 @@
+import random
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_header, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import RevokedTokenError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.test import EnvironBuilder
+from app import create_app
+from app.compression import get_snapshot, put_snapshot, snapshot_response
+from app.config import Config
+from app.database import is_sticky, run_plan_async, sticky_token
+from app.instrumentation import timed
+from app.metrics import watch_pool
+from app.read_models import board_columns_plan, board_detail_plan, task_list_plan, task_plan
+from app.serializers import TASK_DETAIL_FIELDS, dumps, serialize_task
+from app.tokens import DEFER_REVOCATION_CHECK, ROLE_CLAIM, role_select
+
+# Асинхронные драйверы для синхронных URI
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite'
+}
+
+
+def to_async_uri(uri):
+    """Преобразует URI БД к асинхронному драйверу"""
+    url = make_url(uri)
+    if url.drivername not in ASYNC_DRIVERS:
+        raise ValueError(f'Асинхронный драйвер для {url.drivername} не поддерживается')
+    return url.set(drivername=ASYNC_DRIVERS[url.drivername])
+
+
+def build_environ(scope):
+    """WSGI-окружение для HTTP-запроса ASGI (тело у асинхронных эндпоинтов не читается)"""
+    client = scope.get('client')
+    return EnvironBuilder(
+        path=scope['path'],
+        method=scope['method'],
+        query_string=scope.get('query_string', b'').decode('latin-1'),
+        headers=[(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']],
+        environ_base={'REMOTE_ADDR': client[0]} if client else None
+    ).get_environ()
+
+
+class AsyncReadApp:
+    """ASGI-приложение: чтение досок, колонок и задач через асинхронный движок,
+    все остальные запросы — в синхронное Flask-приложение через WsgiToAsgi.
+
+    Асинхронный запрос обрабатывается в контексте запроса Flask: выполняются
+    те же хуки before/after/teardown_request (Server-Timing, метрики, лимиты,
+    сжатие, read-your-writes) и обработчики ошибок, что и у Flask-эндпоинтов.
+    Отличаются только обработчики: они выполняют те же планы чтения
+    (app.read_models) через асинхронное соединение.
+
+    Хуки Flask синхронные и могут блокировать (лимиты и сброс нагрузки,
+    перестроение фильтра отозванных токенов, профилирование), поэтому они
+    выполняются вне цикла событий — в потоке sync_to_async(thread_sensitive=True),
+    все хуки запроса в одном потоке. Функции teardown вызываются там же до
+    снятия контекста и повторно (вхолостую) при ctx.pop: они должны быть
+    идемпотентны, как все teardown-хуки приложения (состояние снимается через g.pop).
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        config = flask_app.config
+        engine_options = {}
+        if not make_url(config['SQLALCHEMY_DATABASE_URI']).drivername.startswith('sqlite'):
+            engine_options = {
+                'pool_size': config['DB_POOL_SIZE'],
+                'max_overflow': config['DB_MAX_OVERFLOW'],
+                'pool_timeout': config['DB_POOL_TIMEOUT'],
+                'pool_recycle': config['DB_POOL_RECYCLE'],
+                'pool_pre_ping': config['DB_POOL_PRE_PING']
+            }
+        self.primary = create_async_engine(to_async_uri(config['SQLALCHEMY_DATABASE_URI']), **engine_options)
+        # Пары (ключ bind реплики во Flask-приложении, асинхронный движок)
+        self.replicas = [(key, create_async_engine(to_async_uri(uri), **engine_options))
+                         for key, uri in zip(config['REPLICA_BIND_KEYS'], config['DATABASE_REPLICA_URIS'])]
+        self.statement_timeout = config['STATEMENT_TIMEOUT_MS']
+        self.snapshots = flask_app.extensions.get('board_snapshots')
+
+        # Сброс нагрузки (app.ratelimit) учитывает и пулы асинхронных движков
+        flask_app.extensions['async_engines'] = [self.primary, *(engine for _, engine in self.replicas)]
+        if config['METRICS_ENABLED']:
+            for engine in flask_app.extensions['async_engines']:
+                watch_pool(engine.sync_engine)
+
+        # Эндпоинты, обслуживаемые асинхронно (имена эндпоинтов Flask)
+        self.handlers = {
+            'boards.get_board': self.get_board,
+            'columns.get_board_columns': self.get_board_columns,
+            'tasks.get_tasks': self.get_tasks,
+            'tasks.get_task': self.get_task
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http':
+            adapter = self.flask_app.url_map.bind('localhost')
+            try:
+                endpoint, _ = adapter.match(scope['path'], method=scope['method'])
+            except (NotFound, MethodNotAllowed):
+                endpoint = None
+
+            # Составные документы (include=) собирает Flask-приложение
+            if endpoint in self.handlers and b'include=' not in scope.get('query_string', b''):
+                return await self.dispatch(scope, send)
+
+        return await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.primary.dispose()
+                for _, replica in self.replicas:
+                    await replica.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, scope, send):
+        """Обработка запроса по схеме Flask.full_dispatch_request с асинхронным обработчиком"""
+        app = self.flask_app
+        environ = build_environ(scope)
+        ctx = app.request_context(environ)
+        error = None
+        ctx.push()
+        try:
+            try:
+                # Отзыв токена проверяется через асинхронное соединение (см. authorize)
+                setattr(g, DEFER_REVOCATION_CHECK, True)
+                response = await sync_to_async(app.preprocess_request)()
+                if response is None:
+                    response = await self.handle(request.endpoint, request.view_args)
+            except Exception as e:
+                response = await sync_to_async(app.handle_user_exception)(e)
+            response = await sync_to_async(app.finalize_request)(response)
+        except Exception as e:
+            error = e
+            response = await sync_to_async(app.handle_exception)(e)
+        finally:
+            # Сессия БД и состояние хуков освобождаются в том же потоке, где были получены;
+            # ctx.pop в цикле событий только снимает контекст
+            await sync_to_async(self.teardown)(error)
+            ctx.pop(error)
+
+        # Заголовки и тело — как при отдаче через WSGI (например, без тела у 304)
+        headers = response.get_wsgi_headers(environ)
+        try:
+            body = b''.join(response.get_app_iter(environ))
+        finally:
+            response.close()
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def teardown(self, error):
+        """Функции teardown_request и teardown_appcontext (сессия БД) текущего запроса"""
+        self.flask_app.do_teardown_request(error)
+        self.flask_app.do_teardown_appcontext(error)
+
+    async def handle(self, endpoint, view_args):
+        """Аутентификация как в @auth_required и вызов асинхронного обработчика"""
+        # Разбор токена — как в @auth_required, до получения соединения
+        with timed('auth'):
+            verify_jwt_in_request()
+
+        # Выбор источника чтения — как в @read_replica (ключи реплик совпадают с binds Flask)
+        engine = self.primary
+        if self.replicas:
+            if is_sticky(self.flask_app, get_jwt_identity(), sticky_token(request)):
+                g.read_your_writes = True
+            else:
+                g.replica_bind_key, engine = random.choice(self.replicas)
+
+        async with engine.connect() as conn:
+            if conn.dialect.name == 'postgresql' and self.statement_timeout:
+                await conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(self.statement_timeout)}')
+            with timed('auth'):
+                role = await self.authorize(conn)
+            if role is None:
+                return jsonify({'message': 'Требуется аутентификация'}), 401
+            return await self.handlers[endpoint](conn, **view_args)
+
+    async def authorize(self, conn):
+        """Проверка отзыва токена и роль пользователя (как current_role)"""
+        claims = get_jwt()
+        revocations = self.flask_app.extensions['revocation_list']
+        if await run_plan_async(revocations.check_plan(claims), conn.execute):
+            raise RevokedTokenError(get_jwt_header(), claims)
+
+        if ROLE_CLAIM in claims:
+            return claims[ROLE_CLAIM]
+        return (await conn.execute(role_select(get_jwt_identity()))).scalar()
+
+    async def get_board(self, conn, board_id):
+        """Получение конкретной доски по ID"""
+        board_data = await run_plan_async(board_detail_plan(board_id), conn.execute)
+
+        if board_data is None:
+            return jsonify({'message': 'Доска не найдена'}), 404
+
+        return jsonify(board_data), 200
+
+    async def get_board_columns(self, conn, board_id):
+        """Получение колонок доски (снимки доски общие с Flask-приложением)"""
+        entry = get_snapshot(self.snapshots, board_id)
+        if entry is not None:
+            return snapshot_response(self.flask_app, entry)
+
+        columns_list = await run_plan_async(board_columns_plan(board_id), conn.execute)
+
+        if columns_list is None:
+            return jsonify({'message': 'Доска не найдена'}), 404
+
+        if self.snapshots is None:
+            return jsonify({'columns': columns_list}), 200
+        return snapshot_response(self.flask_app,
+                                 put_snapshot(self.snapshots, board_id, dumps({'columns': columns_list}) + b'\n'))
+
+    async def get_tasks(self, conn):
+        """Получение списка задач с фильтрацией"""
+        tasks = await run_plan_async(task_list_plan(request.args, get_jwt_identity()), conn.execute)
+
+        return jsonify({'tasks': tasks}), 200
+
+    async def get_task(self, conn, task_id):
+        """Получение задачи по ID"""
+        row = await run_plan_async(task_plan(task_id), conn.execute)
+
+        if not row:
+            return jsonify({'message': 'Задача не найдена'}), 404
+
+        return jsonify(serialize_task(row, TASK_DETAIL_FIELDS)), 200
+
+
+def create_asgi_app(config_object=Config):
+    """Создает ASGI-приложение для асинхронного режима (uvicorn asgi:app)"""
+    return AsyncReadApp(create_app(config_object))
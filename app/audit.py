@@ -0,0 +1,260 @@
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from flask import current_app, has_app_context, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, inspect, insert, select
+from app.database import RoutingSession, _is_memory_sqlite
+from app.metrics import AUDIT_EVENTS
+from app.models import AuditLog, Board, Column, Project, Task
+from app.serializers import dumps
+
+logger = logging.getLogger('app.audit')
+
+# Изменения этих моделей попадают в журнал
+AUDITED_MODELS = (Project, Board, Column, Task)
+
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+def _actor():
+    """Пользователь и эндпоинт текущего запроса (вне запроса — None)"""
+    if not has_request_context():
+        return None, None
+    try:
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    return (int(identity) if identity is not None else None), request.endpoint
+
+
+def _values(state):
+    # Только загруженные значения: чтение истекших полей удаленного объекта дало бы лишний SELECT
+    return {prop.key: state.dict[prop.key] for prop in state.mapper.column_attrs if prop.key in state.dict}
+
+
+def _changes(state):
+    """Измененные поля в виде {поле: [было, стало]}"""
+    changes = {}
+    for prop in state.mapper.column_attrs:
+        history = state.attrs[prop.key].history
+        if history.added or history.deleted:
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old != new:
+                changes[prop.key] = [old, new]
+    return changes
+
+
+def _collect(session):
+    """События журнала по объектам, записанным текущим flush"""
+    events = []
+    user_id, endpoint = None, None
+    now = datetime.utcnow()
+
+    for action, objects in ((CREATE, session.new), (UPDATE, session.dirty), (DELETE, session.deleted)):
+        for obj in objects:
+            if not isinstance(obj, AUDITED_MODELS):
+                continue
+            state = inspect(obj)
+            if action == UPDATE:
+                changes = _changes(state)
+                if not changes:
+                    continue
+            else:
+                changes = _values(state)
+
+            if not events:
+                user_id, endpoint = _actor()
+            events.append({
+                'user_id': user_id,
+                'action': action,
+                'entity': obj.__tablename__,
+                'entity_id': state.identity[0] if state.identity else state.dict.get('id'),
+                'changes': changes,
+                'endpoint': endpoint,
+                'created_at': now
+            })
+    return events
+
+
+def _row(audit_event):
+    changes = audit_event['changes']
+    return {**audit_event, 'changes': dumps(changes).decode() if changes else None}
+
+
+class AuditBuffer:
+    """Кольцевой буфер событий журнала с фоновой записью пачками.
+
+    При переполнении вытесняются самые старые события. Поток записи
+    создается лениво в каждом процессе (потоки не переживают fork).
+    """
+
+    def __init__(self, engine, size, batch_size, interval):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.interval = interval
+        self._events = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, events):
+        with self._lock:
+            dropped = len(self._events) + len(events) - self._events.maxlen
+            self._events.extend(events)
+            pending = len(self._events)
+        if dropped > 0:
+            AUDIT_EVENTS.labels('dropped').inc(dropped)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _take(self):
+        with self._lock:
+            return [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+
+    def _requeue(self, batch):
+        with self._lock:
+            free = self._events.maxlen - len(self._events)
+            # Не вытесняем более новые события: то, что не помещается, теряется
+            kept = batch[:free]
+            self._events.extendleft(reversed(kept))
+        if len(batch) > len(kept):
+            AUDIT_EVENTS.labels('dropped').inc(len(batch) - len(kept))
+
+    def flush(self):
+        """Записывает все накопленные события; возвращает число записанных"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                try:
+                    with self.engine.begin() as connection:
+                        connection.execute(insert(AuditLog), [_row(audit_event) for audit_event in batch])
+                except Exception:
+                    logger.exception('Не удалось записать %d событий журнала изменений', len(batch))
+                    AUDIT_EVENTS.labels('failed').inc(len(batch))
+                    # Повторим при следующем сбросе
+                    self._requeue(batch)
+                    break
+                AUDIT_EVENTS.labels('flushed').inc(len(batch))
+                written += len(batch)
+        return written
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name='audit-flusher', daemon=True).start()
+            self._pid = os.getpid()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def _current_audit():
+    return current_app.extensions.get('audit') if has_app_context() else None
+
+
+def _store(session, audit, events):
+    if audit == 'sync':
+        # В той же транзакции, что и изменение
+        session.connection().execute(insert(AuditLog), [_row(audit_event) for audit_event in events])
+    else:
+        session.info.setdefault('audit_pending', []).extend(events)
+
+
+def _after_flush(session, flush_context):
+    audit = _current_audit()
+    if audit is None:
+        return
+    events = _collect(session)
+    if events:
+        _store(session, audit, events)
+
+
+def record_rows(session, model, action, rows):
+    """События журнала для строк, записанных запросами Core (INSERT ... SELECT,
+    массовые вставки и DELETE): after_flush видит только объекты ORM.
+
+    rows — словари значений строк с ключом id; попадают в журнал вместе с
+    транзакцией session, как и изменения объектов ORM.
+    """
+    audit = _current_audit()
+    if audit is None or not rows:
+        return
+    user_id, endpoint = _actor()
+    now = datetime.utcnow()
+    _store(session, audit, [{
+        'user_id': user_id,
+        'action': action,
+        'entity': model.__tablename__,
+        'entity_id': row['id'],
+        'changes': row,
+        'endpoint': endpoint,
+        'created_at': now
+    } for row in rows])
+
+
+def record_inserted(session, model, *conditions):
+    """События создания строк model, отобранных conditions, со всеми их значениями"""
+    if _current_audit() is None:
+        return
+    rows = session.execute(select(model.__table__).where(*conditions).order_by(model.id)).mappings()
+    record_rows(session, model, CREATE, [dict(row) for row in rows])
+
+
+def _after_commit(session):
+    events = session.info.pop('audit_pending', None)
+    if events:
+        audit = _current_audit()
+        if isinstance(audit, AuditBuffer):
+            audit.add(events)
+
+
+def _after_rollback(session):
+    # Откаченные изменения в журнал не попадают
+    session.info.pop('audit_pending', None)
+
+
+def init_audit(app, db):
+    """Подключает журнал изменений проектов, досок, колонок и задач"""
+    config = app.config
+    if not config['AUDIT_ENABLED']:
+        return
+
+    mode = config['AUDIT_MODE']
+    # Единственное соединение SQLite в памяти нельзя делить с фоновым потоком
+    if _is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        mode = 'sync'
+
+    if mode == 'sync':
+        app.extensions['audit'] = 'sync'
+    else:
+        with app.app_context():
+            engine = db.engine
+        app.extensions['audit'] = AuditBuffer(engine, config['AUDIT_BUFFER_SIZE'], config['AUDIT_BATCH_SIZE'],
+                                              config['AUDIT_FLUSH_INTERVAL'])
+
+    if not event.contains(RoutingSession, 'after_flush', _after_flush):
+        event.listen(RoutingSession, 'after_flush', _after_flush)
+        event.listen(RoutingSession, 'after_commit', _after_commit)
+        event.listen(RoutingSession, 'after_rollback', _after_rollback)
@@ -0,0 +1,84 @@
+import click
+from app import db
+
+DEFAULT_ROLES = ('manager', 'executor')
+
+
+def seed_roles():
+    """Создает стандартные роли, если их нет"""
+    from app.models import Role
+
+    existing = {role.name for role in Role.query.all()}
+    for name in DEFAULT_ROLES:
+        if name not in existing:
+            db.session.add(Role(name=name))
+    db.session.commit()
+
+
+def init_db_schema():
+    """Создает таблицы и роли без миграций (локальная разработка, бенчмарки)"""
+    # Только в основной БД: реплики получают схему репликацией
+    db.create_all(bind_key=None)
+    seed_roles()
+
+
+def init_cli(app):
+    """Регистрирует команды flask для обслуживания БД"""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Создание таблиц и ролей без миграций (для разработки)."""
+        init_db_schema()
+        click.echo('Таблицы и роли созданы')
+
+    @app.cli.command('seed-roles')
+    def seed_roles_command():
+        """Создание стандартных ролей."""
+        seed_roles()
+        click.echo('Роли созданы')
+
+    @app.cli.command('purge-revoked-tokens')
+    def purge_revoked_tokens_command():
+        """Удаление истекших записей из списка отзыва токенов."""
+        from app.tokens import purge_expired
+
+        click.echo(f'Удалено записей: {purge_expired()}')
+
+    @app.cli.command('archive-tasks')
+    @click.option('--older-than-days', type=int, default=None,
+                  help='Возраст завершенных задач в днях (по умолчанию ARCHIVE_TASK_AGE_DAYS).')
+    @click.option('--batch-size', type=int, default=None, help='Задач в одной транзакции.')
+    def archive_tasks_command(older_than_days, batch_size):
+        """Перенос старых завершенных задач и их записей времени в архив."""
+        from app.archive import archive_tasks
+
+        tasks, time_logs = archive_tasks(older_than_days, batch_size)
+        click.echo(f'В архив перенесено задач: {tasks}, записей времени: {time_logs}')
+
+    @app.cli.command('purge-idempotency-keys')
+    def purge_idempotency_keys_command():
+        """Удаление ключей идемпотентности с истекшим сроком хранения."""
+        from app.idempotency import purge_expired
+
+        click.echo(f'Удалено ключей: {purge_expired()}')
+
+    @app.cli.command('dispatch-webhooks')
+    @click.option('--once', is_flag=True, help='Одна итерация доставки вместо постоянной работы.')
+    def dispatch_webhooks_command(once):
+        """Доставка событий вебхуков из outbox (отдельным процессом)."""
+        from app.webhooks import WebhookDispatcher
+
+        dispatcher = WebhookDispatcher(app)
+        if once:
+            click.echo(f'Доставлено событий: {dispatcher.run_once()}')
+        else:
+            dispatcher.run()
+
+    @app.cli.command('purge-webhook-events')
+    @click.option('--older-than-days', type=int, default=None,
+                  help='Возраст доставленных событий в днях (по умолчанию WEBHOOK_RETENTION_DAYS).')
+    def purge_webhook_events_command(older_than_days):
+        """Удаление доставленных событий вебхуков."""
+        from app.webhooks import purge_delivered
+
+        click.echo(f'Удалено событий: {purge_delivered(older_than_days)}')
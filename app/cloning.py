@@ -0,0 +1,86 @@
+from datetime import datetime
+from sqlalchemy import String, case, cast, func, insert, literal, select
+from app import db
+from app.audit import record_inserted
+from app.models import Board, Column, Project, Task
+
+# Колонка, задачи из которой копируются при tasks=backlog
+BACKLOG_COLUMN = 'Беклог'
+
+# Какие задачи копировать
+CLONE_TASKS = ('none', 'backlog', 'all')
+
+
+def _insert_copies(model, rows):
+    """Вставляет копии строк rows и возвращает соответствие старых id новым.
+
+    Новые id берутся из RETURNING в порядке переданных строк, а не из порядка
+    строк INSERT ... SELECT, который СУБД не гарантирует.
+    """
+    if not rows:
+        return {}
+    old_ids = [row.pop('id') for row in rows]
+    new_ids = db.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars()
+    return dict(zip(old_ids, new_ids))
+
+
+def _task_code(project_code, number):
+    """Код задачи как в generate_task_code: PROJECT_CODE-001"""
+    padding = case((number < 10, literal('00')), (number < 100, literal('0')), else_=literal(''))
+    return literal(f'{project_code}-') + padding + cast(number, String)
+
+
+def clone_project(source, name, code, description=None, tasks='none', author_id=None):
+    """Копирует проект с досками, колонками и (по выбору) задачами в одной транзакции.
+
+    Доски и колонки копируются пачкой с RETURNING (новые id сопоставляются
+    со старыми по порядку переданных строк), задачи — запросом INSERT ... SELECT,
+    коды задач нумеруются заново с 001. Скопированные задачи начинаются заново: без
+    записей времени, оставшееся время равно оценке, автор — author_id.
+    Возвращает новый проект и число скопированных досок, колонок и задач.
+    """
+    now = datetime.utcnow()
+    project = Project(name=name, code=code, description=description or '', created_at=now)
+    db.session.add(project)
+    db.session.flush()
+
+    # Досок и колонок в проекте немного: они копируются пачкой с RETURNING,
+    # задачи — одним INSERT ... SELECT с заменой колонки по соответствию id
+    board_map = _insert_copies(Board, [
+        {'id': board_id, 'name': board_name, 'project_id': project.id, 'created_at': now}
+        for board_id, board_name in db.session.execute(
+            select(Board.id, Board.name).where(Board.project_id == source.id).order_by(Board.id)
+        )
+    ])
+    column_map = _insert_copies(Column, [
+        {'id': column_id, 'name': column_name, 'order': order, 'board_id': board_map[board_id], 'created_at': now}
+        for column_id, column_name, order, board_id in db.session.execute(
+            select(Column.id, Column.name, Column.order, Column.board_id)
+            .where(Column.board_id.in_(board_map)).order_by(Column.id)
+        )
+    ])
+
+    copied_tasks = 0
+    if tasks != 'none' and column_map:
+        number = func.row_number().over(order_by=Task.id)
+        query = select(
+            _task_code(project.code, number), Task.title, Task.description, Task.priority,
+            Task.estimated_time, func.coalesce(Task.estimated_time, 0), literal(0.0),
+            literal(author_id) if author_id is not None else Task.author_id, Task.assignee_id,
+            case(column_map, value=Task.column_id), literal(now), literal(now)
+        ).where(Task.column_id.in_(column_map)).order_by(Task.id)
+        if tasks == 'backlog':
+            query = query.join(Column, Task.column_id == Column.id).where(Column.name == BACKLOG_COLUMN)
+
+        copied_tasks = db.session.execute(insert(Task).from_select((
+            'code', 'title', 'description', 'priority', 'estimated_time', 'remaining_time', 'spent_time',
+            'author_id', 'assignee_id', 'column_id', 'created_at', 'updated_at'
+        ), query)).rowcount
+
+    # Копии записаны запросами Core, мимо after_flush журнала изменений
+    record_inserted(db.session, Board, Board.project_id == project.id)
+    record_inserted(db.session, Column, Column.board_id.in_(board_map.values()))
+    record_inserted(db.session, Task, Task.column_id.in_(column_map.values()))
+
+    db.session.commit()
+    return project, len(board_map), len(column_map), copied_tasks
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import threading
+import time
+from flask import g, request
+from werkzeug.http import parse_accept_header
+from app.metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен — только gzip
+    brotli = None
+
+# Сжимаются только текстовые ответы
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """Лучшее из поддерживаемых сжатий по заголовку Accept-Encoding (или None)"""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(available_encodings())
+
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def encode_body(body, accept_encoding, config, variants=None):
+    """Сжимает тело ответа, если клиент это поддерживает и тело не меньше порога.
+
+    variants — словарь уже сжатых вариантов (например, из кэша снимков досок):
+    найденный вариант используется повторно, новый — сохраняется в него.
+    Возвращает (тело, Content-Encoding или None).
+    """
+    if len(body) < config['COMPRESSION_MIN_SIZE']:
+        return body, None
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return body, None
+
+    if variants is not None and encoding in variants:
+        return variants[encoding], encoding
+    data = compress(body, encoding, config)
+    if variants is not None:
+        variants[encoding] = data
+    return data, encoding
+
+
+class Snapshot:
+    """Закодированный в JSON ответ вместе с ETag и сжатыми вариантами"""
+    __slots__ = ('body', 'etag', 'variants', 'expires')
+
+    def __init__(self, body, expires):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.variants = {}
+        self.expires = expires
+
+
+class SnapshotCache:
+    """Кэш готовых ответов в памяти процесса с коротким временем жизни.
+
+    Записи любого пользователя в этом процессе очищают кэш; другие процессы
+    увидят изменения не позже чем через ttl секунд.
+    """
+
+    def __init__(self, name, ttl, max_entries=1000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        hit = entry is not None and entry.expires > time.monotonic()
+        record_cache(self.name, hit)
+        return entry if hit else None
+
+    def put(self, key, body):
+        entry = Snapshot(body, time.monotonic() + self.ttl)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {name: value for name, value in self._entries.items() if value.expires > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _snapshot_key(key):
+    # Снимки реплик хранятся отдельно от снимков основной БД: снимок с отстающей
+    # реплики не должен попасть к тем, кто читает из основной БД
+    return g.get('replica_bind_key'), key
+
+
+def get_snapshot(snapshots, key):
+    """Снимок для текущего запроса (источник чтения задает @read_replica).
+
+    В окне read-your-writes кэш не читается: снимок основной БД в другом
+    процессе мог быть построен до записи пользователя.
+    """
+    if snapshots is None or g.get('read_your_writes'):
+        return None
+    return snapshots.get(_snapshot_key(key))
+
+
+def put_snapshot(snapshots, key, body):
+    """Сохраняет снимок, построенный из источника чтения текущего запроса"""
+    return snapshots.put(_snapshot_key(key), body)
+
+
+def snapshot_response(app, entry):
+    """Ответ из снимка: 304 при совпадении ETag, иначе тело (сжимается в after_request)"""
+    response = app.response_class(entry.body, mimetype='application/json')
+    # Слабый ETag: один и тот же для сжатого и несжатого представления
+    response.set_etag(entry.etag, weak=True)
+    response.compressed_variants = entry.variants
+    return response.make_conditional(request)
+
+
+def init_compression(app):
+    """Подключает сжатие ответов и кэш снимков досок"""
+    config = app.config
+
+    if config['BOARD_SNAPSHOT_TTL_SECONDS'] > 0:
+        snapshots = SnapshotCache('board_snapshot', config['BOARD_SNAPSHOT_TTL_SECONDS'])
+        app.extensions['board_snapshots'] = snapshots
+
+        @app.after_request
+        def invalidate_snapshots(response):
+            # Запись в этом процессе делает снимки устаревшими
+            if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+                snapshots.clear()
+            return response
+
+    if not config['COMPRESSION_ENABLED']:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+                or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        body = response.get_data()
+        if len(body) < config['COMPRESSION_MIN_SIZE']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data, encoding = encode_body(body, request.headers.get('Accept-Encoding'), config,
+                                     getattr(response, 'compressed_variants', None))
+        if encoding is not None:
+            response.set_data(data)
+            response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,153 @@
+import os
+from datetime import timedelta
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения
+load_dotenv()
+
+
+def env_bool(name, default=False):
+    """Читает булево значение из переменной окружения"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    """Читает целое число из переменной окружения"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name, default):
+    """Читает число с плавающей точкой из переменной окружения"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class Config:
+    """Конфигурация приложения из переменных окружения"""
+
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = os.getenv('SECRET_KEY')
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
+
+    # Короткоживущие access-токены и refresh-токены для их обновления
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=env_int('JWT_ACCESS_TOKEN_MINUTES', 15))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=env_int('JWT_REFRESH_TOKEN_DAYS', 30))
+    # Список отзыва токенов: фильтр Блума в памяти, перестраиваемый из БД.
+    # Отзыв в другом процессе вступает в силу не позже чем через REFRESH_SECONDS
+    JWT_REVOCATION_REFRESH_SECONDS = env_float('JWT_REVOCATION_REFRESH_SECONDS', 30)
+    JWT_REVOCATION_FILTER_CAPACITY = env_int('JWT_REVOCATION_FILTER_CAPACITY', 100000)
+    JWT_REVOCATION_FILTER_ERROR_RATE = env_float('JWT_REVOCATION_FILTER_ERROR_RATE', 0.01)
+
+    # Пул соединений с БД
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_float('DB_POOL_TIMEOUT', 5)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', True)
+    # Значение заголовка Retry-After при перегрузке БД (секунды)
+    DB_RETRY_AFTER = env_int('DB_RETRY_AFTER', 2)
+
+    # Реплики для чтения (через запятую) и окно чтения из основной БД после записи
+    DATABASE_REPLICA_URIS = [uri.strip() for uri in os.getenv('DATABASE_REPLICA_URIS', '').split(',') if uri.strip()]
+    REPLICA_STICKY_SECONDS = env_float('REPLICA_STICKY_SECONDS', 5)
+
+    # Таймауты запросов (PostgreSQL): короткий для OLTP, длинный для отчетов
+    STATEMENT_TIMEOUT_MS = env_int('STATEMENT_TIMEOUT_MS', 5000)
+    REPORT_STATEMENT_TIMEOUT_MS = env_int('REPORT_STATEMENT_TIMEOUT_MS', 60000)
+
+    # Инструментирование запросов (Server-Timing и логирование медленных запросов)
+    INSTRUMENTATION_ENABLED = env_bool('INSTRUMENTATION_ENABLED', True)
+    SERVER_TIMING_HEADER = env_bool('SERVER_TIMING_HEADER', True)
+    SLOW_REQUEST_THRESHOLD_MS = env_float('SLOW_REQUEST_THRESHOLD_MS', 500)
+    SLOW_REQUEST_MAX_STATEMENTS = env_int('SLOW_REQUEST_MAX_STATEMENTS', 50)
+
+    # Метрики Prometheus на /metrics
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', True)
+
+    # Профилирование работающих воркеров (по умолчанию выключено)
+    PROFILING_ENABLED = env_bool('PROFILING_ENABLED', False)
+    PROFILING_SAMPLE_INTERVAL = env_float('PROFILING_SAMPLE_INTERVAL', 0.005)
+    PROFILING_MAX_SECONDS = env_float('PROFILING_MAX_SECONDS', 60)
+
+    # Хеширование паролей: параметры хеша и ограниченный пул потоков.
+    # При смене метода хеши пересчитываются при следующем входе пользователя
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_HASH_SALT_LENGTH = env_int('PASSWORD_HASH_SALT_LENGTH', 16)
+    PASSWORD_HASH_WORKERS = env_int('PASSWORD_HASH_WORKERS', 2)
+    PASSWORD_HASH_MAX_QUEUE = env_int('PASSWORD_HASH_MAX_QUEUE', 32)
+    PASSWORD_HASH_QUEUE_TIMEOUT = env_float('PASSWORD_HASH_QUEUE_TIMEOUT', 2)
+    PASSWORD_HASH_RETRY_AFTER = env_int('PASSWORD_HASH_RETRY_AFTER', 1)
+
+    # Архивация: завершенные задачи старше ARCHIVE_TASK_AGE_DAYS дней переносятся
+    # в архивные таблицы вместе с записями времени (flask archive-tasks)
+    ARCHIVE_TASK_AGE_DAYS = env_int('ARCHIVE_TASK_AGE_DAYS', 90)
+    ARCHIVE_BATCH_SIZE = env_int('ARCHIVE_BATCH_SIZE', 1000)
+
+    # Ключи идемпотентности: сколько хранится ответ, сколько повтор ждет
+    # выполняющийся запрос с тем же ключом и когда такой запрос считается брошенным
+    IDEMPOTENCY_TTL_SECONDS = env_int('IDEMPOTENCY_TTL_SECONDS', 86400)
+    IDEMPOTENCY_WAIT_SECONDS = env_float('IDEMPOTENCY_WAIT_SECONDS', 10)
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = env_float('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', 60)
+
+    # Ограничение частоты запросов по пользователю (token bucket): пополнение в секунду
+    # и емкость корзины для дешевых и дорогих эндпоинтов. Без RATE_LIMIT_STORAGE_URI
+    # корзины хранятся в памяти процесса, с redis://... — общие для всех воркеров
+    RATE_LIMIT_ENABLED = env_bool('RATE_LIMIT_ENABLED', True)
+    RATE_LIMIT_STORAGE_URI = os.getenv('RATE_LIMIT_STORAGE_URI')
+    RATE_LIMIT_CHEAP_RATE = env_float('RATE_LIMIT_CHEAP_RATE', 20)
+    RATE_LIMIT_CHEAP_BURST = env_int('RATE_LIMIT_CHEAP_BURST', 60)
+    RATE_LIMIT_EXPENSIVE_RATE = env_float('RATE_LIMIT_EXPENSIVE_RATE', 1)
+    RATE_LIMIT_EXPENSIVE_BURST = env_int('RATE_LIMIT_EXPENSIVE_BURST', 5)
+    # Одновременных отчетов на процесс
+    REPORT_MAX_CONCURRENCY = env_int('REPORT_MAX_CONCURRENCY', 2)
+    # Сброс нагрузки по занятости пула соединений: сначала дорогие запросы, затем дешевое чтение
+    LOAD_SHED_EXPENSIVE_AT = env_float('LOAD_SHED_EXPENSIVE_AT', 0.7)
+    LOAD_SHED_CHEAP_AT = env_float('LOAD_SHED_CHEAP_AT', 0.9)
+
+    # Сжатие ответов (gzip, br при установленном brotli) не меньше COMPRESSION_MIN_SIZE байт
+    COMPRESSION_ENABLED = env_bool('COMPRESSION_ENABLED', True)
+    COMPRESSION_MIN_SIZE = env_int('COMPRESSION_MIN_SIZE', 1024)
+    COMPRESSION_GZIP_LEVEL = env_int('COMPRESSION_GZIP_LEVEL', 6)
+    COMPRESSION_BROTLI_QUALITY = env_int('COMPRESSION_BROTLI_QUALITY', 5)
+    # Кэш снимков досок (колонки с задачами) вместе со сжатыми вариантами; 0 — выключен
+    BOARD_SNAPSHOT_TTL_SECONDS = env_float('BOARD_SNAPSHOT_TTL_SECONDS', 2)
+
+    # Журнал изменений. AUDIT_MODE=async — события копятся в буфере в памяти
+    # и пишутся пачками по AUDIT_BATCH_SIZE раз в AUDIT_FLUSH_INTERVAL секунд:
+    # при падении процесса теряется не больше содержимого буфера, при переполнении
+    # буфера теряются самые старые события. AUDIT_MODE=sync — запись в той же
+    # транзакции, что и изменение (без потерь, но с лишним INSERT в запросе)
+    AUDIT_ENABLED = env_bool('AUDIT_ENABLED', True)
+    AUDIT_MODE = os.getenv('AUDIT_MODE', 'async')
+    AUDIT_BUFFER_SIZE = env_int('AUDIT_BUFFER_SIZE', 10000)
+    AUDIT_BATCH_SIZE = env_int('AUDIT_BATCH_SIZE', 500)
+    AUDIT_FLUSH_INTERVAL = env_float('AUDIT_FLUSH_INTERVAL', 1)
+
+    # Исходящие вебхуки. События пишутся в outbox в транзакции запроса, а доставляет
+    # их диспетчер: отдельный процесс flask dispatch-webhooks или, при
+    # WEBHOOK_DISPATCHER_ENABLED, фоновый поток в каждом воркере gunicorn (запускается
+    # в post_worker_init). WEBHOOK_WORKERS потоков на процесс, не больше одной пачки
+    # из WEBHOOK_BATCH_SIZE событий одновременно на каждый адрес
+    WEBHOOKS_ENABLED = env_bool('WEBHOOKS_ENABLED', True)
+    WEBHOOK_DISPATCHER_ENABLED = env_bool('WEBHOOK_DISPATCHER_ENABLED', False)
+    WEBHOOK_WORKERS = env_int('WEBHOOK_WORKERS', 4)
+    WEBHOOK_BATCH_SIZE = env_int('WEBHOOK_BATCH_SIZE', 50)
+    WEBHOOK_CLAIM_SIZE = env_int('WEBHOOK_CLAIM_SIZE', 500)
+    WEBHOOK_POLL_INTERVAL = env_float('WEBHOOK_POLL_INTERVAL', 1)
+    WEBHOOK_TIMEOUT = env_float('WEBHOOK_TIMEOUT', 5)
+    # Повторы с экспоненциальной задержкой: BASE * 2^(попытка-1), но не больше MAX секунд
+    WEBHOOK_MAX_ATTEMPTS = env_int('WEBHOOK_MAX_ATTEMPTS', 8)
+    WEBHOOK_BACKOFF_BASE = env_float('WEBHOOK_BACKOFF_BASE', 2)
+    WEBHOOK_BACKOFF_MAX = env_float('WEBHOOK_BACKOFF_MAX', 600)
+    # Сколько кэшируются подписки и сколько дней хранятся доставленные события
+    WEBHOOK_SUBSCRIPTION_TTL = env_float('WEBHOOK_SUBSCRIPTION_TTL', 5)
+    WEBHOOK_RETENTION_DAYS = env_int('WEBHOOK_RETENTION_DAYS', 7)
+
+    # Выгрузка проекта: строк в одной пачке чтения и кадре архива, уровень сжатия gzip
+    EXPORT_BATCH_SIZE = env_int('EXPORT_BATCH_SIZE', 5000)
+    EXPORT_COMPRESSION_LEVEL = env_int('EXPORT_COMPRESSION_LEVEL', 6)
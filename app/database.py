@@ -0,0 +1,232 @@
+import math
+import random
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+# Код ошибки PostgreSQL при отмене запроса по statement_timeout
+QUERY_CANCELED = '57014'
+
+
+def _is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:')
+
+
+def run_plan(plan, execute=None):
+    """Выполняет план чтения — генератор, который отдает запросы и получает их
+    результаты (см. app.read_models); по умолчанию запросы идут через db.session"""
+    if execute is None:
+        from app import db
+
+        execute = db.session.execute
+    try:
+        statement = next(plan)
+        while True:
+            statement = plan.send(execute(statement))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_plan_async(plan, execute):
+    """Выполняет план чтения на асинхронном соединении (execute — AsyncConnection.execute)"""
+    try:
+        statement = next(plan)
+        while True:
+            statement = plan.send(await execute(statement))
+    except StopIteration as stop:
+        return stop.value
+
+
+def _pool_options(app, uri):
+    """Настройки пула соединений для движка с указанным URI"""
+    # Для SQLite в памяти используется StaticPool без настроек очереди
+    if not uri or _is_memory_sqlite(uri):
+        return {}
+
+    options = {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': app.config['DB_POOL_PRE_PING']
+    }
+
+    if app.config['METRICS_ENABLED']:
+        from app.metrics import InstrumentedQueuePool
+        options['poolclass'] = InstrumentedQueuePool
+
+    return options
+
+
+def configure_engine_options(app):
+    """Собирает опции движков основной БД и реплик; вызывается до db.init_app"""
+    options = _pool_options(app, app.config.get('SQLALCHEMY_DATABASE_URI'))
+
+    # Явно заданные опции имеют приоритет
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    # Реплики для чтения подключаются как отдельные binds
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    replica_keys = []
+    for index, uri in enumerate(app.config['DATABASE_REPLICA_URIS']):
+        key = f'replica_{index}'
+        binds[key] = {'url': uri, **_pool_options(app, uri)}
+        replica_keys.append(key)
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.config['REPLICA_BIND_KEYS'] = replica_keys
+
+
+class RoutingSession(FlaskSession):
+    """Сессия, направляющая чтение в реплику, если запрос помечен @read_replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            replica = g.get('replica_bind_key') if current_app else None
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        # Внутри @idempotent коммит view откладывается: ответ сохраняется в той же транзакции
+        if self.info.get('defer_commit'):
+            self.flush()
+            return
+        super().commit()
+
+
+# Cookie с подписанным id пользователя, недавно выполнившего запись: пока она
+# действует, его чтения идут в основную БД во всех воркерах и в ASGI-режиме.
+# Тот же токен отдается в заголовке ответа: клиенты без cookie (SPA на другом
+# домене) возвращают его в одноименном заголовке запроса
+STICKY_COOKIE = 'read_your_writes'
+STICKY_HEADER = 'X-Read-Your-Writes'
+
+
+def _sticky_serializer(app):
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'] or app.config['JWT_SECRET_KEY'], salt='read-your-writes')
+
+
+def sticky_token(req):
+    """Токен read-your-writes запроса: из заголовка или из cookie"""
+    return req.headers.get(STICKY_HEADER) or req.cookies.get(STICKY_COOKIE)
+
+
+def is_sticky(app, identity, token):
+    """Пользователь недавно выполнил запись: его чтения нужно направить в основную БД"""
+    if not token or identity is None:
+        return False
+    try:
+        writer = _sticky_serializer(app).loads(token, max_age=app.config['REPLICA_STICKY_SECONDS'])
+    except BadSignature:
+        return False
+    return writer == str(identity)
+
+
+def _remember_writer(response):
+    """После успешной записи направляет чтения пользователя в основную БД на короткое окно"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+        return response
+
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        return response
+    if identity is None:
+        return response
+
+    app = current_app._get_current_object()
+    token = _sticky_serializer(app).dumps(str(identity))
+    response.set_cookie(STICKY_COOKIE, token, max_age=math.ceil(app.config['REPLICA_STICKY_SECONDS']),
+                        httponly=True, samesite='Lax')
+    response.headers[STICKY_HEADER] = token
+    return response
+
+
+def read_replica(fn):
+    """Декоратор: выполняет чтение эндпоинта на реплике (ставится после @auth_required)"""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        replicas = current_app.config['REPLICA_BIND_KEYS']
+        if replicas:
+            if is_sticky(current_app, get_jwt_identity(), sticky_token(request)):
+                g.read_your_writes = True
+            else:
+                g.replica_bind_key = random.choice(replicas)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _current_statement_timeout():
+    timeout = g.get('statement_timeout_ms')
+    if timeout is None:
+        timeout = current_app.config['STATEMENT_TIMEOUT_MS']
+    return timeout
+
+
+def _set_statement_timeout(connection, timeout):
+    if connection.dialect.name == 'postgresql' and timeout:
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+
+def _after_begin(session, transaction, connection):
+    """Устанавливает statement_timeout в начале каждой транзакции"""
+    if current_app:
+        _set_statement_timeout(connection, _current_statement_timeout())
+
+
+def statement_timeout(config_key):
+    """Декоратор: устанавливает для эндпоинта таймаут запросов из настройки config_key"""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            from app import db
+
+            g.statement_timeout_ms = current_app.config[config_key]
+
+            # Транзакция могла начаться раньше (например, при проверке пользователя)
+            session = db.session()
+            if session.in_transaction():
+                _set_statement_timeout(session.connection(), g.statement_timeout_ms)
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _service_unavailable(message):
+    response = jsonify({'message': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(current_app.config['DB_RETRY_AFTER'])
+    return response
+
+
+def init_database_handlers(app):
+    """Подключает таймауты запросов и обработку перегрузки БД"""
+    if not event.contains(Session, 'after_begin', _after_begin):
+        event.listen(Session, 'after_begin', _after_begin)
+
+    if app.config['DATABASE_REPLICA_URIS']:
+        app.after_request(_remember_writer)
+
+    @app.errorhandler(PoolTimeoutError)
+    def handle_pool_timeout(error):
+        return _service_unavailable('Сервис перегружен, повторите запрос позже')
+
+    @app.errorhandler(OperationalError)
+    def handle_operational_error(error):
+        if getattr(error.orig, 'pgcode', None) == QUERY_CANCELED:
+            return _service_unavailable('Запрос выполнялся слишком долго, повторите позже')
+        raise error
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context, jsonify
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+from app.metrics import PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_REJECTED
+
+
+class HashingUnavailable(Exception):
+    """Пул хеширования паролей перегружен"""
+
+
+def _normalize_method(method):
+    """Метод в том виде, в каком werkzeug записывает его в хеш (pbkdf2 — с числом итераций)"""
+    if method.startswith('pbkdf2:'):
+        args = method[7:].split(':')
+        iterations = int(args[1] or 0) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{args[0]}:{iterations}'
+    return method
+
+
+class PasswordHasher:
+    """Хеширование паролей в отдельном ограниченном пуле потоков.
+
+    Одновременно выполняется не больше workers хеширований, в очереди
+    ждет не больше max_queue; остальные запросы сразу отклоняются.
+    Задачи, прождавшие в очереди дольше queue_timeout, не выполняются.
+    """
+
+    def __init__(self, method, salt_length, workers, max_queue, queue_timeout):
+        self.method = method
+        self.stored_method = _normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Потоки не переживают fork, поэтому пул создается в каждом воркере заново
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='password-hasher')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.labels('queue_full').inc()
+            raise HashingUnavailable()
+
+        submitted = time.perf_counter()
+
+        def job():
+            waited = time.perf_counter() - submitted
+            PASSWORD_HASH_QUEUE_WAIT.observe(waited)
+            if waited > self.queue_timeout:
+                PASSWORD_HASH_REJECTED.labels('timeout').inc()
+                raise HashingUnavailable()
+            return fn(*args)
+
+        try:
+            return self._get_executor().submit(job).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Хеш создан с параметрами, отличающимися от текущих настроек
+        (метод, число итераций или длина соли)"""
+        parts = password_hash.split('$')
+        if len(parts) != 3:
+            return True
+        method, salt, _ = parts
+        if method != self.stored_method:
+            return True
+        return method != 'plain' and len(salt) != self.salt_length
+
+
+def _hasher():
+    if has_app_context():
+        return current_app.extensions.get('password_hasher')
+    return None
+
+
+def hash_password(password):
+    """Хеширует пароль (в пуле хеширования, если он подключен)"""
+    hasher = _hasher()
+    if hasher is None:
+        return generate_password_hash(password)
+    return hasher.hash(password)
+
+
+def verify_password(password_hash, password):
+    """Проверяет пароль (в пуле хеширования, если он подключен)"""
+    hasher = _hasher()
+    if hasher is None:
+        return check_password_hash(password_hash, password)
+    return hasher.verify(password_hash, password)
+
+
+def password_needs_rehash(password_hash):
+    """Нужно ли пересчитать хеш под текущие параметры"""
+    hasher = _hasher()
+    return hasher is not None and hasher.needs_rehash(password_hash)
+
+
+def init_hashing(app):
+    """Подключает пул хеширования паролей"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        salt_length=app.config['PASSWORD_HASH_SALT_LENGTH'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_queue=app.config['PASSWORD_HASH_MAX_QUEUE'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+    )
+
+    @app.errorhandler(HashingUnavailable)
+    def handle_hashing_unavailable(error):
+        response = jsonify({'message': 'Сервис перегружен, повторите запрос позже'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(app.config['PASSWORD_HASH_RETRY_AFTER'])
+        return response
@@ -0,0 +1,166 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 128
+# Как часто повтор проверяет, завершился ли исходный запрос
+POLL_INTERVAL = 0.05
+
+
+def _request_hash():
+    """Отпечаток запроса: повтор с тем же ключом должен совпадать с исходным"""
+    digest = hashlib.sha256()
+    digest.update(f'{request.method} {request.path}\n'.encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _claim(user_id, key, request_hash):
+    """Занимает ключ под выполняющийся запрос; None, если ключ уже занят"""
+    now = datetime.utcnow()
+    record = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config['IDEMPOTENCY_TTL_SECONDS'])
+    )
+    db.session.add(record)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return record.id
+
+
+def _find(user_id, key):
+    record = db.session.execute(select(
+        IdempotencyKey.id, IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body,
+        IdempotencyKey.content_type, IdempotencyKey.created_at, IdempotencyKey.expires_at
+    ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)).first()
+    # Завершаем транзакцию, чтобы следующая проверка увидела свежие данные
+    db.session.rollback()
+    return record
+
+
+def _release(record_id, *conditions):
+    """Освобождает ключ: запрос можно будет выполнить заново"""
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id, *conditions))
+    db.session.commit()
+
+
+def _replay(record):
+    response = make_response(record.response_body, record.status_code)
+    response.content_type = record.content_type
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Поддержка заголовка Idempotency-Key для операций записи (после @auth_required).
+
+    Первый запрос с ключом выполняется и его ответ сохраняется; повторы
+    получают сохраненный ответ без повторного выполнения. Повтор, пришедший,
+    пока первый запрос еще выполняется, ждет его завершения. Ответы 5xx и
+    исключения не сохраняются — такой запрос можно повторить.
+
+    Коммит view откладывается до сохранения ответа, поэтому изменения и
+    ответ фиксируются одной транзакцией: запрос, ключ которого перехватил
+    повтор после IDEMPOTENCY_LOCK_TIMEOUT_SECONDS, откатывается и получает 409.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'message': f'Заголовок {HEADER} должен содержать от 1 до {MAX_KEY_LENGTH} символов'}), 400
+
+        config = current_app.config
+        user_id = int(get_jwt_identity())
+        request_hash = _request_hash()
+        deadline = time.monotonic() + config['IDEMPOTENCY_WAIT_SECONDS']
+
+        while True:
+            record_id = _claim(user_id, key, request_hash)
+            if record_id is not None:
+                break
+
+            record = _find(user_id, key)
+            if record is None:
+                # Запись успели удалить — пробуем занять ключ снова
+                continue
+
+            now = datetime.utcnow()
+            if record.status_code is not None and record.expires_at <= now:
+                # Сохраненный ответ устарел
+                _release(record.id, IdempotencyKey.expires_at <= now)
+                continue
+            if record.request_hash != request_hash:
+                return jsonify({'message': 'Ключ идемпотентности уже использован для другого запроса'}), 422
+            if record.status_code is not None:
+                return _replay(record)
+            if record.created_at <= now - timedelta(seconds=config['IDEMPOTENCY_LOCK_TIMEOUT_SECONDS']):
+                # Исходный запрос брошен (например, воркер упал). Его изменения не
+                # зафиксированы: они коммитятся только вместе с ответом. Если ответ
+                # успели сохранить, условие не выполнится и повтор получит его
+                _release(record.id, IdempotencyKey.status_code.is_(None))
+                continue
+
+            if time.monotonic() >= deadline:
+                response = jsonify({'message': 'Запрос с этим ключом идемпотентности еще выполняется'})
+                response.status_code = 409
+                response.headers['Retry-After'] = '1'
+                return response
+            time.sleep(POLL_INTERVAL)
+
+        session = db.session()
+        session.info['defer_commit'] = True
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            session.info.pop('defer_commit', None)
+            db.session.rollback()
+            _release(record_id, IdempotencyKey.status_code.is_(None))
+            raise
+        session.info.pop('defer_commit', None)
+
+        if response.status_code >= 500:
+            db.session.rollback()
+            _release(record_id, IdempotencyKey.status_code.is_(None))
+            return response
+
+        stored = db.session.execute(update(IdempotencyKey).where(
+            IdempotencyKey.id == record_id, IdempotencyKey.status_code.is_(None)
+        ).values(
+            status_code=response.status_code,
+            response_body=response.get_data(),
+            content_type=response.content_type
+        )).rowcount
+        if not stored:
+            # Ключ освобожден по таймауту и мог быть занят повтором — изменения не фиксируем
+            db.session.rollback()
+            response = jsonify({'message': 'Запрос с этим ключом идемпотентности выполнялся слишком долго, '
+                                           'повторите его'})
+            response.status_code = 409
+            return response
+        db.session.commit()
+        return response
+
+    return wrapper
+
+
+def purge_expired():
+    """Удаляет ключи идемпотентности с истекшим сроком хранения"""
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return deleted
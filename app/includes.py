@@ -0,0 +1,87 @@
+from app import db
+from app.models import Board, Column, Task, TimeLog, User
+from app.read_models import board_select, fetch_boards, fetch_time_logs, fetch_users, time_log_select, user_select
+from app.serializers import COMPOUND_TASK_FIELDS, column_select, serialize_columns, serialize_tasks, task_select
+
+# Составные документы: параметр include= на чтении досок и задач, например
+# include=columns.tasks,users,time_logs:recent. Связанные данные попадают в раздел
+# included, каждый вид — одним запросом; пользователи перечисляются один раз и
+# упоминаются в задачах и записях времени только по id.
+
+BOARD_INCLUDES = ('columns', 'columns.tasks', 'users', 'time_logs')
+TASK_INCLUDES = ('board', 'columns', 'columns.tasks', 'users', 'time_logs')
+
+# Сколько последних записей времени отдавать (time_logs, time_logs:recent или time_logs:N)
+DEFAULT_TIME_LOGS = 20
+MAX_TIME_LOGS = 100
+
+
+def parse_include(value, allowed):
+    """Разбирает include= в словарь {имя: параметр}; неизвестные значения — ValueError"""
+    includes = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, _, option = item.partition(':')
+        if name not in allowed:
+            raise ValueError(f'Неизвестное значение include: {name}. Допустимые значения: {", ".join(allowed)}')
+        if name == 'time_logs':
+            option = _time_log_limit(option)
+        includes[name] = option
+
+    # Задачи колонок подразумевают и сами колонки
+    if 'columns.tasks' in includes:
+        includes.setdefault('columns', '')
+    return includes
+
+
+def _time_log_limit(option):
+    if option in ('', 'recent'):
+        return DEFAULT_TIME_LOGS
+    try:
+        return min(max(int(option), 1), MAX_TIME_LOGS)
+    except ValueError:
+        raise ValueError('Параметр time_logs должен быть recent или числом')
+
+
+def build_included(includes, board_id, task=None):
+    """Раздел included для доски или задачи (task — строка task_select).
+
+    Число запросов не зависит от объема данных: по одному на каждый вид.
+    В users попадают пользователи, упомянутые в документе.
+    """
+    included = {}
+    user_ids = set()
+    if task is not None:
+        user_ids.update((task.author_id, task.assignee_id))
+
+    if 'board' in includes:
+        included['boards'] = [board._asdict() for board in fetch_boards(board_select().where(Board.id == board_id))]
+
+    if 'columns' in includes:
+        columns = db.session.execute(column_select().where(Column.board_id == board_id).order_by(Column.order)).all()
+        included['columns'] = serialize_columns(columns)
+
+    if 'columns.tasks' in includes:
+        tasks = db.session.execute(task_select().where(Column.board_id == board_id).order_by(Task.id)).all()
+        included['tasks'] = serialize_tasks(tasks, COMPOUND_TASK_FIELDS)
+        for row in tasks:
+            user_ids.update((row.author_id, row.assignee_id))
+
+    if 'time_logs' in includes:
+        query = time_log_select().order_by(TimeLog.created_at.desc(), TimeLog.id.desc()).limit(includes['time_logs'])
+        if task is not None:
+            query = query.where(TimeLog.task_id == task.id)
+        else:
+            query = query.join(Task, TimeLog.task_id == Task.id).join(
+                Column, Task.column_id == Column.id
+            ).where(Column.board_id == board_id)
+        time_logs = fetch_time_logs(query)
+        included['time_logs'] = [log._asdict() for log in time_logs]
+        for log in time_logs:
+            user_ids.update((log.user_id, log.logged_by_id))
+
+    if 'users' in includes:
+        user_ids.discard(None)
+        users = fetch_users(user_select().where(User.id.in_(user_ids)).order_by(User.id)) if user_ids else []
+        included['users'] = [user._asdict() for user in users]
+
+    return included
@@ -0,0 +1,149 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.serializers import FastJSONProvider
+
+logger = logging.getLogger('app.timing')
+
+
+class RequestTimings:
+    """Счетчики времени одного HTTP-запроса"""
+
+    __slots__ = ('started', 'query_count', 'db_time', 'statements', 'spans', 'max_statements')
+
+    def __init__(self, max_statements):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements = []
+        self.spans = {}
+        self.max_statements = max_statements
+
+    def add_span(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+
+def current_timings():
+    """Возвращает счетчики текущего запроса или None вне запроса"""
+    if not has_request_context():
+        return None
+    return g.get('_timings')
+
+
+@contextmanager
+def timed(name):
+    """Замеряет время блока и добавляет его к счетчикам текущего запроса"""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_span(name, time.perf_counter() - start)
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON-провайдер, замеряющий время сериализации ответов jsonify"""
+
+    def response(self, *args, **kwargs):
+        with timed('serialize'):
+            return super().response(*args, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_timings() is not None:
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    timings = current_timings()
+    if timings is None:
+        return
+
+    timings.query_count += 1
+    timings.db_time += duration
+    if len(timings.statements) < timings.max_statements:
+        timings.statements.append((statement, duration))
+
+
+def _handle_error(context):
+    # after_cursor_execute при ошибке не вызывается: снимаем время начала здесь,
+    # иначе стек растет на соединении из пула и искажает следующие замеры
+    starts = context.connection.info.get('_query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _start_timings():
+    g._timings = RequestTimings(current_app.config['SLOW_REQUEST_MAX_STATEMENTS'])
+
+
+def _finish_timings(response):
+    timings = g.pop('_timings', None)
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings.started
+    auth = timings.spans.get('auth', 0.0)
+    serialize = timings.spans.get('serialize', 0.0)
+    handler = max(0.0, total - auth - serialize)
+
+    if current_app.config['SERVER_TIMING_HEADER']:
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_time * 1000:.2f};desc="{timings.query_count} queries"',
+            f'auth;dur={auth * 1000:.2f}',
+            f'handler;dur={handler * 1000:.2f}',
+            f'serialize;dur={serialize * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}'
+        ])
+
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'total_ms': round(total * 1000, 2),
+        'db_ms': round(timings.db_time * 1000, 2),
+        'queries': timings.query_count,
+        'auth_ms': round(auth * 1000, 2),
+        'handler_ms': round(handler * 1000, 2),
+        'serialize_ms': round(serialize * 1000, 2)
+    }
+
+    if total * 1000 >= current_app.config['SLOW_REQUEST_THRESHOLD_MS']:
+        record['statements'] = [
+            {'sql': statement, 'ms': round(duration * 1000, 2)}
+            for statement, duration in timings.statements
+        ]
+        logger.warning(json.dumps({'event': 'slow_request', **record}, ensure_ascii=False))
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({'event': 'request', **record}, ensure_ascii=False))
+
+    return response
+
+
+def init_instrumentation(app):
+    """Подключает инструментирование SQL, аутентификации и сериализации к приложению"""
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+
+    app.json = TimedJSONProvider(app)
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    app.before_request(_start_timings)
+    app.after_request(_finish_timings)
@@ -0,0 +1,167 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Метрики HTTP-запросов
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запроса',
+    ['blueprint', 'endpoint', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Количество запросов в обработке',
+    multiprocess_mode='livesum'
+)
+
+# Метрики пула соединений с БД
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out_connections',
+    'Количество выданных из пула соединений',
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow_connections',
+    'Количество соединений сверх pool_size',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Время ожидания соединения из пула',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+# Пул хеширования паролей
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    'password_hash_queue_wait_seconds',
+    'Время ожидания задачи в очереди хеширования паролей',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+)
+PASSWORD_HASH_REJECTED = Counter(
+    'password_hash_rejected_total',
+    'Отклоненные из-за перегрузки операции хеширования',
+    ['reason']
+)
+
+# Ограничение частоты запросов и сброс нагрузки
+REQUESTS_REJECTED = Counter(
+    'http_requests_rejected_total',
+    'Запросы, отклоненные ограничителем частоты или при перегрузке',
+    ['request_class', 'reason']
+)
+
+# Журнал изменений: записано, потеряно при переполнении буфера, ошибки записи
+AUDIT_EVENTS = Counter('audit_events_total', 'События журнала изменений', ['result'])
+
+# Доставка вебхуков: доставлено, отложено для повтора, отброшено после всех попыток
+WEBHOOK_EVENTS = Counter('webhook_events_total', 'События исходящих вебхуков', ['result'])
+
+# Бизнес-метрики
+TASKS_CREATED = Counter('tasks_created_total', 'Количество созданных задач')
+TIME_LOGS_CREATED = Counter('time_logs_created_total', 'Количество записей логирования времени')
+
+# Попадания в кэши
+CACHE_REQUESTS = Counter('cache_requests_total', 'Обращения к кэшам', ['cache', 'result'])
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool, замеряющий время ожидания свободного соединения"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def record_cache(cache, hit):
+    """Учитывает попадание или промах кэша"""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def watch_pool(engine):
+    """Отслеживает выдачу и возврат соединений пула движка"""
+
+    def update_overflow():
+        if isinstance(engine.pool, QueuePool):
+            DB_POOL_OVERFLOW.set(max(0, engine.pool.overflow()))
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+        update_overflow()
+
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+        update_overflow()
+
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+
+
+def _on_task_insert(mapper, connection, target):
+    TASKS_CREATED.inc()
+
+
+def _on_time_log_insert(mapper, connection, target):
+    TIME_LOGS_CREATED.inc()
+
+
+def _start_request():
+    g._metrics_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def _observe_request(response):
+    start = g.get('_metrics_start')
+    if start is not None:
+        REQUEST_LATENCY.labels(
+            request.blueprint or '',
+            request.endpoint or 'unmatched',
+            request.method,
+            response.status_code
+        ).observe(time.perf_counter() - start)
+    return response
+
+
+def _finish_request(exc):
+    if g.pop('_metrics_start', None) is not None:
+        REQUESTS_IN_FLIGHT.dec()
+
+
+def metrics_view():
+    """Экспозиция метрик в формате Prometheus"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Агрегация по всем воркерам gunicorn
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app, db):
+    """Подключает сбор метрик и эндпоинт /metrics"""
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    from app.models import Task, TimeLog
+
+    with app.app_context():
+        for engine in db.engines.values():
+            watch_pool(engine)
+
+    if not event.contains(Task, 'after_insert', _on_task_insert):
+        event.listen(Task, 'after_insert', _on_task_insert)
+        event.listen(TimeLog, 'after_insert', _on_time_log_insert)
+
+    app.before_request(_start_request)
+    app.after_request(_observe_request)
+    app.teardown_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,6 +1,5 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db
+from app import db, hashing
 
 
 class Role(db.Model):
@@ -23,8 +22,18 @@ class User(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False)
+    # Версия токенов: увеличение отзывает все ранее выданные токены пользователя
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Индексы для поиска по префиксу имени и почты без учета регистра
+    __table_args__ = (
+        db.Index('ix_users_username_lower', db.func.lower(username).label('username_lower'),
+                 postgresql_ops={'username_lower': 'varchar_pattern_ops'}),
+        db.Index('ix_users_email_lower', db.func.lower(email).label('email_lower'),
+                 postgresql_ops={'email_lower': 'varchar_pattern_ops'}),
+    )
+
     # Отношения
     created_tasks = db.relationship('Task', foreign_keys='Task.author_id', backref='author', lazy='dynamic')
     assigned_tasks = db.relationship('Task', foreign_keys='Task.assignee_id', backref='assignee', lazy='dynamic')
@@ -37,10 +46,10 @@ class User(db.Model):
 
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hashing.hash_password(password)
 
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return hashing.verify_password(self.password_hash, password)
 
     def is_manager(self):
         return self.role.name == 'manager'
@@ -73,7 +82,7 @@ class Board(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Отношения
@@ -112,7 +121,7 @@ class Column(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     order = db.Column(db.Integer, nullable=False)
-    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False)
+    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Отношения
@@ -149,6 +158,13 @@ class Task(db.Model):
     started_at = db.Column(db.DateTime, nullable=True)
     completed_at = db.Column(db.DateTime, nullable=True)
 
+    # Индексы: загрузка по исполнителю и сводка нагрузки (на PostgreSQL — index-only scan)
+    __table_args__ = (
+        db.Index('ix_tasks_assignee_id', 'assignee_id'),
+        db.Index('ix_tasks_workload', 'column_id', 'assignee_id',
+                 postgresql_include=['remaining_time', 'estimated_time', 'spent_time']),
+    )
+
     # Отношения
     time_logs = db.relationship('TimeLog', backref='task', lazy='dynamic', cascade='all, delete-orphan')
 
@@ -176,5 +192,165 @@ class TimeLog(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Индексы для выдачи по курсору (created_at, id): история задачи и лента пользователя
+    __table_args__ = (
+        db.Index('ix_time_logs_task_created', 'task_id', 'created_at', 'id'),
+        db.Index('ix_time_logs_user_created', 'user_id', 'created_at', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<TimeLog {self.id}: {self.spent_hours}h on Task {self.task_id}>'
+
+
+class ArchivedTask(db.Model):
+    """Архив завершенных задач (холодные данные, см. app.archive).
+
+    Id и код сохраняются; доска, проект и колонка записаны без внешних ключей,
+    чтобы архив не зависел от удаления живых сущностей.
+    """
+    __tablename__ = 'archived_tasks'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    code = db.Column(db.String(20), nullable=False, index=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    priority = db.Column(db.String(20))
+
+    estimated_time = db.Column(db.Float)
+    remaining_time = db.Column(db.Float)
+    spent_time = db.Column(db.Float)
+
+    author_id = db.Column(db.Integer, nullable=False)
+    assignee_id = db.Column(db.Integer, nullable=True, index=True)
+
+    project_id = db.Column(db.Integer, nullable=False, index=True)
+    board_id = db.Column(db.Integer, nullable=False, index=True)
+    column_id = db.Column(db.Integer, nullable=False)
+    column_name = db.Column(db.String(100))
+
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ArchivedTask {self.code}: {self.title}>'
+
+
+class ArchivedTimeLog(db.Model):
+    """Архив записей времени по задачам из archived_tasks"""
+    __tablename__ = 'archived_time_logs'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('archived_tasks.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    logged_by_id = db.Column(db.Integer, nullable=False)
+
+    spent_hours = db.Column(db.Float, nullable=False)
+    remaining_hours = db.Column(db.Float)
+    comment = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, index=True)
+
+    def __repr__(self):
+        return f'<ArchivedTimeLog {self.id}: {self.spent_hours}h on Task {self.task_id}>'
+
+
+class RevokedToken(db.Model):
+    """Отозванные токены: jti токена или версия токенов пользователя"""
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # После этого момента запись не нужна
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.key}>'
+
+
+class IdempotencyKey(db.Model):
+    """Ключи идемпотентности (заголовок Idempotency-Key) с сохраненным ответом.
+
+    Пока status_code пуст, запрос с этим ключом еще выполняется.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(128), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # Метод, путь и тело запроса
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.LargeBinary, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.user_id}:{self.key}>'
+
+
+class AuditLog(db.Model):
+    """Журнал изменений проектов, досок, колонок и задач.
+
+    Записи пишутся пачками из фонового потока (app.audit), поэтому без
+    внешних ключей: журнал переживает удаление объектов и пользователей.
+    """
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        db.Index('ix_audit_log_entity', 'entity', 'entity_id', 'id'),
+        db.Index('ix_audit_log_user', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(10), nullable=False)  # create, update, delete
+    entity = db.Column(db.String(50), nullable=False)  # Имя таблицы
+    entity_id = db.Column(db.Integer, nullable=True)
+    changes = db.Column(db.Text, nullable=True)  # JSON: значения полей или пары [было, стало]
+    endpoint = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AuditLog {self.action} {self.entity}:{self.entity_id}>'
+
+
+class Webhook(db.Model):
+    """Исходящий вебхук: подписка внешней системы на события задач"""
+    __tablename__ = 'webhooks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), nullable=False)
+    secret = db.Column(db.String(128), nullable=True)  # Ключ подписи HMAC-SHA256 тела запроса
+    events = db.Column(db.String(200), nullable=False)  # Типы событий через запятую
+    project_id = db.Column(db.Integer, nullable=True, index=True)  # Пусто — события всех проектов
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Webhook {self.url}>'
+
+
+class WebhookEvent(db.Model):
+    """Outbox событий для вебхуков: пишется в одной транзакции с изменением
+    и доставляется фоновым диспетчером (app.webhooks)"""
+    __tablename__ = 'webhook_outbox'
+    __table_args__ = (db.Index('ix_webhook_outbox_due', 'status', 'next_attempt_at', 'id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    webhook_id = db.Column(db.Integer, db.ForeignKey('webhooks.id', ondelete='CASCADE'), nullable=False, index=True)
+    event = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(10), nullable=False, default='pending')  # pending, delivered, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    lease_until = db.Column(db.DateTime, nullable=True)  # событие взято диспетчером до этого момента
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+
     def __repr__(self):
-        return f'<TimeLog {self.id}: {self.spent_hours}h on Task {self.task_id}>'
\ No newline at end of file
+        return f'<WebhookEvent {self.event} {self.status}>'
@@ -0,0 +1,190 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from flask import Response, current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _collapse(frame):
+    """Преобразует стек кадра в строку формата collapsed stacks (от корня к листу)"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик на основе sys._current_frames()
+
+    Раз в interval секунд снимает стеки потоков процесса и считает,
+    сколько раз встретился каждый стек. Результат выдается в формате
+    collapsed stacks, который принимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if self.thread_id is not None and thread_id != self.thread_id:
+                continue
+            self.samples[_collapse(frame)] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_for(self, seconds):
+        """Профилирует процесс в течение заданного времени"""
+        self.start()
+        time.sleep(seconds)
+        self.stop()
+        return self
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.samples.most_common())
+
+
+# Одновременно в воркере может работать только один профилировщик
+profiler_lock = threading.Lock()
+
+# Базовый снимок tracemalloc для сравнения
+_tracemalloc_baseline = None
+
+
+def tracemalloc_start(frames=10):
+    """Включает tracemalloc и запоминает базовый снимок"""
+    global _tracemalloc_baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _tracemalloc_baseline = tracemalloc.take_snapshot()
+
+
+def tracemalloc_stop():
+    global _tracemalloc_baseline
+    _tracemalloc_baseline = None
+    tracemalloc.stop()
+
+
+def tracemalloc_diff(limit=25):
+    """Возвращает рост памяти относительно предыдущего снимка и обновляет базовый снимок"""
+    global _tracemalloc_baseline
+    if not tracemalloc.is_tracing() or _tracemalloc_baseline is None:
+        return None
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__)
+    ])
+    stats = snapshot.compare_to(_tracemalloc_baseline, 'lineno')
+    _tracemalloc_baseline = snapshot
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        'traced_current_bytes': current,
+        'traced_peak_bytes': peak,
+        'top': [{
+            'location': str(stat.traceback[0]),
+            'size_diff_bytes': stat.size_diff,
+            'size_bytes': stat.size,
+            'count_diff': stat.count_diff
+        } for stat in stats[:limit]]
+    }
+
+
+def _is_manager_request():
+    """Проверяет, что запрос выполняет менеджер"""
+    from app.utils import current_role
+
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    return get_jwt_identity() is not None and current_role() == 'manager'
+
+
+def _start_request_profile():
+    if request.args.get('profile') != '1' or not _is_manager_request():
+        return
+
+    if request.args.get('profile_format') == 'collapsed':
+        if not profiler_lock.acquire(blocking=False):
+            return
+        interval = current_app.config['PROFILING_SAMPLE_INTERVAL']
+        g._request_profiler = SamplingProfiler(interval, thread_id=threading.get_ident())
+        g._request_profiler.start()
+    else:
+        g._request_profiler = cProfile.Profile()
+        g._request_profiler.enable()
+
+
+def _finish_request_profile(response):
+    profiler = g.get('_request_profiler')
+    if profiler is None:
+        return response
+
+    if isinstance(profiler, SamplingProfiler):
+        # Блокировка освобождается в teardown_request
+        profiler.stop()
+        return Response(profiler.collapsed(), mimetype='text/plain')
+
+    profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(50)
+    return Response(output.getvalue(), mimetype='text/plain')
+
+
+def _teardown_request_profile(error=None):
+    """Останавливает профилировщик и освобождает блокировку, даже если view выбросил исключение"""
+    profiler = g.pop('_request_profiler', None)
+    if profiler is None:
+        return
+
+    if isinstance(profiler, SamplingProfiler):
+        profiler.stop()
+        profiler_lock.release()
+    else:
+        profiler.disable()
+
+
+def init_profiling(app):
+    """Подключает профилирование; при выключенной настройке ничего не регистрирует"""
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    from app.routes.debug import debug_bp
+
+    app.register_blueprint(debug_bp, url_prefix='/api/debug')
+    app.before_request(_start_request_profile)
+    app.after_request(_finish_request_profile)
+    app.teardown_request(_teardown_request_profile)
@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from typing import NamedTuple
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy.pool import QueuePool
+from app.metrics import REQUESTS_REJECTED
+
+# Классы запросов: cheap — обычные чтения и записи, expensive — тяжелые выборки,
+# report — отчеты (корзина expensive и общий лимит одновременных запросов)
+CHEAP = 'cheap'
+EXPENSIVE = 'expensive'
+REPORT = 'report'
+
+# Token bucket в Redis: пополнение и списание атомарно на стороне сервера
+REDIS_TOKEN_BUCKET = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or ARGV[3])
+tokens = math.min(tonumber(ARGV[2]), tokens + (tonumber(ARGV[3]) - updated) * tonumber(ARGV[1]))
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2]) / tonumber(ARGV[1])) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def request_class(name):
+    """Декоратор: относит эндпоинт к классу запросов (по умолчанию cheap)"""
+
+    def decorator(fn):
+        fn.request_class = name
+        return fn
+
+    return decorator
+
+
+class MemoryBuckets:
+    """Корзины в памяти процесса"""
+
+    def __init__(self, max_keys=100000, idle_seconds=60):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Списывает токен; возвращает (разрешено, секунд до следующего токена)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                # Давно не используемые корзины уже полны и ничего не ограничивают
+                self._buckets = {name: value for name, value in self._buckets.items()
+                                 if now - value[1] < self.idle_seconds}
+            self._buckets[key] = (tokens, now)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+class RedisBuckets:
+    """Корзины в Redis, общие для всех процессов (нужен пакет redis)"""
+
+    def __init__(self, uri):
+        import redis
+
+        self.client = redis.Redis.from_url(uri)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+
+    def take(self, key, rate, burst):
+        allowed, tokens = self.script(keys=[f'ratelimit:{key}'], args=[rate, burst, time.time()])
+        return bool(allowed), 0 if allowed else (1 - float(tokens)) / rate
+
+
+def _pool_utilization(engines, capacity):
+    """Наибольшая доля занятых соединений среди пулов движков"""
+    utilization = 0
+    for engine in engines:
+        # У асинхронного движка пул принадлежит синхронному движку внутри него
+        pool = getattr(engine, 'sync_engine', engine).pool
+        if isinstance(pool, QueuePool) and capacity:
+            utilization = max(utilization, pool.checkedout() / capacity)
+    return utilization
+
+
+class Rejection(NamedTuple):
+    """Отказ в обработке запроса"""
+    status: int
+    message: str
+    retry_after: float
+
+    @property
+    def retry_after_header(self):
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """Ограничение частоты запросов, лимит одновременных отчетов и сброс нагрузки.
+
+    Общий для Flask-приложения и асинхронного режима (app.asgi): решение
+    принимается по классу эндпоинта, методу, пользователю и загрузке пулов.
+    """
+
+    def __init__(self, config):
+        uri = config['RATE_LIMIT_STORAGE_URI']
+        self.buckets = RedisBuckets(uri) if uri else MemoryBuckets()
+        self.budgets = {
+            CHEAP: (config['RATE_LIMIT_CHEAP_RATE'], config['RATE_LIMIT_CHEAP_BURST']),
+            EXPENSIVE: (config['RATE_LIMIT_EXPENSIVE_RATE'], config['RATE_LIMIT_EXPENSIVE_BURST'])
+        }
+        self.reports = threading.BoundedSemaphore(config['REPORT_MAX_CONCURRENCY'])
+        self.pool_capacity = config['DB_POOL_SIZE'] + config['DB_MAX_OVERFLOW']
+        self.shed_cheap_at = config['LOAD_SHED_CHEAP_AT']
+        self.shed_expensive_at = config['LOAD_SHED_EXPENSIVE_AT']
+        self.retry_after = config['DB_RETRY_AFTER']
+
+    def _reject(self, name, reason, status, message, retry_after):
+        REQUESTS_REJECTED.labels(name, reason).inc()
+        return Rejection(status, message, retry_after)
+
+    def admit(self, name, method, identity, remote_addr, engines):
+        """Проверяет запрос; возвращает Rejection или None.
+
+        Принятый отчет (REPORT) занимает слот, его нужно вернуть release_report().
+        """
+        # Сброс нагрузки до исчерпания пула: записи не сбрасываются
+        if name != CHEAP or method in ('GET', 'HEAD'):
+            threshold = self.shed_cheap_at if name == CHEAP else self.shed_expensive_at
+            if _pool_utilization(engines, self.pool_capacity) >= threshold:
+                return self._reject(name, 'shed', 503, 'Сервис перегружен, повторите запрос позже', self.retry_after)
+
+        # Корзина пользователя (без токена — по адресу клиента)
+        key = f'user:{identity}' if identity is not None else f'ip:{remote_addr}'
+        bucket = EXPENSIVE if name == REPORT else name
+        allowed, retry_after = self.buckets.take(f'{bucket}:{key}', *self.budgets[bucket])
+        if not allowed:
+            return self._reject(name, 'rate_limit', 429, 'Слишком много запросов, повторите позже', retry_after)
+
+        # Общий для процесса лимит одновременных отчетов
+        if name == REPORT and not self.reports.acquire(blocking=False):
+            return self._reject(name, 'concurrency', 503, 'Слишком много одновременных отчетов, повторите позже',
+                                self.retry_after)
+        return None
+
+    def release_report(self):
+        self.reports.release()
+
+
+def _reject(rejection):
+    response = jsonify({'message': rejection.message})
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = rejection.retry_after_header
+    return response
+
+
+def init_rate_limiting(app, db):
+    """Подключает ограничение частоты запросов, лимит отчетов и сброс нагрузки"""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+
+    limiter = RateLimiter(app.config)
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def admit_request():
+        view = app.view_functions.get(request.endpoint)
+        if view is None or request.method == 'OPTIONS' or request.endpoint == 'metrics':
+            return None
+        name = getattr(view, 'request_class', CHEAP)
+
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            # Ошибку токена вернет сам эндпоинт
+            identity = None
+
+        # В асинхронном режиме (app.asgi) учитываются и пулы асинхронных движков
+        engines = [*db.engines.values(), *app.extensions.get('async_engines', ())]
+        rejection = limiter.admit(name, request.method, identity, request.remote_addr, engines)
+        if rejection is not None:
+            return _reject(rejection)
+        if name == REPORT:
+            g.report_slot = True
+        return None
+
+    @app.teardown_request
+    def release_report_slot(exc):
+        if g.pop('report_slot', None):
+            limiter.release_report()
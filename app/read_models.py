@@ -0,0 +1,396 @@
+import base64
+from collections import namedtuple
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import aliased
+from app import db
+from app.models import ArchivedTask, ArchivedTimeLog, AuditLog, Board, Column, Project, Role, Task, TimeLog, User
+from app.serializers import (BOARD_TASK_FIELDS, TASK_COLUMNS, TASK_LIST_FIELDS, Assignee, Author, column_select,
+                             serialize_columns, serialize_tasks, task_select)
+
+# Read-модели списков: кортежи без __dict__ и без отслеживания в identity map.
+# Запросы выбирают только столбцы, которые попадают в ответ.
+
+
+class UserRow(NamedTuple):
+    id: int
+    username: str
+    email: str
+    role: str
+
+
+class ProjectRow(NamedTuple):
+    id: int
+    name: str
+    code: str
+    description: Optional[str]
+    created_at: datetime
+
+
+class BoardRow(NamedTuple):
+    id: int
+    name: str
+    project_id: int
+    project_name: str
+    created_at: datetime
+
+
+# Поля задачи совпадают со строками сериализатора задач
+TaskRow = namedtuple('TaskRow', TASK_COLUMNS)
+
+
+def user_select():
+    return select(User.id, User.username, User.email, Role.name).join(Role, User.role_id == Role.id)
+
+
+def project_select():
+    return select(Project.id, Project.name, Project.code, Project.description, Project.created_at)
+
+
+def board_select():
+    return select(
+        Board.id, Board.name, Board.project_id, Project.name, Board.created_at
+    ).join(Project, Board.project_id == Project.id)
+
+
+def fetch(row_type, statement):
+    """Выполняет запрос и возвращает список строк read-модели"""
+    return list(map(row_type._make, db.session.execute(statement)))
+
+
+def fetch_users(statement=None):
+    return fetch(UserRow, user_select() if statement is None else statement)
+
+
+def fetch_projects(statement=None):
+    return fetch(ProjectRow, project_select() if statement is None else statement)
+
+
+def fetch_boards(statement=None):
+    return fetch(BoardRow, board_select() if statement is None else statement)
+
+
+def fetch_tasks(statement=None):
+    return fetch(TaskRow, task_select() if statement is None else statement)
+
+
+# Планы чтения эндпоинтов, которые обслуживает и асинхронный режим (app.asgi):
+# генератор отдает запрос (yield statement) и получает его результат, поэтому
+# один план выполняют и Flask-эндпоинт (run_plan), и ASGI-приложение (run_plan_async)
+
+
+def board_detail_plan(board_id):
+    """Доска с колонками и числом задач в каждой; None — доски нет"""
+    row = (yield board_select().where(Board.id == board_id)).first()
+    if row is None:
+        return None
+    board = BoardRow._make(row)
+
+    # Количество задач во всех колонках одним запросом
+    columns = (yield select(
+        Column.id, Column.name, Column.order, func.count(Task.id)
+    ).outerjoin(
+        Task, Task.column_id == Column.id
+    ).where(
+        Column.board_id == board_id
+    ).group_by(Column.id, Column.name, Column.order).order_by(Column.order)).all()
+
+    return {
+        'id': board.id,
+        'name': board.name,
+        'project_id': board.project_id,
+        'project_name': board.project_name,
+        'created_at': board.created_at,
+        'columns': [{
+            'id': column_id,
+            'name': name,
+            'order': order,
+            'task_count': task_count
+        } for column_id, name, order, task_count in columns]
+    }
+
+
+def board_columns_plan(board_id):
+    """Колонки доски вместе с задачами; None — доски нет"""
+    if (yield select(Board.id).where(Board.id == board_id)).scalar() is None:
+        return None
+
+    columns = (yield column_select().where(Column.board_id == board_id).order_by(Column.order)).all()
+
+    # Все задачи доски одним запросом вместе с именами авторов и исполнителей
+    tasks = (yield task_select().where(Column.board_id == board_id).order_by(Task.id)).all()
+
+    tasks_by_column = {}
+    for task in tasks:
+        tasks_by_column.setdefault(task.column_id, []).append(task)
+
+    columns_list = serialize_columns(columns)
+    for column in columns_list:
+        column['tasks'] = serialize_tasks(tasks_by_column.get(column['id'], []), BOARD_TASK_FIELDS)
+    return columns_list
+
+
+def task_list_plan(args, user_id=None):
+    """Список задач с фильтрами get_tasks"""
+    rows = (yield task_select().where(*task_filters(args, user_id))).all()
+    return serialize_tasks(rows, TASK_LIST_FIELDS)
+
+
+def task_plan(task_id):
+    """Строка задачи (столбцы TASK_COLUMNS); None — задачи нет"""
+    return (yield task_select().where(Task.id == task_id)).first()
+
+
+def task_filters(args, user_id=None):
+    """Условия фильтрации задач по параметрам запроса (как в get_tasks).
+
+    Запрос должен включать таблицу columns (task_select и workload_select ее соединяют).
+    """
+    conditions = []
+
+    # Фильтр по приоритету
+    if 'priority' in args:
+        conditions.append(Task.priority == args['priority'])
+
+    # Фильтр по автору
+    if 'author_id' in args:
+        conditions.append(Task.author_id == args['author_id'])
+
+    # Фильтр по исполнителю
+    if 'assignee_id' in args:
+        conditions.append(Task.assignee_id == args['assignee_id'])
+
+    # Фильтр "мои задачи"
+    if 'my_tasks' in args and args['my_tasks'].lower() == 'true' and user_id is not None:
+        conditions.append(Task.assignee_id == int(user_id))
+
+    # Фильтры по проекту, доске и колонке
+    if 'project_id' in args:
+        conditions.append(Column.board_id.in_(select(Board.id).where(Board.project_id == args['project_id'])))
+    if 'board_id' in args:
+        conditions.append(Column.board_id == args['board_id'])
+    if 'column_id' in args:
+        conditions.append(Task.column_id == args['column_id'])
+
+    # Фильтр по дате создания (с)
+    if 'created_from' in args:
+        try:
+            conditions.append(Task.created_at >= datetime.fromisoformat(args['created_from']))
+        except ValueError:
+            pass
+
+    # Фильтр по дате создания (по)
+    if 'created_to' in args:
+        try:
+            conditions.append(Task.created_at <= datetime.fromisoformat(args['created_to']))
+        except ValueError:
+            pass
+
+    return conditions
+
+
+class WorkloadRow(NamedTuple):
+    assignee_id: Optional[int]
+    username: Optional[str]
+    project_id: int
+    project_name: str
+    column_id: int
+    column_name: str
+    task_count: int
+    remaining_time: float
+    estimated_time: float
+    spent_time: float
+
+
+def workload_select():
+    """Суммы времени задач по исполнителю, проекту и колонке одним запросом"""
+    return select(
+        Task.assignee_id, User.username, Board.project_id, Project.name, Task.column_id, Column.name,
+        func.count(Task.id),
+        func.coalesce(func.sum(Task.remaining_time), 0.0),
+        func.coalesce(func.sum(Task.estimated_time), 0.0),
+        func.coalesce(func.sum(Task.spent_time), 0.0)
+    ).join(
+        Column, Task.column_id == Column.id
+    ).join(
+        Board, Column.board_id == Board.id
+    ).join(
+        Project, Board.project_id == Project.id
+    ).outerjoin(
+        User, Task.assignee_id == User.id
+    ).group_by(
+        Task.assignee_id, User.username, Board.project_id, Project.name, Task.column_id, Column.name
+    )
+
+
+def fetch_workload(conditions=()):
+    return fetch(WorkloadRow, workload_select().where(*conditions))
+
+
+class TimeLogRow(NamedTuple):
+    id: int
+    task_id: int
+    user_id: int
+    logged_by_id: int
+    spent_hours: float
+    remaining_hours: Optional[float]
+    comment: Optional[str]
+    created_at: datetime
+
+
+def time_log_select():
+    return select(
+        TimeLog.id, TimeLog.task_id, TimeLog.user_id, TimeLog.logged_by_id, TimeLog.spent_hours,
+        TimeLog.remaining_hours, TimeLog.comment, TimeLog.created_at
+    )
+
+
+def fetch_time_logs(statement=None):
+    return fetch(TimeLogRow, time_log_select() if statement is None else statement)
+
+
+class ArchivedTaskRow(NamedTuple):
+    id: int
+    code: str
+    title: str
+    description: Optional[str]
+    priority: Optional[str]
+    estimated_time: Optional[float]
+    remaining_time: Optional[float]
+    spent_time: Optional[float]
+    author_id: int
+    author: Optional[str]
+    assignee_id: Optional[int]
+    assignee: Optional[str]
+    project_id: int
+    board_id: int
+    column_id: int
+    column_name: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    archived_at: datetime
+
+
+def archived_task_select():
+    return select(
+        ArchivedTask.id, ArchivedTask.code, ArchivedTask.title, ArchivedTask.description, ArchivedTask.priority,
+        ArchivedTask.estimated_time, ArchivedTask.remaining_time, ArchivedTask.spent_time,
+        ArchivedTask.author_id, Author.username, ArchivedTask.assignee_id, Assignee.username,
+        ArchivedTask.project_id, ArchivedTask.board_id, ArchivedTask.column_id, ArchivedTask.column_name,
+        ArchivedTask.created_at, ArchivedTask.updated_at, ArchivedTask.started_at, ArchivedTask.completed_at,
+        ArchivedTask.archived_at
+    ).outerjoin(
+        Author, ArchivedTask.author_id == Author.id
+    ).outerjoin(
+        Assignee, ArchivedTask.assignee_id == Assignee.id
+    )
+
+
+def archived_time_log_select():
+    return select(
+        ArchivedTimeLog.id, ArchivedTimeLog.task_id, ArchivedTimeLog.user_id, ArchivedTimeLog.logged_by_id,
+        ArchivedTimeLog.spent_hours, ArchivedTimeLog.remaining_hours, ArchivedTimeLog.comment,
+        ArchivedTimeLog.created_at
+    )
+
+
+def fetch_archived_tasks(statement=None):
+    return fetch(ArchivedTaskRow, archived_task_select() if statement is None else statement)
+
+
+# Для кого залогировано время и кто залогировал
+LogUser = aliased(User)
+Logger = aliased(User)
+
+
+class TimeLogEntryRow(NamedTuple):
+    id: int
+    task_id: int
+    task_code: str
+    task_title: str
+    user_id: int
+    username: Optional[str]
+    logged_by_id: int
+    logged_by_username: Optional[str]
+    spent_hours: float
+    remaining_hours: Optional[float]
+    comment: Optional[str]
+    created_at: datetime
+
+
+def time_log_entry_select():
+    """Записи времени вместе с кодом задачи и именами обоих пользователей одним запросом"""
+    return select(
+        TimeLog.id, TimeLog.task_id, Task.code, Task.title, TimeLog.user_id, LogUser.username,
+        TimeLog.logged_by_id, Logger.username, TimeLog.spent_hours, TimeLog.remaining_hours, TimeLog.comment,
+        TimeLog.created_at
+    ).join(
+        Task, TimeLog.task_id == Task.id
+    ).outerjoin(
+        LogUser, TimeLog.user_id == LogUser.id
+    ).outerjoin(
+        Logger, TimeLog.logged_by_id == Logger.id
+    )
+
+
+def fetch_time_log_entries(statement=None):
+    return fetch(TimeLogEntryRow, time_log_entry_select() if statement is None else statement)
+
+
+def encode_cursor(created_at, row_id):
+    """Непрозрачный курсор страницы по паре (created_at, id)"""
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{row_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Обратное к encode_cursor; для некорректного курсора — ValueError"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, UnicodeDecodeError, ValueError):
+        raise ValueError('Некорректный курсор')
+
+
+def keyset_page(statement, created_column, id_column, cursor=None, descending=True):
+    """Упорядочивает запрос по (created_at, id) и продолжает его после курсора.
+
+    Страница читается по индексу с позиции курсора, без OFFSET и COUNT,
+    поэтому время ответа не зависит от глубины страницы.
+    """
+    if cursor:
+        # Сравнение пар (created_at, id) — диапазон по составному индексу
+        position = tuple_(created_column, id_column)
+        cursor_position = tuple_(*decode_cursor(cursor))
+        statement = statement.where(position < cursor_position if descending else position > cursor_position)
+
+    if descending:
+        return statement.order_by(created_column.desc(), id_column.desc())
+    return statement.order_by(created_column.asc(), id_column.asc())
+
+
+class AuditLogRow(NamedTuple):
+    id: int
+    user_id: Optional[int]
+    username: Optional[str]
+    action: str
+    entity: str
+    entity_id: Optional[int]
+    changes: Optional[str]
+    endpoint: Optional[str]
+    created_at: datetime
+
+
+def audit_log_select():
+    return select(
+        AuditLog.id, AuditLog.user_id, User.username, AuditLog.action, AuditLog.entity, AuditLog.entity_id,
+        AuditLog.changes, AuditLog.endpoint, AuditLog.created_at
+    ).outerjoin(
+        User, AuditLog.user_id == User.id
+    )
+
+
+def fetch_audit_log(statement=None):
+    return fetch(AuditLogRow, audit_log_select() if statement is None else statement)
@@ -5,6 +5,9 @@ from app.routes.projects import projects_bp
 from app.routes.boards import boards_bp
 from app.routes.columns import columns_bp
 from app.routes.tasks import tasks_bp
+from app.routes.archive import archive_bp
+from app.routes.audit import audit_bp
+from app.routes.webhooks import webhooks_bp
 
 # Для прямого импорта
-__all__ = ['auth_bp', 'users_bp', 'projects_bp', 'boards_bp', 'columns_bp', 'tasks_bp']
\ No newline at end of file
+__all__ = ['auth_bp', 'users_bp', 'projects_bp', 'boards_bp', 'columns_bp', 'tasks_bp', 'archive_bp', 'audit_bp', 'webhooks_bp']
\ No newline at end of file
@@ -0,0 +1,75 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from app.models import ArchivedTask, ArchivedTimeLog
+from app.database import read_replica
+from app.read_models import TimeLogRow, archived_task_select, archived_time_log_select, fetch, fetch_archived_tasks
+from app.utils import auth_required
+
+archive_bp = Blueprint('archive', __name__)
+
+# Размер страницы архива задач
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+@archive_bp.route('/tasks', methods=['GET'])
+@auth_required
+@read_replica
+def get_archived_tasks():
+    """Архивные задачи с фильтрацией и постраничной выдачей по возрастанию id (after_id, limit)"""
+    args = request.args
+
+    try:
+        after_id = int(args.get('after_id', 0))
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'message': 'Параметры after_id и limit должны быть числами'}), 400
+
+    query = archived_task_select().where(ArchivedTask.id > after_id)
+
+    # Фильтры по проекту, доске, автору и исполнителю
+    for name in ('project_id', 'board_id', 'author_id', 'assignee_id'):
+        if name in args:
+            query = query.where(getattr(ArchivedTask, name) == args[name])
+
+    # Фильтр по дате завершения
+    for name, compare in (('completed_from', ArchivedTask.completed_at.__ge__),
+                          ('completed_to', ArchivedTask.completed_at.__le__)):
+        if name in args:
+            try:
+                query = query.where(compare(datetime.fromisoformat(args[name])))
+            except ValueError:
+                pass
+
+    # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+    tasks = fetch_archived_tasks(query.order_by(ArchivedTask.id).limit(limit + 1))
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    return jsonify({
+        'tasks': [task._asdict() for task in tasks],
+        'pagination': {
+            'limit': limit,
+            'next_after_id': tasks[-1].id if has_more else None
+        }
+    }), 200
+
+
+@archive_bp.route('/tasks/<int:task_id>', methods=['GET'])
+@auth_required
+@read_replica
+def get_archived_task(task_id):
+    """Архивная задача вместе с записями времени"""
+    tasks = fetch_archived_tasks(archived_task_select().where(ArchivedTask.id == task_id))
+
+    if not tasks:
+        return jsonify({'message': 'Задача не найдена в архиве'}), 404
+
+    time_logs = fetch(TimeLogRow, archived_time_log_select().where(
+        ArchivedTimeLog.task_id == task_id
+    ).order_by(ArchivedTimeLog.created_at.desc()))
+
+    task_data = tasks[0]._asdict()
+    task_data['time_logs'] = [log._asdict() for log in time_logs]
+
+    return jsonify(task_data), 200
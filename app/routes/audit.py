@@ -0,0 +1,67 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from app.models import AuditLog
+from app.database import read_replica
+from app.read_models import audit_log_select, fetch_audit_log
+from app.serializers import loads
+from app.utils import manager_required
+
+audit_bp = Blueprint('audit', __name__)
+
+# Размер страницы журнала изменений
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+@audit_bp.route('/', methods=['GET'])
+@manager_required
+@read_replica
+def get_audit_log():
+    """Журнал изменений от новых к старым с фильтрацией и постраничной выдачей (before_id, limit)"""
+    args = request.args
+
+    try:
+        before_id = int(args['before_id']) if 'before_id' in args else None
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'message': 'Параметры before_id и limit должны быть числами'}), 400
+
+    query = audit_log_select()
+    if before_id is not None:
+        query = query.where(AuditLog.id < before_id)
+
+    # Фильтры по объекту, пользователю и действию
+    for name in ('entity', 'action'):
+        if name in args:
+            query = query.where(getattr(AuditLog, name) == args[name])
+    for name in ('entity_id', 'user_id'):
+        if name in args:
+            try:
+                query = query.where(getattr(AuditLog, name) == int(args[name]))
+            except ValueError:
+                return jsonify({'message': f'Параметр {name} должен быть числом'}), 400
+
+    # Фильтр по дате изменения
+    for name, compare in (('created_from', AuditLog.created_at.__ge__),
+                          ('created_to', AuditLog.created_at.__le__)):
+        if name in args:
+            try:
+                query = query.where(compare(datetime.fromisoformat(args[name])))
+            except ValueError:
+                return jsonify({'message': f'Параметр {name} должен быть датой в формате ISO 8601'}), 400
+
+    # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+    entries = fetch_audit_log(query.order_by(AuditLog.id.desc()).limit(limit + 1))
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    return jsonify({
+        'entries': [
+            {**entry._asdict(), 'changes': loads(entry.changes) if entry.changes else None}
+            for entry in entries
+        ],
+        'pagination': {
+            'limit': limit,
+            'next_before_id': entries[-1].id if has_more else None
+        }
+    }), 200
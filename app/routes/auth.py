@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import decode_token, get_jwt, get_jwt_identity, jwt_required
 from app import db
+from app.hashing import password_needs_rehash
+from app.tokens import VERSION_CLAIM, issue_tokens, revoke_all_tokens, revoke_token
 from app.models import User, Role
 from app.utils import auth_required
 
@@ -41,12 +43,12 @@ def register():
     db.session.add(new_user)
     db.session.commit()
 
-    # Создание токена - преобразуем ID в строку
-    access_token = create_access_token(identity=str(new_user.id))
+    # Создание токенов (роль и версия токенов передаются в клеймах)
+    tokens = issue_tokens(new_user)
 
     return jsonify({
         'message': 'Пользователь успешно зарегистрирован',
-        'access_token': access_token,
+        **tokens,
         'user': {
             'id': new_user.id,
             'username': new_user.username,
@@ -70,12 +72,17 @@ def login():
     if not user or not user.verify_password(data['password']):
         return jsonify({'message': 'Неверное имя пользователя или пароль'}), 401
 
-    # Создание токена - преобразуем ID в строку
-    access_token = create_access_token(identity=str(user.id))
+    # Пересчет хеша, если изменились параметры хеширования
+    if password_needs_rehash(user.password_hash):
+        user.password = data['password']
+        db.session.commit()
+
+    # Создание токенов (роль и версия токенов передаются в клеймах)
+    tokens = issue_tokens(user)
 
     return jsonify({
         'message': 'Авторизация успешна',
-        'access_token': access_token,
+        **tokens,
         'user': {
             'id': user.id,
             'username': user.username,
@@ -85,6 +92,46 @@ def login():
     }), 200
 
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Выдача нового access-токена по refresh-токену"""
+    user = User.query.get(int(get_jwt_identity()))
+
+    # Роль могла измениться, поэтому клеймы берутся из БД
+    if not user or user.token_version != get_jwt().get(VERSION_CLAIM, user.token_version):
+        return jsonify({'message': 'Требуется повторная авторизация'}), 401
+
+    return jsonify(issue_tokens(user, refresh=False)), 200
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Отзыв текущего токена; all=true отзывает все токены пользователя"""
+    data = request.get_json(silent=True) or {}
+    revoke_token(get_jwt())
+
+    # Вместе с access-токеном отзывается и переданный refresh-токен
+    if data.get('refresh_token'):
+        try:
+            refresh_claims = decode_token(data['refresh_token'])
+        except Exception:
+            return jsonify({'message': 'Некорректный refresh-токен'}), 400
+        if refresh_claims[current_app.config['JWT_IDENTITY_CLAIM']] != get_jwt_identity():
+            return jsonify({'message': 'Некорректный refresh-токен'}), 400
+        revoke_token(refresh_claims)
+
+    if request.args.get('all', '').lower() == 'true':
+        user = User.query.get(int(get_jwt_identity()))
+        if user:
+            revoke_all_tokens(user)
+
+    db.session.commit()
+
+    return jsonify({'message': 'Выход выполнен'}), 200
+
+
 @auth_bp.route('/me', methods=['GET'])
 @auth_required
 def get_me():
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models import Board, Project
+from app.database import read_replica, run_plan
+from app.idempotency import idempotent
+from app.includes import BOARD_INCLUDES, build_included, parse_include
+from app.read_models import board_detail_plan, fetch_boards
 from app.utils import auth_required, manager_required
 
 boards_bp = Blueprint('boards', __name__)
@@ -8,51 +12,38 @@ boards_bp = Blueprint('boards', __name__)
 
 @boards_bp.route('/', methods=['GET'])
 @auth_required
+@read_replica
 def get_all_boards():
     """Получение всех досок"""
-    boards = Board.query.all()
-    boards_list = [{
-        'id': board.id,
-        'name': board.name,
-        'project_id': board.project_id,
-        'project_name': board.project.name,
-        'created_at': board.created_at.isoformat()
-    } for board in boards]
+    boards = fetch_boards()
 
-    return jsonify({'boards': boards_list}), 200
+    return jsonify({'boards': [board._asdict() for board in boards]}), 200
 
 
 @boards_bp.route('/<int:board_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_board(board_id):
-    """Получение конкретной доски по ID"""
-    board = Board.query.get(board_id)
+    """Получение конкретной доски по ID (include= — связанные данные, см. app.includes)"""
+    try:
+        includes = parse_include(request.args.get('include'), BOARD_INCLUDES)
+    except ValueError as error:
+        return jsonify({'message': str(error)}), 400
 
-    if not board:
+    board_data = run_plan(board_detail_plan(board_id))
+
+    if board_data is None:
         return jsonify({'message': 'Доска не найдена'}), 404
 
-    columns = board.columns.all()
-    columns_list = [{
-        'id': column.id,
-        'name': column.name,
-        'order': column.order,
-        'task_count': column.tasks.count()
-    } for column in columns]
-
-    board_data = {
-        'id': board.id,
-        'name': board.name,
-        'project_id': board.project_id,
-        'project_name': board.project.name,
-        'created_at': board.created_at.isoformat(),
-        'columns': columns_list
-    }
+    if includes:
+        board_data['included'] = build_included(includes, board_id)
 
     return jsonify(board_data), 200
 
 
 @boards_bp.route('/', methods=['POST'])
 @manager_required
+@idempotent
 def create_board():
     """Создание новой доски (только менеджеры)"""
     data = request.get_json()
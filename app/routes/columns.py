@@ -1,6 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app import db
 from app.models import Column, Board
+from app.compression import get_snapshot, put_snapshot, snapshot_response
+from app.database import read_replica, run_plan
+from app.idempotency import idempotent
+from app.read_models import board_columns_plan
+from app.serializers import column_tuple, dumps, serialize_column
 from app.utils import auth_required, manager_required
 
 columns_bp = Blueprint('columns', __name__)
@@ -8,46 +13,27 @@ columns_bp = Blueprint('columns', __name__)
 
 @columns_bp.route('/board/<int:board_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_board_columns(board_id):
-    """Получение колонок доски"""
-    board = Board.query.get(board_id)
+    """Получение колонок доски (снимок доски кэшируется на BOARD_SNAPSHOT_TTL_SECONDS)"""
+    snapshots = current_app.extensions.get('board_snapshots')
+    entry = get_snapshot(snapshots, board_id)
+    if entry is not None:
+        return snapshot_response(current_app, entry)
 
-    if not board:
+    columns_list = run_plan(board_columns_plan(board_id))
+
+    if columns_list is None:
         return jsonify({'message': 'Доска не найдена'}), 404
 
-    columns = board.columns.order_by(Column.order).all()
-    columns_list = [{
-        'id': column.id,
-        'name': column.name,
-        'order': column.order,
-        'board_id': column.board_id,
-        'created_at': column.created_at.isoformat(),
-        'tasks': [{
-            'id': task.id,
-            'code': task.code,
-            'title': task.title,
-            'priority': task.priority,
-            'description': task.description,
-            'estimated_time': task.estimated_time,
-            'remaining_time': task.remaining_time,
-            'spent_time': task.spent_time,
-            'author': task.author.username if task.author else None,
-            'author_id': task.author_id,
-            'assignee': task.assignee.username if task.assignee else None,
-            'assignee_id': task.assignee_id,
-            'status': task.status,
-            'created_at': task.created_at.isoformat(),
-            'updated_at': task.updated_at.isoformat(),
-            'started_at': task.started_at.isoformat() if task.started_at else None,
-            'completed_at': task.completed_at.isoformat() if task.completed_at else None
-        } for task in column.tasks]
-    } for column in columns]
-
-    return jsonify({'columns': columns_list}), 200
+    if snapshots is None:
+        return jsonify({'columns': columns_list}), 200
+    return snapshot_response(current_app, put_snapshot(snapshots, board_id, dumps({'columns': columns_list}) + b'\n'))
 
 
 @columns_bp.route('/', methods=['POST'])
 @manager_required
+@idempotent
 def create_column():
     """Создание новой колонки (только менеджеры)"""
     data = request.get_json()
@@ -77,13 +63,7 @@ def create_column():
 
     return jsonify({
         'message': 'Колонка успешно создана',
-        'column': {
-            'id': new_column.id,
-            'name': new_column.name,
-            'order': new_column.order,
-            'board_id': new_column.board_id,
-            'created_at': new_column.created_at.isoformat()
-        }
+        'column': serialize_column(column_tuple(new_column))
     }), 201
 
 
@@ -108,13 +88,7 @@ def update_column(column_id):
 
     return jsonify({
         'message': 'Колонка успешно обновлена',
-        'column': {
-            'id': column.id,
-            'name': column.name,
-            'order': column.order,
-            'board_id': column.board_id,
-            'created_at': column.created_at.isoformat()
-        }
+        'column': serialize_column(column_tuple(column))
     }), 200
 
 
@@ -0,0 +1,75 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.profiling import SamplingProfiler, profiler_lock, tracemalloc_diff, tracemalloc_start, tracemalloc_stop
+from app.utils import manager_required
+
+debug_bp = Blueprint('debug', __name__)
+
+
+@debug_bp.route('/profile', methods=['POST'])
+@manager_required
+def profile_worker():
+    """Сэмплирующее профилирование воркера в течение N секунд (только менеджеры)"""
+    try:
+        seconds = float(request.args.get('seconds', 10))
+    except ValueError:
+        return jsonify({'message': 'Некорректная длительность профилирования'}), 400
+
+    max_seconds = current_app.config['PROFILING_MAX_SECONDS']
+    if seconds <= 0 or seconds > max_seconds:
+        return jsonify({'message': f'Длительность должна быть от 0 до {max_seconds} секунд'}), 400
+
+    if not profiler_lock.acquire(blocking=False):
+        return jsonify({'message': 'Профилирование уже выполняется'}), 409
+
+    try:
+        profiler = SamplingProfiler(current_app.config['PROFILING_SAMPLE_INTERVAL']).run_for(seconds)
+    finally:
+        profiler_lock.release()
+
+    response = Response(profiler.collapsed(), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(profiler.sample_count)
+    return response
+
+
+@debug_bp.route('/tracemalloc/start', methods=['POST'])
+@manager_required
+def start_tracemalloc():
+    """Включение отслеживания памяти и снятие базового снимка"""
+    try:
+        frames = int(request.args.get('frames', 10))
+    except ValueError:
+        return jsonify({'message': 'Некорректное число кадров'}), 400
+
+    if frames < 1:
+        return jsonify({'message': 'Число кадров должно быть положительным'}), 400
+
+    tracemalloc_start(frames)
+    return jsonify({'message': 'Отслеживание памяти включено'}), 200
+
+
+@debug_bp.route('/tracemalloc/diff', methods=['GET'])
+@manager_required
+def get_tracemalloc_diff():
+    """Рост памяти с момента предыдущего снимка"""
+    try:
+        limit = int(request.args.get('limit', 25))
+    except ValueError:
+        return jsonify({'message': 'Некорректный лимит'}), 400
+
+    if limit < 1:
+        return jsonify({'message': 'Лимит должен быть положительным'}), 400
+
+    diff = tracemalloc_diff(limit)
+
+    if diff is None:
+        return jsonify({'message': 'Отслеживание памяти не включено'}), 400
+
+    return jsonify(diff), 200
+
+
+@debug_bp.route('/tracemalloc/stop', methods=['POST'])
+@manager_required
+def stop_tracemalloc():
+    """Выключение отслеживания памяти"""
+    tracemalloc_stop()
+    return jsonify({'message': 'Отслеживание памяти выключено'}), 200
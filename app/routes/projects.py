@@ -1,6 +1,12 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from app import cloning, db, transfer
 from app.models import Project, Board
+from app.database import read_replica
+from app.idempotency import idempotent
+from app.ratelimit import EXPENSIVE, REPORT, request_class
+from app.read_models import fetch_projects
 from app.utils import auth_required, manager_required
 
 projects_bp = Blueprint('projects', __name__)
@@ -8,22 +14,17 @@ projects_bp = Blueprint('projects', __name__)
 
 @projects_bp.route('/', methods=['GET'])
 @auth_required
+@read_replica
 def get_projects():
     """Получение списка всех проектов"""
-    projects = Project.query.all()
-    projects_list = [{
-        'id': project.id,
-        'name': project.name,
-        'code': project.code,
-        'description': project.description,
-        'created_at': project.created_at.isoformat()
-    } for project in projects]
+    projects = fetch_projects()
 
-    return jsonify({'projects': projects_list}), 200
+    return jsonify({'projects': [project._asdict() for project in projects]}), 200
 
 
 @projects_bp.route('/', methods=['POST'])
 @manager_required
+@idempotent
 def create_project():
     """Создание нового проекта (только менеджеры)"""
     data = request.get_json()
@@ -70,8 +71,98 @@ def create_project():
     }), 201
 
 
+@projects_bp.route('/<int:project_id>/clone', methods=['POST'])
+@manager_required
+@idempotent
+def clone_project(project_id):
+    """Создание проекта по образцу существующего: доски, колонки и задачи (только менеджеры)"""
+    source = Project.query.get(project_id)
+
+    if not source:
+        return jsonify({'message': 'Проект не найден'}), 404
+
+    data = request.get_json()
+
+    if not data or not data.get('name') or not data.get('code'):
+        return jsonify({'message': 'Имя и код проекта обязательны'}), 400
+
+    tasks = data.get('tasks', 'none')
+    if tasks not in cloning.CLONE_TASKS:
+        return jsonify({'message': f'Параметр tasks должен быть одним из: {", ".join(cloning.CLONE_TASKS)}'}), 400
+
+    code = data['code'].upper()
+    if Project.query.filter_by(code=code).first():
+        return jsonify({'message': 'Проект с таким кодом уже существует'}), 400
+
+    project, boards, columns, copied_tasks = cloning.clone_project(
+        source, data['name'], code, data.get('description', source.description), tasks, int(get_jwt_identity())
+    )
+
+    return jsonify({
+        'message': 'Проект успешно скопирован',
+        'project': {
+            'id': project.id,
+            'name': project.name,
+            'code': project.code,
+            'description': project.description,
+            'created_at': project.created_at.isoformat()
+        },
+        'copied': {
+            'boards': boards,
+            'columns': columns,
+            'tasks': copied_tasks
+        }
+    }), 201
+
+
+@projects_bp.route('/<int:project_id>/export', methods=['GET'])
+@request_class(REPORT)
+@manager_required
+@read_replica
+def export_project(project_id):
+    """Выгрузка проекта с досками, задачами (включая архивные), записями времени и пользователями в сжатый архив"""
+    project = Project.query.get(project_id)
+
+    if not project:
+        return jsonify({'message': 'Проект не найден'}), 404
+
+    # Архив отдается потоком по мере чтения из БД
+    response = Response(stream_with_context(transfer.export_project(project_id)),
+                        mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename="{project.code}.tmx"'
+    return response
+
+
+@projects_bp.route('/import', methods=['POST'])
+@request_class(EXPENSIVE)
+@manager_required
+def import_project():
+    """Загрузка проекта из архива выгрузки (тело запроса); code и name в строке запроса меняют код и имя"""
+    try:
+        project, counts = transfer.import_project(request.stream, request.args.get('code'), request.args.get('name'))
+    except transfer.ArchiveError as e:
+        return jsonify({'message': str(e)}), 400
+    except transfer.ProjectCodeTaken as e:
+        return jsonify({'message': f'Проект с кодом {e} уже существует, укажите другой код (code)'}), 409
+    except IntegrityError:
+        return jsonify({'message': 'Коды задач из архива уже заняты, укажите другой код проекта (code)'}), 409
+
+    return jsonify({
+        'message': 'Проект успешно импортирован',
+        'project': {
+            'id': project.id,
+            'name': project.name,
+            'code': project.code,
+            'description': project.description,
+            'created_at': project.created_at.isoformat()
+        },
+        'imported': counts
+    }), 201
+
+
 @projects_bp.route('/<int:project_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_project(project_id):
     """Получение деталей проекта по ID"""
     project = Project.query.get(project_id)
@@ -142,6 +233,7 @@ def delete_project(project_id):
 
 @projects_bp.route('/<int:project_id>/boards', methods=['GET'])
 @auth_required
+@read_replica
 def get_project_boards(project_id):
     """Получение досок проекта"""
     project = Project.query.get(project_id)
@@ -1,115 +1,65 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
 from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from app import db
-from app.models import Task, Column, Project, User, Board, TimeLog
-from app.utils import auth_required, get_current_user, generate_task_code
+from app.models import ArchivedTask, ArchivedTimeLog, Task, Column, Project, User, Board, TimeLog
+from app.database import read_replica, run_plan, statement_timeout
+from app.idempotency import idempotent
+from app.includes import TASK_INCLUDES, build_included, parse_include
+from app.ratelimit import EXPENSIVE, REPORT, request_class
+from app.read_models import (encode_cursor, fetch_time_log_entries, fetch_workload, keyset_page, task_filters,
+                             task_list_plan, task_plan, time_log_entry_select)
+from app.serializers import (TASK_CONTEXT_FIELDS, TASK_DETAIL_FIELDS, TASK_ESTIMATE_FIELDS, TASK_TIME_LOG_FIELDS,
+                             TASK_UPDATE_FIELDS, serialize_task, task_select, task_tuple)
+from app.utils import auth_required, current_role, get_current_user, generate_task_code, manager_required
+from app.webhooks import NOTIFY_COLUMNS, TASK_MOVED, TIME_LOGGED, emit
 
 tasks_bp = Blueprint('tasks', __name__)
 
+# Размер страницы записей времени при выдаче по курсору
+DEFAULT_TIME_LOG_LIMIT = 50
+MAX_TIME_LOG_LIMIT = 500
+
 
 @tasks_bp.route('/', methods=['GET'])
+@request_class(EXPENSIVE)
 @auth_required
+@read_replica
 def get_tasks():
     """Получение списка задач с фильтрацией"""
-    # Получаем параметры фильтрации
-    args = request.args
-
-    # Базовый запрос
-    query = Task.query
-
-    # Фильтр по приоритету
-    if 'priority' in args:
-        query = query.filter(Task.priority == args['priority'])
-
-    # Фильтр по автору
-    if 'author_id' in args:
-        query = query.filter(Task.author_id == args['author_id'])
-
-    # Фильтр по исполнителю
-    if 'assignee_id' in args:
-        query = query.filter(Task.assignee_id == args['assignee_id'])
-
-    # Фильтр "мои задачи"
-    if 'my_tasks' in args and args['my_tasks'].lower() == 'true':
-        user = get_current_user()
-        if user:
-            query = query.filter(Task.assignee_id == user.id)
-
-    # Фильтр по дате создания (с)
-    if 'created_from' in args:
-        try:
-            created_from = datetime.fromisoformat(args['created_from'])
-            query = query.filter(Task.created_at >= created_from)
-        except ValueError:
-            pass
+    # Только нужные столбцы вместе с именами автора и исполнителя
+    tasks = run_plan(task_list_plan(request.args, get_jwt_identity()))
 
-    # Фильтр по дате создания (по)
-    if 'created_to' in args:
-        try:
-            created_to = datetime.fromisoformat(args['created_to'])
-            query = query.filter(Task.created_at <= created_to)
-        except ValueError:
-            pass
-
-    # Выполнение запроса
-    tasks = query.all()
-
-    tasks_list = [{
-        'id': task.id,
-        'code': task.code,
-        'title': task.title,
-        'description': task.description,
-        'priority': task.priority,
-        'status': task.status,
-        'estimated_time': task.estimated_time,
-        'remaining_time': task.remaining_time,
-        'spent_time': task.spent_time,
-        'author': task.author.username if task.author else None,
-        'assignee': task.assignee.username if task.assignee else None,
-        'created_at': task.created_at.isoformat(),
-        'updated_at': task.updated_at.isoformat(),
-        'started_at': task.started_at.isoformat() if task.started_at else None,
-        'completed_at': task.completed_at.isoformat() if task.completed_at else None
-    } for task in tasks]
-
-    return jsonify({'tasks': tasks_list}), 200
+    return jsonify({'tasks': tasks}), 200
 
 
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_task(task_id):
-    """Получение задачи по ID"""
-    task = Task.query.get(task_id)
+    """Получение задачи по ID (include= — связанные данные, см. app.includes)"""
+    try:
+        includes = parse_include(request.args.get('include'), TASK_INCLUDES)
+    except ValueError as error:
+        return jsonify({'message': str(error)}), 400
 
-    if not task:
+    row = run_plan(task_plan(task_id))
+
+    if not row:
         return jsonify({'message': 'Задача не найдена'}), 404
 
-    task_data = {
-        'id': task.id,
-        'code': task.code,
-        'title': task.title,
-        'description': task.description,
-        'priority': task.priority,
-        'status': task.status,
-        'column_id': task.column_id,
-        'estimated_time': task.estimated_time,
-        'remaining_time': task.remaining_time,
-        'spent_time': task.spent_time,
-        'author_id': task.author_id,
-        'author': task.author.username if task.author else None,
-        'assignee_id': task.assignee_id,
-        'assignee': task.assignee.username if task.assignee else None,
-        'created_at': task.created_at.isoformat(),
-        'updated_at': task.updated_at.isoformat(),
-        'started_at': task.started_at.isoformat() if task.started_at else None,
-        'completed_at': task.completed_at.isoformat() if task.completed_at else None
-    }
+    task_data = serialize_task(row, TASK_DETAIL_FIELDS)
+    if includes:
+        task_data['included'] = build_included(includes, row.board_id, row)
 
     return jsonify(task_data), 200
 
 
 @tasks_bp.route('/', methods=['POST'])
 @auth_required
+@idempotent
 def create_task():
     """Создание новой задачи с автоматическим помещением в беклог"""
     # Получаем текущего пользователя
@@ -147,6 +97,7 @@ def create_task():
         return jsonify({'message': 'Ошибка при генерации кода задачи'}), 500
 
     # Определяем исполнителя (если указан)
+    assignee = None
     assignee_id = None
     if data.get('assignee_id'):
         assignee = User.query.get(data['assignee_id'])
@@ -171,33 +122,14 @@ def create_task():
 
     return jsonify({
         'message': 'Задача успешно создана',
-        'task': {
-            'id': new_task.id,
-            'code': new_task.code,
-            'title': new_task.title,
-            'description': new_task.description,
-            'priority': new_task.priority,
-            'status': new_task.status,
-            'column_id': new_task.column_id,
-            'column_name': backlog_column.name,
-            'author_id': new_task.author_id,
-            'author': current_user.username,
-            'assignee_id': new_task.assignee_id,
-            'assignee': User.query.get(assignee_id).username if assignee_id else None,
-            'estimated_time': new_task.estimated_time,
-            'remaining_time': new_task.remaining_time,
-            'spent_time': new_task.spent_time,
-            'created_at': new_task.created_at.isoformat(),
-            'updated_at': new_task.updated_at.isoformat(),
-            'started_at': None,
-            'completed_at': None
-        }
+        'task': serialize_task(task_tuple(new_task, current_user, assignee, backlog_column), TASK_CONTEXT_FIELDS)
     }), 201
 
 
 # Оставляем старый метод для обратной совместимости
 @tasks_bp.route('/column/<int:column_id>', methods=['POST'])
 @auth_required
+@idempotent
 def create_task_in_column(column_id):
     """Создание новой задачи в колонке (устаревший метод)"""
     # Проверяем существование колонки
@@ -226,6 +158,7 @@ def create_task_in_column(column_id):
         return jsonify({'message': 'Ошибка при генерации кода задачи'}), 500
 
     # Определяем исполнителя (если указан)
+    assignee = None
     assignee_id = None
     if data.get('assignee_id'):
         assignee = User.query.get(data['assignee_id'])
@@ -250,27 +183,7 @@ def create_task_in_column(column_id):
 
     return jsonify({
         'message': 'Задача успешно создана',
-        'task': {
-            'id': new_task.id,
-            'code': new_task.code,
-            'title': new_task.title,
-            'description': new_task.description,
-            'priority': new_task.priority,
-            'status': new_task.status,
-            'column_id': new_task.column_id,
-            'column_name': column.name,
-            'author_id': new_task.author_id,
-            'author': current_user.username,
-            'assignee_id': new_task.assignee_id,
-            'assignee': User.query.get(assignee_id).username if assignee_id else None,
-            'estimated_time': new_task.estimated_time,
-            'remaining_time': new_task.remaining_time,
-            'spent_time': new_task.spent_time,
-            'created_at': new_task.created_at.isoformat(),
-            'updated_at': new_task.updated_at.isoformat(),
-            'started_at': None,
-            'completed_at': None
-        }
+        'task': serialize_task(task_tuple(new_task, current_user, assignee, column), TASK_CONTEXT_FIELDS)
     }), 201
 
 
@@ -288,6 +201,7 @@ def update_task(task_id):
         return jsonify({'message': 'Пользователь не аутентифицирован'}), 401
 
     data = request.get_json()
+    moved = None
 
     # Обновляем поля задачи
     if 'title' in data:
@@ -308,6 +222,8 @@ def update_task(task_id):
         # Проверяем существование колонки
         column = Column.query.get(data['column_id'])
         if column:
+            if column.id != task.column_id and column.name in NOTIFY_COLUMNS:
+                moved = (task.column_id, column)
             task.column_id = data['column_id']
 
             # Если задача перемещается в колонку "В работе", устанавливаем дату начала
@@ -332,27 +248,23 @@ def update_task(task_id):
     if 'spent_time' in data:
         task.spent_time = data['spent_time']
 
+    # Интеграции узнают о переходе задачи в ревью и в продакшен (outbox в той же транзакции)
+    if moved:
+        previous_column_id, column = moved
+        emit(TASK_MOVED, {
+            'task': {'id': task.id, 'code': task.code, 'title': task.title, 'assignee_id': task.assignee_id},
+            'board_id': column.board_id,
+            'column': {'id': column.id, 'name': column.name},
+            'previous_column_id': previous_column_id,
+            'user_id': current_user.id,
+            'moved_at': datetime.utcnow()
+        }, lambda: db.session.get(Board, column.board_id).project_id)
+
     db.session.commit()
 
     return jsonify({
         'message': 'Задача успешно обновлена',
-        'task': {
-            'id': task.id,
-            'code': task.code,
-            'title': task.title,
-            'description': task.description,
-            'priority': task.priority,
-            'status': task.status,
-            'column_id': task.column_id,
-            'author_id': task.author_id,
-            'assignee_id': task.assignee_id,
-            'estimated_time': task.estimated_time,
-            'remaining_time': task.remaining_time,
-            'spent_time': task.spent_time,
-            'updated_at': task.updated_at.isoformat(),
-            'started_at': task.started_at.isoformat() if task.started_at else None,
-            'completed_at': task.completed_at.isoformat() if task.completed_at else None
-        }
+        'task': serialize_task(task_tuple(task), TASK_UPDATE_FIELDS)
     }), 200
 
 
@@ -378,6 +290,7 @@ def delete_task(task_id):
 
 @tasks_bp.route('/<int:task_id>/time', methods=['POST'])
 @auth_required
+@idempotent
 def log_task_time(task_id):
     """Логирование затраченного времени на задачу"""
     task = Task.query.get(task_id)
@@ -407,6 +320,7 @@ def log_task_time(task_id):
         log_user = User.query.get(data['user_id'])
         if log_user:
             log_user_id = log_user.id
+            log_username = log_user.username
         else:
             return jsonify({'message': 'Указанный пользователь не найден'}), 404
     else:
@@ -415,6 +329,7 @@ def log_task_time(task_id):
         if current_user.id != task.assignee_id and not current_user.is_manager():
             return jsonify({'message': 'У вас нет прав для логирования времени для этой задачи'}), 403
         log_user_id = current_user.id
+        log_username = current_user.username
 
     # Добавляем информацию о том, кто залогировал время
     logged_by = current_user.username
@@ -441,11 +356,16 @@ def log_task_time(task_id):
     )
     
     db.session.add(time_log)
+    # id и время записи нужны событию вебхука; отдельного запроса flush не добавляет
+    db.session.flush()
+    emit(TIME_LOGGED, {
+        'task': {'id': task.id, 'code': task.code, 'title': task.title, 'remaining_time': task.remaining_time,
+                 'spent_time': task.spent_time},
+        'time_log': {'id': time_log.id, 'user_id': log_user_id, 'logged_by_id': current_user.id,
+                     'spent_hours': spent_hours, 'comment': time_log.comment, 'created_at': time_log.created_at}
+    }, lambda: db.session.get(Board, db.session.get(Column, task.column_id).board_id).project_id)
     db.session.commit()
 
-    # Получаем имя пользователя, от имени которого залогировано время
-    log_username = User.query.get(log_user_id).username if log_user_id else None
-
     return jsonify({
         'message': 'Время успешно залогировано',
         'time_log': {
@@ -457,72 +377,41 @@ def log_task_time(task_id):
             'comment': time_log.comment,
             'timestamp': time_log.created_at.isoformat()
         },
-        'task': {
-            'id': task.id,
-            'code': task.code,
-            'title': task.title,
-            'description': task.description,
-            'priority': task.priority,
-            'status': task.status,
-            'column_id': task.column_id,
-            'author_id': task.author_id,
-            'author': task.author.username if task.author else None,
-            'assignee_id': task.assignee_id,
-            'assignee': task.assignee.username if task.assignee else None,
-            'estimated_time': task.estimated_time,
-            'remaining_time': task.remaining_time,
-            'spent_time': task.spent_time,
-            'updated_at': task.updated_at.isoformat(),
-            'started_at': task.started_at.isoformat() if task.started_at else None,
-            'completed_at': task.completed_at.isoformat() if task.completed_at else None
-        }
+        'task': serialize_task(task_tuple(task), TASK_TIME_LOG_FIELDS)
     }), 200
 
 
 @tasks_bp.route('/board/<int:board_id>/task/<int:task_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_task_in_board_context(board_id, task_id):
-    """Получение детальной информации о задаче в контексте доски"""
+    """Получение детальной информации о задаче в контексте доски (поддерживает include=)"""
+    try:
+        includes = parse_include(request.args.get('include'), TASK_INCLUDES)
+    except ValueError as error:
+        return jsonify({'message': str(error)}), 400
+
     # Проверяем существование доски
     board = Board.query.get(board_id)
     if not board:
         return jsonify({'message': 'Доска не найдена'}), 404
 
-    # Получаем задачу
-    task = Task.query.get(task_id)
-    if not task:
+    # Получаем задачу вместе с колонкой, автором и исполнителем
+    row = db.session.execute(task_select().where(Task.id == task_id)).first()
+    if not row:
         return jsonify({'message': 'Задача не найдена'}), 404
 
     # Проверяем, что задача относится к доске
-    column = Column.query.get(task.column_id)
-    if not column or column.board_id != board_id:
+    task_data = serialize_task(row, TASK_CONTEXT_FIELDS + ('board_id',))
+    if task_data['board_id'] != board_id:
         return jsonify({'message': 'Задача не принадлежит указанной доске'}), 400
 
-    # Формируем детальную информацию о задаче
-    task_data = {
-        'id': task.id,
-        'code': task.code,
-        'title': task.title,
-        'description': task.description,
-        'priority': task.priority,
-        'status': task.status,
-        'column_id': task.column_id,
-        'column_name': column.name,
-        'estimated_time': task.estimated_time,
-        'remaining_time': task.remaining_time,
-        'spent_time': task.spent_time,
-        'author_id': task.author_id,
-        'author': task.author.username if task.author else None,
-        'assignee_id': task.assignee_id,
-        'assignee': task.assignee.username if task.assignee else None,
-        'created_at': task.created_at.isoformat(),
-        'updated_at': task.updated_at.isoformat(),
-        'started_at': task.started_at.isoformat() if task.started_at else None,
-        'completed_at': task.completed_at.isoformat() if task.completed_at else None,
-        'board_id': board_id,
-        'project_id': board.project_id,
-        'project_name': board.project.name if board.project else None
-    }
+    # Добавляем информацию о проекте
+    task_data['project_id'] = board.project_id
+    task_data['project_name'] = board.project.name if board.project else None
+
+    if includes:
+        task_data['included'] = build_included(includes, board_id, row)
 
     return jsonify(task_data), 200
 
@@ -567,24 +456,19 @@ def update_task_estimate(task_id):
 
     return jsonify({
         'message': 'Оценка времени успешно обновлена',
-        'task': {
-            'id': task.id,
-            'code': task.code,
-            'title': task.title,
-            'priority': task.priority,
-            'status': task.status,
-            'estimated_time': task.estimated_time,
-            'remaining_time': task.remaining_time,
-            'spent_time': task.spent_time,
-            'updated_at': task.updated_at.isoformat()
-        }
+        'task': serialize_task(task_tuple(task), TASK_ESTIMATE_FIELDS)
     }), 200
 
 
 @tasks_bp.route('/<int:task_id>/time-logs', methods=['GET'])
 @auth_required
+@read_replica
 def get_task_time_logs(task_id):
-    """Получение истории логирования времени для задачи"""
+    """Получение истории логирования времени для задачи.
+
+    С параметрами cursor/limit — постраничная выдача по курсору (created_at, id)
+    без подсчета общего числа записей; иначе — прежняя пагинация page/per_page.
+    """
     task = Task.query.get(task_id)
 
     if not task:
@@ -592,40 +476,36 @@ def get_task_time_logs(task_id):
     
     # Получение параметров фильтрации
     args = request.args
-    
-    # Базовый запрос
-    query = TimeLog.query.filter_by(task_id=task_id)
-    
-    # Фильтр по пользователю (для кого залогировано время)
-    if 'user_id' in args:
-        query = query.filter(TimeLog.user_id == args['user_id'])
-    
-    # Фильтр по логировщику (кто залогировал время)
-    if 'logged_by_id' in args:
-        query = query.filter(TimeLog.logged_by_id == args['logged_by_id'])
-    
-    # Фильтр по дате (с)
-    if 'from_date' in args:
+
+    # Сортировка по дате (по умолчанию - от новых к старым)
+    descending = args.get('sort', 'desc').lower() != 'asc'
+
+    task_info = {
+        'id': task.id,
+        'code': task.code,
+        'title': task.title,
+        'total_spent_time': task.spent_time
+    }
+
+    # Постраничная выдача по курсору
+    if 'cursor' in args or 'limit' in args:
+        query = time_log_entry_select().where(TimeLog.task_id == task_id, *_time_log_filters(args))
         try:
-            from_date = datetime.fromisoformat(args['from_date'])
-            query = query.filter(TimeLog.created_at >= from_date)
-        except ValueError:
-            pass
+            response = _time_log_page(query, args, descending)
+        except ValueError as error:
+            return jsonify({'message': str(error)}), 400
+        response['task'] = task_info
+        return jsonify(response), 200
     
-    # Фильтр по дате (по)
-    if 'to_date' in args:
-        try:
-            to_date = datetime.fromisoformat(args['to_date'])
-            query = query.filter(TimeLog.created_at <= to_date)
-        except ValueError:
-            pass
+    # Базовый запрос (пользователи загружаются вместе с записями)
+    query = TimeLog.query.options(
+        joinedload(TimeLog.user), joinedload(TimeLog.logger)
+    ).filter_by(task_id=task_id).filter(*_time_log_filters(args))
     
-    # Сортировка по дате (по умолчанию - от новых к старым)
-    sort_order = args.get('sort', 'desc').lower()
-    if sort_order == 'asc':
-        query = query.order_by(TimeLog.created_at.asc())
-    else:
+    if descending:
         query = query.order_by(TimeLog.created_at.desc())
+    else:
+        query = query.order_by(TimeLog.created_at.asc())
     
     # Пагинация
     page = int(args.get('page', 1))
@@ -659,19 +539,114 @@ def get_task_time_logs(task_id):
             'current_page': page,
             'total_pages': time_logs_paginated.pages
         },
-        'task': {
-            'id': task.id,
-            'code': task.code,
-            'title': task.title,
-            'total_spent_time': task.spent_time
-        }
+        'task': task_info
     }
     
     return jsonify(response), 200
 
 
+@tasks_bp.route('/time-logs', methods=['GET'])
+@auth_required
+@read_replica
+def get_time_log_feed():
+    """
+    Лента записей времени по всем задачам (табели): по пользователю (user_id)
+    или проекту (project_id), постранично по курсору.
+    Исполнитель может запросить только собственные записи.
+    """
+    args = request.args
+
+    if 'user_id' not in args and 'project_id' not in args:
+        return jsonify({'message': 'Укажите user_id или project_id'}), 400
+
+    if current_role() != 'manager' and args.get('user_id') != str(get_jwt_identity()):
+        return jsonify({'message': 'Доступ запрещен. Можно просматривать только свои записи.'}), 403
+
+    query = time_log_entry_select().where(*_time_log_filters(args))
+
+    # Фильтры по проекту и доске через колонки задач
+    if 'project_id' in args:
+        query = query.where(Task.column_id.in_(
+            select(Column.id).join(Board, Column.board_id == Board.id).where(Board.project_id == args['project_id'])
+        ))
+    if 'board_id' in args:
+        query = query.where(Task.column_id.in_(select(Column.id).where(Column.board_id == args['board_id'])))
+
+    try:
+        response = _time_log_page(query, args, args.get('sort', 'desc').lower() != 'asc', with_task=True)
+    except ValueError as error:
+        return jsonify({'message': str(error)}), 400
+
+    return jsonify(response), 200
+
+
+def _time_log_filters(args):
+    """Условия на записи времени: пользователь, логировщик и период"""
+    conditions = []
+
+    # Фильтр по пользователю (для кого залогировано время)
+    if 'user_id' in args:
+        conditions.append(TimeLog.user_id == args['user_id'])
+
+    # Фильтр по логировщику (кто залогировал время)
+    if 'logged_by_id' in args:
+        conditions.append(TimeLog.logged_by_id == args['logged_by_id'])
+
+    # Фильтр по дате (с / по)
+    for name, compare in (('from_date', TimeLog.created_at.__ge__), ('to_date', TimeLog.created_at.__le__)):
+        if name in args:
+            try:
+                conditions.append(compare(datetime.fromisoformat(args[name])))
+            except ValueError:
+                pass
+
+    return conditions
+
+
+def _time_log_page(query, args, descending, with_task=False):
+    """Страница записей времени по курсору; некорректные параметры — ValueError"""
+    try:
+        limit = min(max(int(args.get('limit', DEFAULT_TIME_LOG_LIMIT)), 1), MAX_TIME_LOG_LIMIT)
+    except ValueError:
+        raise ValueError('Параметр limit должен быть числом')
+
+    query = keyset_page(query, TimeLog.created_at, TimeLog.id, args.get('cursor'), descending)
+
+    # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+    rows = fetch_time_log_entries(query.limit(limit + 1))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    time_logs = []
+    for row in rows:
+        entry = {
+            'id': row.id,
+            'task_id': row.task_id,
+            'user': {'id': row.user_id, 'username': row.username},
+            'logged_by': {'id': row.logged_by_id, 'username': row.logged_by_username},
+            'spent_hours': row.spent_hours,
+            'remaining_hours': row.remaining_hours,
+            'comment': row.comment,
+            'created_at': row.created_at.isoformat()
+        }
+        if with_task:
+            entry['task'] = {'id': row.task_id, 'code': row.task_code, 'title': row.task_title}
+        time_logs.append(entry)
+
+    return {
+        'time_logs': time_logs,
+        'pagination': {
+            'limit': limit,
+            'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        }
+    }
+
+
 @tasks_bp.route('/time-summary', methods=['GET'])
+@request_class(REPORT)
+@statement_timeout('REPORT_STATEMENT_TIMEOUT_MS')
 @auth_required
+@read_replica
 def get_time_summary():
     """
     Получение сводной информации о затраченном времени по задачам.
@@ -758,6 +733,11 @@ def get_time_summary():
     
     # Выполнение запроса
     summary = time_logs.all()
+
+    # Архивные записи времени (include_archived=true) суммируются с живыми
+    include_archived = args.get('include_archived', '').lower() == 'true'
+    if include_archived:
+        summary = _merge_time_summary(summary, _archived_time_summary(args))
     
     # Формирование результата
     result = []
@@ -776,6 +756,123 @@ def get_time_summary():
             'board_id': args.get('board_id'),
             'user_id': args.get('user_id'),
             'from_date': args.get('from_date'),
-            'to_date': args.get('to_date')
+            'to_date': args.get('to_date'),
+            'include_archived': include_archived
+        }
+    }), 200
+
+
+def _archived_time_summary(args):
+    """Сводка по архивным записям времени с теми же фильтрами, что и get_time_summary"""
+    query = db.session.query(
+        ArchivedTimeLog.user_id,
+        User.username,
+        db.func.sum(ArchivedTimeLog.spent_hours),
+        db.func.count(ArchivedTimeLog.id)
+    ).join(
+        User, ArchivedTimeLog.user_id == User.id
+    ).join(
+        ArchivedTask, ArchivedTimeLog.task_id == ArchivedTask.id
+    )
+
+    if 'project_id' in args:
+        query = query.filter(ArchivedTask.project_id == args['project_id'])
+    if 'board_id' in args:
+        query = query.filter(ArchivedTask.board_id == args['board_id'])
+    if 'user_id' in args:
+        query = query.filter(ArchivedTimeLog.user_id == args['user_id'])
+    for name, compare in (('from_date', ArchivedTimeLog.created_at.__ge__),
+                          ('to_date', ArchivedTimeLog.created_at.__le__)):
+        if name in args:
+            try:
+                query = query.filter(compare(datetime.fromisoformat(args[name])))
+            except ValueError:
+                pass
+
+    return query.group_by(ArchivedTimeLog.user_id, User.username).all()
+
+
+def _merge_time_summary(*summaries):
+    """Складывает сводки по пользователям и сортирует по затраченному времени"""
+    totals = {}
+    for summary in summaries:
+        for user_id, username, total_spent_hours, log_count in summary:
+            spent, count = totals.get((user_id, username), (0, 0))
+            totals[(user_id, username)] = (spent + (total_spent_hours or 0), count + log_count)
+
+    return sorted(
+        ((user_id, username, spent, count) for (user_id, username), (spent, count) in totals.items()),
+        key=lambda row: row[2], reverse=True
+    )
+
+
+@tasks_bp.route('/workload', methods=['GET'])
+@request_class(REPORT)
+@statement_timeout('REPORT_STATEMENT_TIMEOUT_MS')
+@manager_required
+@read_replica
+def get_workload():
+    """
+    Загрузка исполнителей: оставшееся, оцененное и затраченное время
+    по исполнителям, проектам и колонкам. Только для менеджеров.
+    Поддерживает те же фильтры, что и список задач.
+    """
+    args = request.args
+
+    # Один сгруппированный запрос; дальше только раскладка строк по уровням
+    rows = fetch_workload(task_filters(args, get_jwt_identity()))
+
+    assignees = {}
+    for row in rows:
+        assignee = assignees.get(row.assignee_id)
+        if assignee is None:
+            assignee = assignees[row.assignee_id] = {
+                'assignee_id': row.assignee_id,
+                'username': row.username,
+                'task_count': 0,
+                'remaining_time': 0.0,
+                'estimated_time': 0.0,
+                'spent_time': 0.0,
+                'projects': {}
+            }
+        project = assignee['projects'].get(row.project_id)
+        if project is None:
+            project = assignee['projects'][row.project_id] = {
+                'project_id': row.project_id,
+                'project_name': row.project_name,
+                'task_count': 0,
+                'remaining_time': 0.0,
+                'estimated_time': 0.0,
+                'spent_time': 0.0,
+                'columns': []
+            }
+        project['columns'].append({
+            'column_id': row.column_id,
+            'column_name': row.column_name,
+            'task_count': row.task_count,
+            'remaining_time': float(row.remaining_time),
+            'estimated_time': float(row.estimated_time),
+            'spent_time': float(row.spent_time)
+        })
+        for totals in (assignee, project):
+            totals['task_count'] += row.task_count
+            totals['remaining_time'] += float(row.remaining_time)
+            totals['estimated_time'] += float(row.estimated_time)
+            totals['spent_time'] += float(row.spent_time)
+
+    # Сортировка по оставшемуся времени (по убыванию)
+    workload = sorted(assignees.values(), key=lambda item: item['remaining_time'], reverse=True)
+    for assignee in workload:
+        assignee['projects'] = sorted(assignee['projects'].values(),
+                                      key=lambda item: item['remaining_time'], reverse=True)
+        for project in assignee['projects']:
+            project['columns'].sort(key=lambda item: item['column_id'])
+
+    return jsonify({
+        'workload': workload,
+        'filters_applied': {
+            name: args.get(name)
+            for name in ('priority', 'author_id', 'assignee_id', 'my_tasks', 'project_id', 'board_id',
+                         'column_id', 'created_from', 'created_to')
         }
-    }), 200
\ No newline at end of file
+    }), 200
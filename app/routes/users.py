@@ -1,27 +1,105 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, make_response, request
+from sqlalchemy import func, or_, select
+from app import db
 from app.models import User
+from app.database import read_replica
+from app.read_models import fetch_users, user_select
 from app.utils import auth_required, manager_required
 
 users_bp = Blueprint('users', __name__)
 
+# Размер страницы списка пользователей и максимальное число id в пакетном запросе
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+MAX_BATCH_IDS = 500
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 
 @users_bp.route('/', methods=['GET'])
 @auth_required
+@read_replica
 def get_users():
-    """Получение списка всех пользователей"""
-    users = User.query.all()
-    users_list = [{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'role': user.role.name
-    } for user in users]
+    """Получение списка пользователей.
+
+    Без параметров возвращает всех пользователей. Параметры:
+    ids=1,2,3 — пакетная загрузка по id; q — поиск по началу имени или почты;
+    after_id и limit — постраничная выдача по возрастанию id.
+    """
+    args = request.args
+
+    # Пакетная загрузка по списку id одним запросом
+    if 'ids' in args:
+        try:
+            ids = {int(value) for value in args['ids'].split(',') if value.strip()}
+        except ValueError:
+            return jsonify({'message': 'Параметр ids должен быть списком чисел через запятую'}), 400
+        if len(ids) > MAX_BATCH_IDS:
+            return jsonify({'message': f'Можно запросить не более {MAX_BATCH_IDS} пользователей'}), 400
+
+        users = fetch_users(user_select().where(User.id.in_(ids)).order_by(User.id)) if ids else []
+        return jsonify({'users': [user._asdict() for user in users]}), 200
+
+    # Список целиком (прежнее поведение)
+    if not any(name in args for name in ('q', 'after_id', 'limit')):
+        users = fetch_users()
+        return jsonify({'users': [user._asdict() for user in users]}), 200
+
+    try:
+        after_id = int(args.get('after_id', 0))
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'message': 'Параметры after_id и limit должны быть числами'}), 400
+
+    query = user_select().where(User.id > after_id)
+
+    # Поиск по началу имени или почты (индексы по lower(username) и lower(email))
+    if args.get('q'):
+        prefix = _escape_like(args['q'].lower()) + '%'
+        query = query.where(or_(
+            func.lower(User.username).like(prefix, escape='\\'),
+            func.lower(User.email).like(prefix, escape='\\')
+        ))
+
+    # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+    users = fetch_users(query.order_by(User.id).limit(limit + 1))
+    has_more = len(users) > limit
+    users = users[:limit]
+
+    return jsonify({
+        'users': [user._asdict() for user in users],
+        'pagination': {
+            'limit': limit,
+            'next_after_id': users[-1].id if has_more else None
+        }
+    }), 200
+
+
+@users_bp.route('/directory', methods=['GET'])
+@auth_required
+@read_replica
+def get_user_directory():
+    """Справочник id → имя пользователя с поддержкой ETag"""
+    # Версия справочника по количеству и максимальному id: пользователи только добавляются
+    count, max_id = db.session.execute(select(func.count(User.id), func.max(User.id))).one()
+    etag = f'users-{count}-{max_id or 0}'
+
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        users = db.session.execute(select(User.id, User.username)).all()
+        response = jsonify({'users': {user_id: username for user_id, username in users}})
 
-    return jsonify({'users': users_list}), 200
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
 @auth_required
+@read_replica
 def get_user(user_id):
     """Получение конкретного пользователя по ID"""
     user = User.query.get(user_id)
@@ -37,4 +115,4 @@ def get_user(user_id):
         'created_at': user.created_at.isoformat()
     }
 
-    return jsonify(user_data), 200
\ No newline at end of file
+    return jsonify(user_data), 200
@@ -0,0 +1,162 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, select
+from app import db
+from app.models import Project, Webhook, WebhookEvent
+from app.webhooks import EVENTS
+from app.utils import manager_required
+
+webhooks_bp = Blueprint('webhooks', __name__)
+
+# Размер страницы событий вебхука
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+def _serialize_webhook(webhook):
+    return {
+        'id': webhook.id,
+        'url': webhook.url,
+        'events': webhook.events.split(','),
+        'project_id': webhook.project_id,
+        'is_active': webhook.is_active,
+        'has_secret': bool(webhook.secret),
+        'created_by_id': webhook.created_by_id,
+        'created_at': webhook.created_at
+    }
+
+
+def _refresh_subscriptions():
+    # Остальные процессы увидят изменения не позже чем через WEBHOOK_SUBSCRIPTION_TTL
+    subscriptions = current_app.extensions.get('webhook_subscriptions')
+    if subscriptions is not None:
+        subscriptions.clear()
+
+
+@webhooks_bp.route('/', methods=['GET'])
+@manager_required
+def get_webhooks():
+    """Список вебхуков (только менеджеры)"""
+    webhooks = Webhook.query.order_by(Webhook.id).all()
+
+    return jsonify({'webhooks': [_serialize_webhook(webhook) for webhook in webhooks]}), 200
+
+
+@webhooks_bp.route('/', methods=['POST'])
+@manager_required
+def create_webhook():
+    """Создание вебхука (только менеджеры)"""
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict) or not data.get('url') or not data.get('events'):
+        return jsonify({'message': 'Адрес (url) и события (events) обязательны'}), 400
+
+    if not isinstance(data['url'], str) or not data['url'].startswith(('http://', 'https://')):
+        return jsonify({'message': 'Адрес вебхука должен начинаться с http:// или https://'}), 400
+
+    events = data['events']
+    if not isinstance(events, list) or not set(events) <= set(EVENTS):
+        return jsonify({'message': f'Допустимые события: {", ".join(EVENTS)}'}), 400
+
+    # Проверка существования проекта (без проекта — все проекты)
+    project_id = data.get('project_id')
+    if project_id is not None:
+        if not isinstance(project_id, int) or isinstance(project_id, bool):
+            return jsonify({'message': 'project_id должен быть числом'}), 400
+        if db.session.get(Project, project_id) is None:
+            return jsonify({'message': 'Указанный проект не существует'}), 404
+
+    webhook = Webhook(
+        url=data['url'],
+        secret=data.get('secret') or None,
+        events=','.join(sorted(set(events))),
+        project_id=project_id,
+        is_active=True,
+        created_by_id=int(get_jwt_identity())
+    )
+
+    db.session.add(webhook)
+    db.session.commit()
+    _refresh_subscriptions()
+
+    return jsonify({
+        'message': 'Вебхук успешно создан',
+        'webhook': _serialize_webhook(webhook)
+    }), 201
+
+
+@webhooks_bp.route('/<int:webhook_id>', methods=['PUT'])
+@manager_required
+def update_webhook(webhook_id):
+    """Включение и отключение вебхука (только менеджеры)"""
+    webhook = db.session.get(Webhook, webhook_id)
+
+    if not webhook:
+        return jsonify({'message': 'Вебхук не найден'}), 404
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'is_active' not in data:
+        return jsonify({'message': 'Укажите is_active'}), 400
+    if not isinstance(data['is_active'], bool):
+        return jsonify({'message': 'Поле is_active должно быть true или false'}), 400
+    webhook.is_active = data['is_active']
+
+    db.session.commit()
+    _refresh_subscriptions()
+
+    return jsonify({
+        'message': 'Вебхук успешно обновлен',
+        'webhook': _serialize_webhook(webhook)
+    }), 200
+
+
+@webhooks_bp.route('/<int:webhook_id>', methods=['DELETE'])
+@manager_required
+def delete_webhook(webhook_id):
+    """Удаление вебхука вместе с его недоставленными событиями (только менеджеры)"""
+    webhook = db.session.get(Webhook, webhook_id)
+
+    if not webhook:
+        return jsonify({'message': 'Вебхук не найден'}), 404
+
+    db.session.execute(delete(WebhookEvent).where(WebhookEvent.webhook_id == webhook_id))
+    db.session.delete(webhook)
+    db.session.commit()
+    _refresh_subscriptions()
+
+    return jsonify({'message': 'Вебхук успешно удален'}), 200
+
+
+@webhooks_bp.route('/<int:webhook_id>/events', methods=['GET'])
+@manager_required
+def get_webhook_events(webhook_id):
+    """События вебхука от новых к старым со статусом доставки (before_id, limit, status)"""
+    args = request.args
+
+    try:
+        before_id = int(args['before_id']) if 'before_id' in args else None
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'message': 'Параметры before_id и limit должны быть числами'}), 400
+
+    query = select(
+        WebhookEvent.id, WebhookEvent.event, WebhookEvent.status, WebhookEvent.attempts,
+        WebhookEvent.next_attempt_at, WebhookEvent.last_error, WebhookEvent.created_at, WebhookEvent.delivered_at
+    ).where(WebhookEvent.webhook_id == webhook_id)
+    if before_id is not None:
+        query = query.where(WebhookEvent.id < before_id)
+    if 'status' in args:
+        query = query.where(WebhookEvent.status == args['status'])
+
+    # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+    events = db.session.execute(query.order_by(WebhookEvent.id.desc()).limit(limit + 1)).all()
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    return jsonify({
+        'events': [event._asdict() for event in events],
+        'pagination': {
+            'limit': limit,
+            'next_before_id': events[-1].id if has_more else None
+        }
+    }), 200
@@ -0,0 +1,176 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+from app.models import Column, Task, User
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+# Строка задачи — кортеж значений в порядке TASK_COLUMNS. Строки получаются
+# запросом только нужных столбцов (task_select) или из модели (task_tuple).
+TASK_COLUMNS = (
+    'id', 'code', 'title', 'description', 'priority', 'status', 'column_id', 'column_name', 'board_id',
+    'estimated_time', 'remaining_time', 'spent_time', 'author_id', 'author', 'assignee_id', 'assignee',
+    'created_at', 'updated_at', 'started_at', 'completed_at'
+)
+
+# Наборы полей задачи в ответах эндпоинтов
+TASK_LIST_FIELDS = (
+    'id', 'code', 'title', 'description', 'priority', 'status', 'estimated_time', 'remaining_time', 'spent_time',
+    'author', 'assignee', 'created_at', 'updated_at', 'started_at', 'completed_at'
+)
+TASK_DETAIL_FIELDS = TASK_LIST_FIELDS + ('column_id', 'author_id', 'assignee_id')
+TASK_CONTEXT_FIELDS = TASK_DETAIL_FIELDS + ('column_name',)
+TASK_UPDATE_FIELDS = (
+    'id', 'code', 'title', 'description', 'priority', 'status', 'column_id', 'author_id', 'assignee_id',
+    'estimated_time', 'remaining_time', 'spent_time', 'updated_at', 'started_at', 'completed_at'
+)
+TASK_TIME_LOG_FIELDS = TASK_UPDATE_FIELDS + ('author', 'assignee')
+TASK_ESTIMATE_FIELDS = (
+    'id', 'code', 'title', 'priority', 'status', 'estimated_time', 'remaining_time', 'spent_time', 'updated_at'
+)
+BOARD_TASK_FIELDS = (
+    'id', 'code', 'title', 'priority', 'description', 'estimated_time', 'remaining_time', 'spent_time',
+    'author', 'author_id', 'assignee', 'assignee_id', 'status', 'created_at', 'updated_at', 'started_at',
+    'completed_at'
+)
+
+# Задачи в разделе included составного документа: пользователи только по id
+COMPOUND_TASK_FIELDS = (
+    'id', 'code', 'title', 'description', 'priority', 'status', 'column_id', 'author_id', 'assignee_id',
+    'estimated_time', 'remaining_time', 'spent_time', 'created_at', 'updated_at', 'started_at', 'completed_at'
+)
+
+COLUMN_COLUMNS = ('id', 'name', 'order', 'board_id', 'created_at')
+COLUMN_FIELDS = COLUMN_COLUMNS
+
+# Статус задачи без колонки (как у свойства Task.status)
+UNDEFINED_STATUS = 'Не определен'
+
+Author = aliased(User)
+Assignee = aliased(User)
+
+
+def task_select():
+    """SELECT строк задач (столбцы в порядке TASK_COLUMNS) с именами автора и исполнителя"""
+    return select(
+        Task.id, Task.code, Task.title, Task.description, Task.priority,
+        func.coalesce(Column.name, UNDEFINED_STATUS), Task.column_id, Column.name, Column.board_id,
+        Task.estimated_time, Task.remaining_time, Task.spent_time,
+        Task.author_id, Author.username, Task.assignee_id, Assignee.username,
+        Task.created_at, Task.updated_at, Task.started_at, Task.completed_at
+    ).outerjoin(
+        Column, Task.column_id == Column.id
+    ).outerjoin(
+        Author, Task.author_id == Author.id
+    ).outerjoin(
+        Assignee, Task.assignee_id == Assignee.id
+    )
+
+
+def task_tuple(task, author=None, assignee=None, column=None):
+    """Строка задачи из модели; связанные объекты можно передать, чтобы не загружать их повторно"""
+    author = author or task.author
+    assignee = assignee or (task.assignee if task.assignee_id else None)
+    column = column or task.column
+    return (
+        task.id, task.code, task.title, task.description, task.priority,
+        column.name if column else UNDEFINED_STATUS, task.column_id,
+        column.name if column else None, column.board_id if column else None,
+        task.estimated_time, task.remaining_time, task.spent_time,
+        task.author_id, author.username if author else None,
+        task.assignee_id, assignee.username if assignee else None,
+        task.created_at, task.updated_at, task.started_at, task.completed_at
+    )
+
+
+def column_select():
+    """SELECT строк колонок (столбцы в порядке COLUMN_COLUMNS)"""
+    return select(Column.id, Column.name, Column.order, Column.board_id, Column.created_at)
+
+
+def column_tuple(column):
+    return column.id, column.name, column.order, column.board_id, column.created_at
+
+
+def _row_serializer(columns, fields):
+    # Индексы полей вычисляются один раз на набор полей, а не на каждую строку
+    indexes = [columns.index(field) for field in fields]
+
+    def serialize(row):
+        return dict(zip(fields, [row[index] for index in indexes]))
+
+    return serialize
+
+
+def serialize_tasks(rows, fields=TASK_LIST_FIELDS):
+    """Список задач; даты остаются datetime и кодируются JSON-провайдером"""
+    serialize = _row_serializer(TASK_COLUMNS, fields)
+    return [serialize(row) for row in rows]
+
+
+def serialize_task(row, fields=TASK_DETAIL_FIELDS):
+    return _row_serializer(TASK_COLUMNS, fields)(row)
+
+
+def serialize_columns(rows, fields=COLUMN_FIELDS):
+    serialize = _row_serializer(COLUMN_COLUMNS, fields)
+    return [serialize(row) for row in rows]
+
+
+def serialize_column(row, fields=COLUMN_FIELDS):
+    return _row_serializer(COLUMN_COLUMNS, fields)(row)
+
+
+def _default(value):
+    """Типы, которые не кодируются напрямую"""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Кодирует объект в JSON (bytes): orjson, если установлен, иначе стандартный json.
+
+    Ключи сортируются, даты кодируются в ISO 8601, как раньше через isoformat().
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON-провайдер приложения на orjson (со стандартным json как запасным вариантом)"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime
+from flask import current_app, g
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import select
+
+# Клеймы токена: роль пользователя и версия токенов
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+
+# Флаг в g: отзыв токена проверит вызывающий код (асинхронный режим, app.asgi)
+DEFER_REVOCATION_CHECK = 'defer_revocation_check'
+
+
+class BloomFilter:
+    """Фильтр Блума: без ложноотрицательных ответов, с редкими ложноположительными"""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def version_key(user_id, version):
+    """Ключ отзыва всех токенов пользователя с указанной версией"""
+    return f'uv:{user_id}:{version}'
+
+
+def revocation_keys(payload, identity_claim=None):
+    """Ключи, по которым может быть отозван токен"""
+    keys = [payload['jti']]
+    if VERSION_CLAIM in payload:
+        identity_claim = identity_claim or current_app.config['JWT_IDENTITY_CLAIM']
+        keys.append(version_key(payload[identity_claim], payload[VERSION_CLAIM]))
+    return keys
+
+
+def role_select(user_id):
+    """Роль пользователя (для старых токенов без клейма роли)"""
+    from app.models import Role, User
+
+    return select(Role.name).join(User, User.role_id == Role.id).where(User.id == int(user_id))
+
+
+class RevocationList:
+    """Список отзыва с фильтром Блума в памяти процесса.
+
+    Фильтр перестраивается из таблицы revoked_tokens не чаще, чем раз в
+    refresh_seconds; БД запрашивается только при срабатывании фильтра.
+    Отзывы из других процессов становятся видны после перестроения.
+    """
+
+    def __init__(self, capacity, error_rate, refresh_seconds, identity_claim='sub'):
+        self.identity_claim = identity_claim
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.filter = BloomFilter(capacity, error_rate)
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+
+    def needs_refresh(self):
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > self.refresh_seconds
+
+    def rebuild(self, keys):
+        keys = list(keys)
+        bloom = BloomFilter(max(self.capacity, len(keys) * 2), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        self.filter = bloom
+        self.refreshed_at = time.monotonic()
+
+    def add(self, key):
+        self.filter.add(key)
+
+    def suspects(self, keys):
+        """Ключи, которые могут быть отозваны (требуют проверки в БД)"""
+        return [key for key in keys if key in self.filter]
+
+    @staticmethod
+    def _active_keys():
+        from app.models import RevokedToken
+
+        return select(RevokedToken.key).where(RevokedToken.expires_at > datetime.utcnow())
+
+    def refresh(self):
+        from app import db
+
+        with self._lock:
+            if self.needs_refresh():
+                self.rebuild(db.session.execute(self._active_keys()).scalars())
+
+    def check_plan(self, payload):
+        """План проверки отзыва (app.database.run_plan): True, если токен отозван"""
+        from app.models import RevokedToken
+
+        if self.needs_refresh():
+            self.rebuild((yield self._active_keys()).scalars())
+
+        suspects = self.suspects(revocation_keys(payload, self.identity_claim))
+        if not suspects:
+            return False
+        return (yield select(RevokedToken.id).where(RevokedToken.key.in_(suspects)).limit(1)).first() is not None
+
+    def is_revoked(self, payload):
+        from app.database import run_plan
+
+        # Перестроение фильтра — под блокировкой, чтобы его не выполняли все потоки сразу
+        if self.needs_refresh():
+            self.refresh()
+        return run_plan(self.check_plan(payload))
+
+
+def revocation_list():
+    return current_app.extensions['revocation_list']
+
+
+def issue_tokens(user, refresh=True):
+    """Создает access- (и refresh-) токен с ролью и версией токенов в клеймах"""
+    claims = {ROLE_CLAIM: user.role.name, VERSION_CLAIM: user.token_version}
+    tokens = {'access_token': create_access_token(identity=str(user.id), additional_claims=claims)}
+    if refresh:
+        tokens['refresh_token'] = create_refresh_token(identity=str(user.id), additional_claims=claims)
+    return tokens
+
+
+def revoke(key, expires_at):
+    """Добавляет ключ в список отзыва (коммит выполняет вызывающий код)"""
+    from app import db
+    from app.models import RevokedToken
+
+    if RevokedToken.query.filter_by(key=key).first() is None:
+        db.session.add(RevokedToken(key=key, expires_at=expires_at))
+    revocation_list().add(key)
+
+
+def revoke_token(payload):
+    """Отзывает конкретный токен до истечения его срока"""
+    revoke(payload['jti'], datetime.utcfromtimestamp(payload['exp']))
+
+
+def revoke_all_tokens(user):
+    """Отзывает все выданные пользователю токены, увеличивая версию"""
+    expires_at = datetime.utcnow() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    revoke(version_key(str(user.id), user.token_version), expires_at)
+    user.token_version += 1
+
+
+def purge_expired():
+    """Удаляет записи об отзыве токенов, срок которых уже истек"""
+    from app import db
+    from app.models import RevokedToken
+
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return deleted
+
+
+def init_tokens(app, jwt):
+    """Подключает проверку отзыва токенов"""
+    app.extensions['revocation_list'] = RevocationList(
+        capacity=app.config['JWT_REVOCATION_FILTER_CAPACITY'],
+        error_rate=app.config['JWT_REVOCATION_FILTER_ERROR_RATE'],
+        refresh_seconds=app.config['JWT_REVOCATION_REFRESH_SECONDS'],
+        identity_claim=app.config['JWT_IDENTITY_CLAIM']
+    )
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        # Асинхронный режим (app.asgi) проверяет отзыв сам, через асинхронное соединение
+        if g.get(DEFER_REVOCATION_CHECK):
+            return False
+        return revocation_list().is_revoked(jwt_payload)
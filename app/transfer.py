@@ -0,0 +1,462 @@
+import csv
+import io
+import struct
+import zlib
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import DateTime, func, insert, select, text, union
+from app import db
+from app.audit import record_inserted
+from app.models import ArchivedTask, ArchivedTimeLog, Board, Column, Project, Role, Task, TimeLog, User
+from app.serializers import _default, dumps, loads
+
+try:
+    import msgpack
+except ImportError:  # msgpack не установлен — кадры в JSON
+    msgpack = None
+
+# Архив проекта — поток gzip: заголовок MAGIC + кодек (b'm' — msgpack, b'j' — JSON),
+# затем кадры «длина (4 байта, big-endian) + [вид, столбцы, строки]». Строки кадра —
+# списки значений в порядке столбцов, даты — строки ISO 8601. Последний кадр
+# ('end') содержит число строк каждого вида и защищает от обрезанных архивов.
+MAGIC = b'TMX1'
+FRAME_HEADER = struct.Struct('>I')
+READ_CHUNK = 64 * 1024
+# Кадры идут строго в этом порядке: строкам нужны id из предыдущих кадров
+KINDS = ('project', 'users', 'boards', 'columns', 'tasks', 'time_logs', 'archived_tasks', 'archived_time_logs', 'end')
+
+# Выгружаемые столбцы
+PROJECT_COLUMNS = ('id', 'name', 'code', 'description', 'created_at')
+USER_COLUMNS = ('id', 'username', 'email', 'role', 'created_at')
+BOARD_COLUMNS = ('id', 'name', 'created_at')
+COLUMN_COLUMNS = ('id', 'name', 'order', 'board_id', 'created_at')
+TASK_COLUMNS = (
+    'id', 'code', 'title', 'description', 'priority', 'estimated_time', 'remaining_time', 'spent_time',
+    'author_id', 'assignee_id', 'column_id', 'created_at', 'updated_at', 'started_at', 'completed_at'
+)
+TIME_LOG_COLUMNS = ('task_id', 'user_id', 'logged_by_id', 'spent_hours', 'remaining_hours', 'comment', 'created_at')
+# Архивные задачи (app.archive) хранят историю и занятые коды задач проекта
+ARCHIVED_TASK_COLUMNS = (
+    'id', 'code', 'title', 'description', 'priority', 'estimated_time', 'remaining_time', 'spent_time',
+    'author_id', 'assignee_id', 'board_id', 'column_id', 'column_name',
+    'created_at', 'updated_at', 'started_at', 'completed_at', 'archived_at'
+)
+ARCHIVED_TIME_LOG_COLUMNS = (
+    'id', 'task_id', 'user_id', 'logged_by_id', 'spent_hours', 'remaining_hours', 'comment', 'created_at'
+)
+
+# Модель и столбцы каждого кадра: при импорте берутся только эти столбцы, остальные отбрасываются
+FRAMES = {
+    'project': (Project, PROJECT_COLUMNS),
+    'users': (User, USER_COLUMNS),
+    'boards': (Board, BOARD_COLUMNS),
+    'columns': (Column, COLUMN_COLUMNS),
+    'tasks': (Task, TASK_COLUMNS),
+    'time_logs': (TimeLog, TIME_LOG_COLUMNS),
+    'archived_tasks': (ArchivedTask, ARCHIVED_TASK_COLUMNS),
+    'archived_time_logs': (ArchivedTimeLog, ARCHIVED_TIME_LOG_COLUMNS)
+}
+
+# Пароли не выгружаются: созданные при импорте пользователи не смогут войти,
+# пока пароль не задан заново
+UNUSABLE_PASSWORD = '!'
+
+
+class ArchiveError(ValueError):
+    """Поврежденный или несовместимый архив проекта"""
+
+
+class ProjectCodeTaken(Exception):
+    """Проект с кодом из архива уже существует"""
+
+
+def _codec():
+    return b'm' if msgpack is not None else b'j'
+
+
+def _pack(codec, obj):
+    if codec == b'm':
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    return dumps(obj)
+
+
+def _unpack(codec, data):
+    if codec == b'm':
+        return msgpack.unpackb(data, raw=False)
+    return loads(data)
+
+
+def _project_tasks(project_id):
+    return select(Task.id).join(
+        Column, Task.column_id == Column.id
+    ).join(
+        Board, Column.board_id == Board.id
+    ).where(Board.project_id == project_id)
+
+
+def _export_queries(project_id):
+    """Запросы выгрузки в порядке кадров архива"""
+    task_ids = _project_tasks(project_id)
+    project_columns = select(Column.id).join(Board, Column.board_id == Board.id).where(
+        Board.project_id == project_id
+    )
+    archived_task_ids = select(ArchivedTask.id).where(ArchivedTask.project_id == project_id)
+    user_ids = union(
+        select(Task.author_id).where(Task.id.in_(task_ids)),
+        select(Task.assignee_id).where(Task.id.in_(task_ids), Task.assignee_id.isnot(None)),
+        select(TimeLog.user_id).where(TimeLog.task_id.in_(task_ids)),
+        select(TimeLog.logged_by_id).where(TimeLog.task_id.in_(task_ids)),
+        select(ArchivedTask.author_id).where(ArchivedTask.project_id == project_id),
+        select(ArchivedTask.assignee_id).where(ArchivedTask.project_id == project_id,
+                                               ArchivedTask.assignee_id.isnot(None)),
+        select(ArchivedTimeLog.user_id).where(ArchivedTimeLog.task_id.in_(archived_task_ids)),
+        select(ArchivedTimeLog.logged_by_id).where(ArchivedTimeLog.task_id.in_(archived_task_ids))
+    )
+
+    return (
+        ('project', PROJECT_COLUMNS, select(
+            Project.id, Project.name, Project.code, Project.description, Project.created_at
+        ).where(Project.id == project_id)),
+        ('users', USER_COLUMNS, select(
+            User.id, User.username, User.email, Role.name, User.created_at
+        ).join(Role, User.role_id == Role.id).where(User.id.in_(user_ids)).order_by(User.id)),
+        ('boards', BOARD_COLUMNS, select(
+            Board.id, Board.name, Board.created_at
+        ).where(Board.project_id == project_id).order_by(Board.id)),
+        ('columns', COLUMN_COLUMNS, select(
+            Column.id, Column.name, Column.order, Column.board_id, Column.created_at
+        ).where(Column.id.in_(project_columns)).order_by(Column.id)),
+        ('tasks', TASK_COLUMNS, select(*(getattr(Task, name) for name in TASK_COLUMNS)).where(
+            Task.column_id.in_(project_columns)
+        ).order_by(Task.id)),
+        ('time_logs', TIME_LOG_COLUMNS, select(*(getattr(TimeLog, name) for name in TIME_LOG_COLUMNS)).where(
+            TimeLog.task_id.in_(task_ids)
+        ).order_by(TimeLog.id)),
+        ('archived_tasks', ARCHIVED_TASK_COLUMNS, select(
+            *(getattr(ArchivedTask, name) for name in ARCHIVED_TASK_COLUMNS)
+        ).where(ArchivedTask.project_id == project_id).order_by(ArchivedTask.id)),
+        ('archived_time_logs', ARCHIVED_TIME_LOG_COLUMNS, select(
+            *(getattr(ArchivedTimeLog, name) for name in ARCHIVED_TIME_LOG_COLUMNS)
+        ).where(ArchivedTimeLog.task_id.in_(archived_task_ids)).order_by(ArchivedTimeLog.id))
+    )
+
+
+def export_project(project_id):
+    """Генератор архива проекта (чанки сжатых байт).
+
+    Строки читаются курсором пачками по EXPORT_BATCH_SIZE (yield_per;
+    на PostgreSQL — серверный курсор), поэтому память не зависит от
+    размера проекта. Вызывать внутри stream_with_context.
+    """
+    config = current_app.config
+    batch_size = config['EXPORT_BATCH_SIZE']
+    codec = _codec()
+    compressor = zlib.compressobj(config['EXPORT_COMPRESSION_LEVEL'], zlib.DEFLATED, 31)
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Согласованный снимок всех таблиц на время выгрузки: уровень изоляции
+        # задается до первого запроса транзакции
+        db.session.rollback()
+        db.session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+
+    def frame(kind, columns, rows):
+        payload = _pack(codec, [kind, columns, rows])
+        return compressor.compress(FRAME_HEADER.pack(len(payload)) + payload)
+
+    yield compressor.compress(MAGIC + codec)
+    counts = {}
+    for kind, columns, statement in _export_queries(project_id):
+        counts[kind] = 0
+        result = db.session.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            counts[kind] += len(rows)
+            data = frame(kind, columns, [tuple(row) for row in rows])
+            if data:
+                yield data
+    yield frame('end', ('counts',), [(counts,)]) + compressor.flush()
+    db.session.rollback()
+
+
+def read_frames(stream):
+    """Кадры архива из потока байт: (вид, столбцы, строки); читает поток по частям"""
+    decompressor = zlib.decompressobj(31)
+    buffer = bytearray()
+    eof = False
+
+    def fill(size):
+        nonlocal eof
+        while len(buffer) < size and not eof:
+            chunk = stream.read(READ_CHUNK)
+            if not chunk:
+                eof = True
+                buffer.extend(decompressor.flush())
+                break
+            try:
+                buffer.extend(decompressor.decompress(chunk))
+            except zlib.error as e:
+                raise ArchiveError(f'Архив поврежден: {e}') from e
+        return len(buffer) >= size
+
+    if not fill(len(MAGIC) + 1) or bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ArchiveError('Неизвестный формат архива')
+    codec = bytes(buffer[len(MAGIC):len(MAGIC) + 1])
+    if codec == b'm' and msgpack is None:
+        raise ArchiveError('Для импорта этого архива нужен пакет msgpack')
+    if codec not in (b'm', b'j'):
+        raise ArchiveError('Неизвестный кодек архива')
+    del buffer[:len(MAGIC) + 1]
+
+    while fill(FRAME_HEADER.size):
+        size, = FRAME_HEADER.unpack_from(buffer)
+        if not fill(FRAME_HEADER.size + size):
+            raise ArchiveError('Архив обрезан')
+        payload = bytes(buffer[FRAME_HEADER.size:FRAME_HEADER.size + size])
+        del buffer[:FRAME_HEADER.size + size]
+        try:
+            kind, columns, rows = _unpack(codec, payload)
+        except (TypeError, ValueError) as e:
+            raise ArchiveError(f'Архив поврежден: {e}') from e
+        yield kind, columns, rows
+
+    if buffer:
+        raise ArchiveError('Архив обрезан')
+
+
+def _copy_rows(connection, table, columns, rows):
+    """Загружает строки в таблицу PostgreSQL через COPY"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if row[name] is None else row[name] for name in columns])
+    buffer.seek(0)
+
+    column_list = ', '.join(f'"{name}"' for name in columns)
+    cursor = connection.connection.dbapi_connection.cursor()
+    cursor.copy_expert(f'COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+class ProjectImporter:
+    """Загрузка архива проекта в одной транзакции с переназначением id.
+
+    Доски, колонки и задачи вставляются пачками с RETURNING id (в порядке
+    строк), записи времени — executemany, на PostgreSQL — COPY. Коды задач
+    сохраняются; при смене кода проекта меняется только префикс. Архивные
+    задачи и записи времени получают новые id из тех же последовательностей,
+    что и живые (см. _archive_ids).
+    """
+
+    def __init__(self, code=None, name=None):
+        self.code = code
+        self.name = name
+        self.connection = db.session.connection()
+        self.use_copy = self.connection.dialect.name == 'postgresql'
+        self.project = None
+        self.old_code = None
+        self.maps = {'users': {}, 'boards': {}, 'columns': {}, 'tasks': {}, 'archived_tasks': {}}
+        self.counts = {kind: 0 for kind in KINDS[:-1]}
+
+    @staticmethod
+    def _records(kind, columns, rows):
+        """Строки кадра в виде словарей только с известными столбцами кадра"""
+        model, expected = FRAMES[kind]
+        if not isinstance(columns, list) or not isinstance(rows, list):
+            raise ArchiveError(f'{kind}: некорректный кадр')
+        missing = [name for name in expected if name not in columns]
+        if missing:
+            raise ArchiveError(f'{kind}: в архиве нет столбцов {", ".join(missing)}')
+
+        positions = [(name, columns.index(name)) for name in expected]
+        table_columns = model.__table__.c
+        dates = {name for name in expected if name in table_columns and isinstance(table_columns[name].type, DateTime)}
+        records = []
+        try:
+            for row in rows:
+                record = {name: row[index] for name, index in positions}
+                for name in dates:
+                    if record[name] is not None:
+                        record[name] = datetime.fromisoformat(record[name])
+                records.append(record)
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            raise ArchiveError(f'{kind}: некорректная строка ({e})') from e
+        return records
+
+    def _insert_returning(self, model, records):
+        """Вставляет строки и возвращает новые id в порядке строк"""
+        result = self.connection.execute(insert(model).returning(model.id, sort_by_parameter_order=True), records)
+        return result.scalars().all()
+
+    def _archive_ids(self, live_model, count):
+        """Новые id архивных строк.
+
+        Архивная строка сохраняет id живой (задача уходит в архив со своим id),
+        поэтому id выдаются из последовательности живой таблицы: на PostgreSQL —
+        nextval, на SQLite — выше максимума живой и архивной таблиц.
+        """
+        if self.connection.dialect.name == 'postgresql':
+            return self.connection.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+                {'table': live_model.__tablename__, 'count': count}
+            ).scalars().all()
+        archive_model = ArchivedTask if live_model is Task else ArchivedTimeLog
+        start = max(self.connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+                    for model in (live_model, archive_model))
+        return list(range(start + 1, start + count + 1))
+
+    def _remap(self, kind, record, column, target):
+        value = record[column]
+        if value is None:
+            return
+        try:
+            record[column] = self.maps[target][value]
+        except KeyError:
+            raise ArchiveError(f'{kind}: ссылка {column}={value} на отсутствующую запись') from None
+
+    def project_frame(self, records):
+        if len(records) != 1 or self.project is not None:
+            raise ArchiveError('В архиве должен быть ровно один проект')
+        record = records[0]
+        self.old_code = record['code']
+        code = (self.code or record['code']).upper()
+        if Project.query.filter_by(code=code).first():
+            raise ProjectCodeTaken(code)
+
+        self.project = Project(name=self.name or record['name'], code=code, description=record['description'],
+                               created_at=record['created_at'])
+        db.session.add(self.project)
+        db.session.flush()
+
+    def users_frame(self, records):
+        # Пользователи сопоставляются по имени, затем по почте; недостающие создаются
+        found = {}
+        for column in ('username', 'email'):
+            values = [record[column] for record in records if record['id'] not in found]
+            if not values:
+                continue
+            existing = dict(db.session.execute(select(getattr(User, column), User.id).where(
+                getattr(User, column).in_(values)
+            )).all())
+            for record in records:
+                if record['id'] not in found and record[column] in existing:
+                    found[record['id']] = existing[record[column]]
+
+        missing = [record for record in records if record['id'] not in found]
+        if missing:
+            roles = dict(db.session.execute(select(Role.name, Role.id)).all())
+            new_ids = self._insert_returning(User, [{
+                'username': record['username'],
+                'email': record['email'],
+                'password_hash': UNUSABLE_PASSWORD,
+                'role_id': roles.get(record['role'], roles.get('executor')),
+                'token_version': 0,
+                'created_at': record['created_at']
+            } for record in missing])
+            found.update(zip((record['id'] for record in missing), new_ids))
+        self.maps['users'].update(found)
+
+    def boards_frame(self, records):
+        new_ids = self._insert_returning(Board, [{
+            'name': record['name'], 'project_id': self.project.id, 'created_at': record['created_at']
+        } for record in records])
+        self.maps['boards'].update(zip((record['id'] for record in records), new_ids))
+
+    def columns_frame(self, records):
+        old_ids = [record.pop('id') for record in records]
+        for record in records:
+            self._remap('columns', record, 'board_id', 'boards')
+        self.maps['columns'].update(zip(old_ids, self._insert_returning(Column, records)))
+
+    def tasks_frame(self, records):
+        old_ids = [record.pop('id') for record in records]
+        prefix = self.project.code if self.project.code != self.old_code else None
+        for record in records:
+            self._remap('tasks', record, 'author_id', 'users')
+            self._remap('tasks', record, 'assignee_id', 'users')
+            self._remap('tasks', record, 'column_id', 'columns')
+            if prefix and record['code'].startswith(self.old_code):
+                record['code'] = prefix + record['code'][len(self.old_code):]
+        self.maps['tasks'].update(zip(old_ids, self._insert_returning(Task, records)))
+
+    def time_logs_frame(self, records):
+        # id записей времени не нужны — вставка без RETURNING
+        for record in records:
+            self._remap('time_logs', record, 'task_id', 'tasks')
+            self._remap('time_logs', record, 'user_id', 'users')
+            self._remap('time_logs', record, 'logged_by_id', 'users')
+        if self.use_copy:
+            _copy_rows(self.connection, TimeLog.__table__, TIME_LOG_COLUMNS, records)
+        else:
+            self.connection.execute(insert(TimeLog), records)
+
+    def archived_tasks_frame(self, records):
+        prefix = self.project.code if self.project.code != self.old_code else None
+        new_ids = self._archive_ids(Task, len(records))
+        for record, new_id in zip(records, new_ids):
+            self.maps['archived_tasks'][record['id']] = new_id
+            record['id'] = new_id
+            record['project_id'] = self.project.id
+            self._remap('archived_tasks', record, 'author_id', 'users')
+            self._remap('archived_tasks', record, 'assignee_id', 'users')
+            # Архив не ссылается на доски и колонки внешними ключами: удаленные
+            # доски и колонки остаются со старыми id
+            record['board_id'] = self.maps['boards'].get(record['board_id'], record['board_id'])
+            record['column_id'] = self.maps['columns'].get(record['column_id'], record['column_id'])
+            if prefix and record['code'].startswith(self.old_code):
+                record['code'] = prefix + record['code'][len(self.old_code):]
+        if records:
+            self.connection.execute(insert(ArchivedTask), records)
+
+    def archived_time_logs_frame(self, records):
+        new_ids = self._archive_ids(TimeLog, len(records))
+        for record, new_id in zip(records, new_ids):
+            record['id'] = new_id
+            self._remap('archived_time_logs', record, 'task_id', 'archived_tasks')
+            self._remap('archived_time_logs', record, 'user_id', 'users')
+            self._remap('archived_time_logs', record, 'logged_by_id', 'users')
+        if records:
+            self.connection.execute(insert(ArchivedTimeLog), records)
+
+    def load(self, frames):
+        """Загружает кадры архива; возвращает новый проект и число строк каждого вида"""
+        position = 0
+        for kind, columns, rows in frames:
+            if kind not in KINDS or KINDS.index(kind) < position:
+                raise ArchiveError(f'Неожиданный кадр архива: {kind}')
+            position = KINDS.index(kind)
+            if kind != 'project' and self.project is None:
+                raise ArchiveError('Архив должен начинаться с проекта')
+
+            if kind == 'end':
+                try:
+                    expected = rows[0][0]
+                except (IndexError, KeyError, TypeError):
+                    raise ArchiveError('Некорректный заголовок архива') from None
+                # В архивах, выгруженных до появления кадров архивных задач, их нет в заголовке
+                if not isinstance(expected, dict) or {**dict.fromkeys(self.counts, 0), **expected} != self.counts:
+                    raise ArchiveError('Число строк не совпадает с заголовком архива')
+                self._audit()
+                return self.project, self.counts
+
+            records = self._records(kind, columns, rows)
+            getattr(self, f'{kind}_frame')(records)
+            self.counts[kind] += len(records)
+
+        raise ArchiveError('Архив обрезан')
+
+    def _audit(self):
+        # Доски, колонки и задачи вставлены запросами Core, мимо after_flush журнала изменений
+        board_ids = select(Board.id).where(Board.project_id == self.project.id)
+        column_ids = select(Column.id).where(Column.board_id.in_(board_ids))
+        record_inserted(db.session, Board, Board.project_id == self.project.id)
+        record_inserted(db.session, Column, Column.board_id.in_(board_ids))
+        record_inserted(db.session, Task, Task.column_id.in_(column_ids))
+
+
+def import_project(stream, code=None, name=None):
+    """Импортирует архив проекта из потока; при ошибке транзакция откатывается"""
+    try:
+        project, counts = ProjectImporter(code, name).load(read_frames(stream))
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return project, counts
@@ -1,15 +1,17 @@
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 import random
 import string
 from app.models import User, Project
+from app.instrumentation import timed
+from app.tokens import ROLE_CLAIM, role_select
 
 
 def generate_task_code(project_code):
     """Генерирует код задачи на основе кода проекта"""
     # Получаем все задачи проекта, чтобы найти последний номер
-    from app.models import Task, Column, Board, Project
+    from app.models import ArchivedTask, Task, Column, Board, Project
 
     project = Project.query.filter_by(code=project_code).first()
     if not project:
@@ -27,14 +29,18 @@ def generate_task_code(project_code):
     # Получаем все задачи для колонок
     tasks = db.session.query(Task).filter(Task.column_id.in_(column_ids)).all() if column_ids else []
 
+    # Коды архивных задач проекта тоже заняты
+    codes = [task.code for task in tasks]
+    codes += [code for code, in db.session.query(ArchivedTask.code).filter(ArchivedTask.project_id == project.id)]
+
     # Ищем коды задач, которые начинаются с кода проекта
     task_numbers = []
-    for task in tasks:
-        if task.code.startswith(project_code):
+    for code in codes:
+        if code.startswith(project_code):
             # Извлекаем номер задачи из кода
             try:
                 # Формат: PROJECT_CODE-NUMBER
-                number_part = task.code.split('-')[1]
+                number_part = code.split('-')[1]
                 task_numbers.append(int(number_part))
             except (IndexError, ValueError):
                 continue
@@ -49,16 +55,27 @@ def generate_task_code(project_code):
     return f"{project_code}-{formatted_number}"
 
 
+def current_role():
+    """Роль пользователя из клеймов JWT (для старых токенов без клейма — из БД)"""
+    claims = get_jwt()
+    if ROLE_CLAIM in claims:
+        return claims[ROLE_CLAIM]
+
+    from app import db
+
+    return db.session.execute(role_select(get_jwt_identity())).scalar()
+
+
 def manager_required(fn):
     """Декоратор для проверки роли менеджера"""
 
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        with timed('auth'):
+            verify_jwt_in_request()
+            role = current_role()
 
-        if not user or not user.is_manager():
+        if role != 'manager':
             return jsonify({"message": "Требуются права менеджера"}), 403
 
         return fn(*args, **kwargs)
@@ -71,11 +88,11 @@ def auth_required(fn):
 
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        with timed('auth'):
+            verify_jwt_in_request()
+            role = current_role()
 
-        if not user:
+        if role is None:
             return jsonify({"message": "Требуется аутентификация"}), 401
 
         return fn(*args, **kwargs)
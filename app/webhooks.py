@@ -0,0 +1,315 @@
+import hashlib
+import hmac
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from flask import current_app
+from sqlalchemy import delete, or_, select, update
+from app import db
+from app.database import _is_memory_sqlite
+from app.metrics import WEBHOOK_EVENTS
+from app.models import Webhook, WebhookEvent
+from app.serializers import dumps, loads
+
+logger = logging.getLogger('app.webhooks')
+
+# Типы событий
+TASK_MOVED = 'task.moved'
+TIME_LOGGED = 'time.logged'
+EVENTS = (TASK_MOVED, TIME_LOGGED)
+
+# Колонки, о переходе задачи в которые сообщается вебхукам
+NOTIFY_COLUMNS = ('Деплой/Ревью', 'В продакшен')
+
+# Состояния события в outbox
+PENDING = 'pending'
+DELIVERED = 'delivered'
+FAILED = 'failed'
+
+
+class Subscriptions:
+    """Активные вебхуки в памяти процесса с коротким временем жизни.
+
+    Запросы без подписчиков не делают лишних обращений к БД.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._hooks = None
+        self._expires = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        rows = db.session.execute(select(Webhook.id, Webhook.events, Webhook.project_id).where(
+            Webhook.is_active.is_(True)
+        )).all()
+        return [(row.id, frozenset(row.events.split(',')), row.project_id) for row in rows]
+
+    def match(self, event):
+        """Вебхуки, подписанные на событие: список (id, project_id)"""
+        hooks = self._hooks
+        if hooks is None or self._expires <= time.monotonic():
+            hooks = self._load()
+            with self._lock:
+                self._hooks, self._expires = hooks, time.monotonic() + self.ttl
+        return [(hook_id, project_id) for hook_id, events, project_id in hooks if event in events]
+
+    def clear(self):
+        with self._lock:
+            self._hooks = None
+
+
+def emit(event, payload, project_id):
+    """Добавляет событие в outbox текущей транзакции для всех подписанных вебхуков.
+
+    project_id — число или функция без аргументов; функция вызывается, только
+    если есть вебхуки, ограниченные проектом. Отправка произойдет после коммита.
+    """
+    subscriptions = current_app.extensions.get('webhook_subscriptions')
+    if subscriptions is None:
+        return
+    hooks = subscriptions.match(event)
+    if not hooks:
+        return
+
+    if callable(project_id) and any(hook_project is not None for _, hook_project in hooks):
+        project_id = project_id()
+    body = dumps(payload).decode()
+    now = datetime.utcnow()
+    db.session.add_all([
+        WebhookEvent(webhook_id=hook_id, event=event, payload=body, status=PENDING, next_attempt_at=now, created_at=now)
+        for hook_id, hook_project in hooks if hook_project is None or hook_project == project_id
+    ])
+
+
+def sign(secret, body):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def post_batch(url, secret, events, timeout):
+    """Отправляет пачку событий одним POST; возвращает текст ошибки или None"""
+    body = dumps({'events': events})
+    headers = {'Content-Type': 'application/json', 'User-Agent': 'task-manager-webhooks'}
+    if secret:
+        headers['X-Webhook-Signature'] = sign(secret, body)
+    try:
+        with urlopen(Request(url, data=body, headers=headers, method='POST'), timeout=timeout) as response:
+            response.read()
+    except HTTPError as e:
+        return f'HTTP {e.code}'
+    except (OSError, ValueError) as e:
+        return str(e)[:500] or e.__class__.__name__
+    return None
+
+
+class WebhookDispatcher:
+    """Доставка событий из outbox: пачками по адресам в ограниченном пуле потоков.
+
+    События одного вебхука отправляются по порядку и не больше одной пачки
+    одновременно. Выбранные события арендуются (lease_until) условным UPDATE:
+    диспетчер отправляет только те события, аренду которых взял сам, поэтому
+    несколько диспетчеров не отправляют их одновременно и без SKIP LOCKED
+    (SQLite); если диспетчер упал, события снова станут доступны после
+    окончания аренды. Доставка «хотя бы один раз»: получатель отбрасывает
+    повторы по id события.
+    """
+
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.workers = config['WEBHOOK_WORKERS']
+        self.batch_size = config['WEBHOOK_BATCH_SIZE']
+        self.claim_size = config['WEBHOOK_CLAIM_SIZE']
+        self.interval = config['WEBHOOK_POLL_INTERVAL']
+        self.timeout = config['WEBHOOK_TIMEOUT']
+        self.max_attempts = config['WEBHOOK_MAX_ATTEMPTS']
+        self.backoff_base = config['WEBHOOK_BACKOFF_BASE']
+        self.backoff_max = config['WEBHOOK_BACKOFF_MAX']
+        # Аренда покрывает последовательную отправку всех пачек одного вебхука
+        self.lease = timedelta(seconds=self.timeout * (self.claim_size // self.batch_size + 1) + self.interval)
+        self._executor = None
+        self._pid = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Потоки не переживают fork, поэтому пул создается в каждом процессе заново
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='webhook-sender')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def start(self):
+        """Запускает фоновую доставку в текущем процессе (повторный вызов ничего не делает)"""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self.run, name='webhook-dispatcher', daemon=True).start()
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+    def _claim(self, now):
+        lease_free = or_(WebhookEvent.lease_until.is_(None), WebhookEvent.lease_until < now)
+        rows = db.session.execute(select(
+            WebhookEvent.id, WebhookEvent.webhook_id, WebhookEvent.event, WebhookEvent.payload,
+            WebhookEvent.attempts, WebhookEvent.created_at
+        ).where(
+            WebhookEvent.status == PENDING, WebhookEvent.next_attempt_at <= now, lease_free
+        ).order_by(WebhookEvent.id).limit(self.claim_size).with_for_update(skip_locked=True)).all()
+
+        hooks = {}
+        if rows:
+            # Аренда берется только для свободных событий: другой диспетчер мог
+            # выбрать те же строки и успеть их арендовать
+            lease_until = now + self.lease
+            claimed = db.session.execute(update(WebhookEvent).where(
+                WebhookEvent.id.in_([row.id for row in rows]), WebhookEvent.status == PENDING, lease_free
+            ).values(lease_until=lease_until)).rowcount
+            if claimed < len(rows):
+                mine = set(db.session.execute(select(WebhookEvent.id).where(
+                    WebhookEvent.id.in_([row.id for row in rows]), WebhookEvent.lease_until == lease_until
+                )).scalars())
+                rows = [row for row in rows if row.id in mine]
+        if rows:
+            hooks = {hook.id: hook for hook in db.session.execute(select(
+                Webhook.id, Webhook.url, Webhook.secret, Webhook.is_active
+            ).where(Webhook.id.in_({row.webhook_id for row in rows}))).all()}
+        db.session.commit()
+        return rows, hooks
+
+    def _send(self, hook, rows):
+        """Отправляет события вебхука пачками по порядку; после первой ошибки останавливается.
+
+        Возвращает (отправленные, неудачная пачка, ошибка).
+        """
+        sent = []
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            error = post_batch(hook.url, hook.secret, [{
+                'id': row.id,
+                'event': row.event,
+                'created_at': row.created_at,
+                'data': loads(row.payload)
+            } for row in batch], self.timeout)
+            if error is not None:
+                return sent, batch, error
+            sent.extend(batch)
+        return sent, [], None
+
+    def run_once(self):
+        """Одна итерация доставки; возвращает число доставленных событий"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            rows, hooks = self._claim(now)
+            if not rows:
+                return 0
+
+            by_hook = {}
+            for row in rows:
+                by_hook.setdefault(row.webhook_id, []).append(row)
+
+            disabled = [row.id for hook_id, hook_rows in by_hook.items()
+                        if hook_id not in hooks or not hooks[hook_id].is_active for row in hook_rows]
+            executor = self._get_executor()
+            futures = {hook_id: executor.submit(self._send, hooks[hook_id], hook_rows)
+                       for hook_id, hook_rows in by_hook.items() if hook_id in hooks and hooks[hook_id].is_active}
+
+            delivered = 0
+            finished = datetime.utcnow()
+            for hook_id, future in futures.items():
+                sent, failed, error = future.result()
+                if sent:
+                    db.session.execute(update(WebhookEvent).where(
+                        WebhookEvent.id.in_([row.id for row in sent])
+                    ).values(status=DELIVERED, attempts=WebhookEvent.attempts + 1, delivered_at=finished,
+                             lease_until=None, last_error=None))
+                    delivered += len(sent)
+                    WEBHOOK_EVENTS.labels(DELIVERED).inc(len(sent))
+                if not failed:
+                    continue
+
+                attempts = max(row.attempts for row in failed) + 1
+                retry_at = finished + self._backoff(attempts)
+                for row in failed:
+                    gave_up = row.attempts + 1 >= self.max_attempts
+                    db.session.execute(update(WebhookEvent).where(WebhookEvent.id == row.id).values(
+                        status=FAILED if gave_up else PENDING, attempts=row.attempts + 1, next_attempt_at=retry_at,
+                        lease_until=None, last_error=error
+                    ))
+                    WEBHOOK_EVENTS.labels(FAILED if gave_up else 'retry').inc()
+                # Следующие пачки этого вебхука ждут повтора неудачной, чтобы сохранить порядок
+                unsent = [row.id for row in by_hook[hook_id][len(sent) + len(failed):]]
+                if unsent:
+                    db.session.execute(update(WebhookEvent).where(WebhookEvent.id.in_(unsent)).values(
+                        next_attempt_at=retry_at, lease_until=None
+                    ))
+                logger.warning('Вебхук %s: %s, повтор через %s', hook_id, error, retry_at - finished)
+
+            if disabled:
+                db.session.execute(update(WebhookEvent).where(WebhookEvent.id.in_(disabled)).values(
+                    status=FAILED, lease_until=None, last_error='Вебхук отключен'
+                ))
+                WEBHOOK_EVENTS.labels(FAILED).inc(len(disabled))
+            db.session.commit()
+            return delivered
+
+    def run(self):
+        """Доставка в цикле: без паузы, пока в outbox есть готовые события"""
+        while True:
+            try:
+                delivered = self.run_once()
+            except Exception:
+                logger.exception('Ошибка доставки вебхуков')
+                delivered = 0
+            if delivered < self.claim_size:
+                time.sleep(self.interval)
+
+
+def purge_delivered(older_than_days=None):
+    """Удаляет доставленные события старше WEBHOOK_RETENTION_DAYS дней"""
+    if older_than_days is None:
+        older_than_days = current_app.config['WEBHOOK_RETENTION_DAYS']
+    threshold = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = db.session.execute(delete(WebhookEvent).where(
+        WebhookEvent.status == DELIVERED, WebhookEvent.delivered_at <= threshold
+    )).rowcount
+    db.session.commit()
+    return deleted
+
+
+def start_dispatcher(app):
+    """Запускает фоновую доставку в текущем процессе, если она разрешена настройками.
+
+    Вызывается один раз в каждом воркере после fork (gunicorn post_worker_init):
+    потоки, запущенные в мастере до fork, в воркерах не работают.
+    """
+    config = app.config
+    dispatcher = app.extensions.get('webhook_dispatcher')
+    # Единственное соединение SQLite в памяти нельзя делить с фоновым потоком
+    if dispatcher is None or not config['WEBHOOK_DISPATCHER_ENABLED'] or \
+            _is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return False
+    dispatcher.start()
+    return True
+
+
+def init_webhooks(app):
+    """Подключает исходящие вебхуки; доставку запускает start_dispatcher или flask dispatch-webhooks"""
+    config = app.config
+    if not config['WEBHOOKS_ENABLED']:
+        return
+
+    app.extensions['webhook_subscriptions'] = Subscriptions(config['WEBHOOK_SUBSCRIPTION_TTL'])
+    app.extensions['webhook_dispatcher'] = WebhookDispatcher(app)
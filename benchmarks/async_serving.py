@@ -0,0 +1,115 @@
+"""Сравнение синхронного (gunicorn, sync-воркеры) и асинхронного (uvicorn, ASGI) режимов.
+
+Оба сервера запускаются на одной и той же заполненной базе с одинаковым
+числом воркеров. Для каждого сценария чтения нагрузка подается при
+нескольких уровнях параллелизма; в результат попадают пропускная
+способность, p50/p99 задержки и число ошибок.
+
+Пример:
+  python benchmarks/async_serving.py --database-uri postgresql://localhost/kanban_bench --concurrency 8 64 256
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import ROOT, git_revision, server_env, summarize
+
+from bench import _free_port, _load_worker, _wait_for_port, prepare
+
+READ_SCENARIOS = ('board_read', 'board_columns_read', 'task_list')
+
+
+def server_command(mode, port, workers):
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'run:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--no-access-log']
+
+
+def _login(port, dataset):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', '/api/auth/login', body=json.dumps({
+        'username': dataset['manager_username'], 'password': dataset['password']
+    }), headers={'Content-Type': 'application/json'})
+    token = json.loads(connection.getresponse().read())['access_token']
+    connection.close()
+    return {'Authorization': f'Bearer {token}'}
+
+
+def run_mode(mode, database_uri, dataset, args):
+    port = _free_port()
+    env = server_env(database_uri)
+    server = subprocess.Popen(server_command(mode, port, args.workers), cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        _wait_for_port(port)
+        headers = _login(port, dataset)
+        board_id = dataset['hot_board_id']
+        paths = {
+            'board_read': f'/api/boards/{board_id}',
+            'board_columns_read': f'/api/columns/board/{board_id}',
+            'task_list': f"/api/tasks/?assignee_id={dataset['hot_user_id']}"
+        }
+
+        for name in READ_SCENARIOS:
+            results[name] = {}
+            for concurrency in args.concurrency:
+                latencies, errors = [], []
+                deadline = time.perf_counter() + args.duration
+                threads = [threading.Thread(target=_load_worker,
+                                            args=(port, 'GET', paths[name], None, headers, deadline, latencies, errors))
+                           for _ in range(concurrency)]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                results[name][str(concurrency)] = {
+                    **summarize(latencies, time.perf_counter() - started), 'errors': len(errors)
+                }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', default='sqlite:////tmp/kanban_bench.db')
+    parser.add_argument('--skip-seed', action='store_true', help='использовать уже заполненную базу')
+    parser.add_argument('--dataset-file', default=os.path.join(tempfile.gettempdir(), 'kanban_bench_dataset.json'))
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--max-boards', type=int, default=4)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--time-logs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--modes', nargs='+', choices=['sync', 'async'], default=['sync', 'async'])
+    args = parser.parse_args()
+
+    _, dataset = prepare(args.database_uri, args)
+
+    print(json.dumps({
+        'benchmark': 'async_serving',
+        'revision': git_revision(),
+        'database': args.database_uri.split(':', 1)[0],
+        'workers': args.workers,
+        'results': {mode: run_mode(mode, args.database_uri, dataset, args) for mode in args.modes}
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""Бенчмарки основных сценариев на реальном Flask-приложении.
+
+Режимы:
+  micro — запросы через тестовый клиент Flask в одном процессе;
+  macro — локальный gunicorn и многопоточный HTTP-генератор нагрузки.
+
+Сценарии: чтение доски, список задач, создание задачи, логирование
+времени и сводка по времени. Результат печатается в JSON (или пишется
+в --output), чтобы сравнивать прогоны между коммитами.
+
+Примеры:
+  python benchmarks/bench.py micro --database-uri sqlite:////tmp/bench.db --tasks 50000
+  python benchmarks/bench.py macro --database-uri postgresql://localhost/kanban_bench --concurrency 32
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import datagen
+from common import ROOT, git_revision, make_config, server_env, summarize
+
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.cli import init_db_schema
+from app.models import Task
+
+
+def scenarios(dataset):
+    """Описание сценариев: имя, метод, путь, тело запроса"""
+    board_id = dataset['hot_board_id']
+    task_id = dataset['sample_task_id']
+    return [
+        ('board_read', 'GET', f'/api/boards/{board_id}', None),
+        ('board_columns_read', 'GET', f'/api/columns/board/{board_id}', None),
+        ('task_list', 'GET', f"/api/tasks/?assignee_id={dataset['hot_user_id']}", None),
+        ('task_create', 'POST', '/api/tasks/', {'title': 'Bench task', 'board_id': board_id, 'estimated_time': 4}),
+        ('time_log', 'POST', f'/api/tasks/{task_id}/time', {'spent_hours': 0.5, 'comment': 'bench'}),
+        ('time_summary', 'GET', f"/api/tasks/time-summary?project_id={dataset['hot_project_id']}", None)
+    ]
+
+
+def prepare(database_uri, args):
+    """Создает схему и при необходимости заполняет базу синтетическими данными"""
+    app = create_app(make_config(database_uri))
+    with app.app_context():
+        init_db_schema()
+        if args.skip_seed and inspect(db.engine).has_table('tasks') and Task.query.first():
+            with open(args.dataset_file) as f:
+                dataset = json.load(f)
+        else:
+            dataset = datagen.generate(args.users, args.projects, args.max_boards, args.tasks, args.time_logs, args.seed)
+            with open(args.dataset_file, 'w') as f:
+                json.dump(dataset, f)
+        db.engine.dispose()
+    return app, dataset
+
+
+def run_micro(database_uri, args):
+    app, dataset = prepare(database_uri, args)
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={
+        'username': dataset['manager_username'], 'password': dataset['password']
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    results = {}
+    for name, method, path, body in scenarios(dataset):
+        for _ in range(args.warmup):
+            client.open(path, method=method, json=body, headers=headers)
+
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+        results[name] = {**summarize(latencies, time.perf_counter() - started), 'errors': errors}
+
+    return dataset, results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn не запустился')
+
+
+def _load_worker(port, method, path, body, headers, deadline, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    payload = json.dumps(body) if body is not None else None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run_macro(database_uri, args):
+    _, dataset = prepare(database_uri, args)
+    port = _free_port()
+    env = server_env(database_uri)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+         '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers), 'run:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_for_port(port)
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('POST', '/api/auth/login', body=json.dumps({
+            'username': dataset['manager_username'], 'password': dataset['password']
+        }), headers={'Content-Type': 'application/json'})
+        token = json.loads(connection.getresponse().read())['access_token']
+        connection.close()
+        headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+
+        results = {}
+        for name, method, path, body in scenarios(dataset):
+            latencies, errors = [], []
+            deadline = time.perf_counter() + args.duration
+            threads = [threading.Thread(target=_load_worker,
+                                        args=(port, method, path, body, headers, deadline, latencies, errors))
+                       for _ in range(args.concurrency)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results[name] = {**summarize(latencies, time.perf_counter() - started), 'errors': len(errors)}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return dataset, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('mode', choices=['micro', 'macro'])
+    parser.add_argument('--database-uri', default='sqlite:////tmp/kanban_bench.db')
+    parser.add_argument('--skip-seed', action='store_true', help='использовать уже заполненную базу')
+    parser.add_argument('--dataset-file', default=os.path.join(tempfile.gettempdir(), 'kanban_bench_dataset.json'),
+                        help='описание набора данных для --skip-seed')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--max-boards', type=int, default=4)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--time-logs', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--output', help='файл для JSON-результата')
+    args = parser.parse_args()
+
+    runner = run_micro if args.mode == 'micro' else run_macro
+    dataset, results = runner(args.database_uri, args)
+
+    report = {
+        'benchmark': args.mode,
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'database': args.database_uri.split(':', 1)[0],
+        'dataset': dataset,
+        'results': results
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Копирование проекта: доски, колонки и задачи через INSERT ... SELECT.
+
+Проект с заданным числом задач копируется через POST
+/api/projects/<id>/clone с tasks=none, backlog и all; для каждого
+варианта печатается время ответа и число скопированных строк.
+
+Запуск: python benchmarks/clone.py [--database-uri sqlite://] [--tasks 50000]
+"""
+import argparse
+import json
+import time
+
+from common import git_revision, make_config
+
+from app import create_app
+from app.cli import init_db_schema
+
+from serialization import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--tasks', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app(make_config(args.database_uri))
+    with app.app_context():
+        init_db_schema()
+        seed(args.tasks)
+
+    client = app.test_client()
+    token = client.post('/api/auth/register', json={
+        'username': 'bench_manager', 'email': 'bench_manager@example.com', 'password': 'password', 'role': 'manager'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = {}
+    for tasks in ('none', 'backlog', 'all'):
+        runs = []
+        for number in range(args.repeat):
+            start = time.perf_counter()
+            response = client.post('/api/projects/1/clone', json={
+                'name': f'Clone {tasks} {number}', 'code': f'C{tasks[:2]}{number}', 'tasks': tasks
+            }, headers=headers)
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 201, response.get_json()
+            runs.append(round(elapsed * 1000, 1))
+        results[tasks] = {'copied': response.get_json()['copied'], 'ms': runs}
+
+    print(json.dumps({
+        'benchmark': 'clone',
+        'revision': git_revision(),
+        'tasks': args.tasks,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Общие помощники для бенчмарков."""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app.config import Config  # noqa: E402
+
+SECRET_KEY = 'bench'
+JWT_SECRET_KEY = 'bench-secret-key-with-sufficient-length'
+
+# Функции, выключенные во всех бенчмарках: микро- и макрорежим измеряют один и тот же стек
+FEATURE_SWITCHES = {
+    'INSTRUMENTATION_ENABLED': False,
+    'METRICS_ENABLED': False,
+    'RATE_LIMIT_ENABLED': False,
+    'AUDIT_ENABLED': False,
+    'WEBHOOKS_ENABLED': False
+}
+
+
+def make_config(database_uri='sqlite://', **overrides):
+    """Создает конфигурацию приложения для бенчмарка"""
+    attrs = {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SECRET_KEY': SECRET_KEY,
+        'JWT_SECRET_KEY': JWT_SECRET_KEY,
+        **FEATURE_SWITCHES
+    }
+    attrs.update(overrides)
+    return type('BenchConfig', (Config,), attrs)
+
+
+def server_env(database_uri, **overrides):
+    """Переменные окружения для сервера бенчмарка с теми же настройками, что и make_config"""
+    env = dict(os.environ, DATABASE_URI=database_uri, SECRET_KEY=SECRET_KEY, JWT_SECRET_KEY=JWT_SECRET_KEY)
+    env.update({name: '1' if enabled else '0' for name, enabled in FEATURE_SWITCHES.items()})
+    env.update(overrides)
+    return env
+
+
+def summarize(latencies, elapsed=None):
+    """Сводная статистика по списку задержек в секундах"""
+    if not latencies:
+        return {'count': 0}
+
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 3)
+
+    result = {
+        'count': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+    if elapsed:
+        result['throughput_rps'] = round(len(ordered) / elapsed, 1)
+    return result
+
+
+def git_revision():
+    """Текущий коммит репозитория (для сравнения результатов между коммитами)"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
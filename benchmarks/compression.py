@@ -0,0 +1,85 @@
+"""Сжатие снимка доски: размер и время по уровням и выигрыш от кэша снимков.
+
+Для доски с заданным числом задач сравниваются размер ответа
+get_board_columns без сжатия, с gzip разных уровней и с brotli (если
+установлен), а также время ответа без кэша снимков, из кэша без сжатия
+и из кэша с уже сжатыми байтами.
+
+Запуск: python benchmarks/compression.py [--tasks 2000]
+"""
+import argparse
+import json
+import time
+
+from common import git_revision, make_config, summarize
+
+from app import compression, create_app
+from app.cli import init_db_schema
+
+from serialization import seed
+
+
+def measure(client, url, headers, repeat):
+    latencies = []
+    size = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        size = len(response.data)
+    return {'bytes': size, **summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for name, overrides, accept in (
+        ('no_cache_identity', {'BOARD_SNAPSHOT_TTL_SECONDS': 0}, None),
+        ('no_cache_gzip', {'BOARD_SNAPSHOT_TTL_SECONDS': 0}, 'gzip'),
+        ('cached_identity', {'BOARD_SNAPSHOT_TTL_SECONDS': 3600}, None),
+        ('cached_gzip', {'BOARD_SNAPSHOT_TTL_SECONDS': 3600}, 'gzip')
+    ):
+        app = create_app(make_config('sqlite://', **overrides))
+        with app.app_context():
+            init_db_schema()
+            board_id = seed(args.tasks)
+        client = app.test_client()
+        token = client.post('/api/auth/register', json={
+            'username': 'bench_manager', 'email': 'bench_manager@example.com', 'password': 'password',
+            'role': 'manager'
+        }).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        if accept:
+            headers['Accept-Encoding'] = accept
+        url = f'/api/columns/board/{board_id}'
+        results[name] = measure(client, url, headers, args.repeat)
+
+        if name == 'cached_identity':
+            body = client.get(url, headers={'Authorization': headers['Authorization']}).data
+            levels = {}
+            for level in (1, 6, 9):
+                start = time.perf_counter()
+                data = compression.compress(body, 'gzip', {'COMPRESSION_GZIP_LEVEL': level})
+                levels[f'gzip_{level}'] = {'bytes': len(data), 'ms': round((time.perf_counter() - start) * 1000, 3)}
+            if compression.brotli is not None:
+                for quality in (1, 5, 11):
+                    start = time.perf_counter()
+                    data = compression.compress(body, 'br', {'COMPRESSION_BROTLI_QUALITY': quality})
+                    levels[f'br_{quality}'] = {'bytes': len(data),
+                                               'ms': round((time.perf_counter() - start) * 1000, 3)}
+            results['levels'] = {'identity_bytes': len(body), **levels}
+
+    print(json.dumps({
+        'benchmark': 'compression',
+        'revision': git_revision(),
+        'tasks': args.tasks,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""Генератор большого синтетического набора данных.
+
+Создает проекты, доски, колонки, пользователей, задачи и логи времени
+с реалистичным перекосом: несколько "горячих" проектов и исполнителей
+получают большую часть задач, а большинство задач со временем оседает
+в колонке "В продакшен". Данные вставляются пакетами через executemany,
+а на PostgreSQL — через COPY.
+
+Запуск: python benchmarks/datagen.py --database-uri sqlite:////tmp/bench.db --tasks 100000
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import make_config
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.cli import init_db_schema, seed_roles
+from app.models import Board, Column, Project, Role, Task, TimeLog, User
+
+DEFAULT_COLUMNS = ['Беклог', 'Переоткрыто', 'В работе', 'Деплой/Ревью', 'Тест', 'Проверено', 'В продакшен']
+# Распределение задач по колонкам: большинство задач уже завершено
+COLUMN_WEIGHTS = [15, 2, 10, 4, 4, 5, 60]
+PRIORITIES = ['low', 'medium', 'high']
+PASSWORD = 'password'
+BATCH_SIZE = 5000
+
+
+def zipf_weights(n, s=1.1):
+    """Веса распределения Ципфа для n элементов"""
+    return [1.0 / (i + 1) ** s for i in range(n)]
+
+
+def _next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def _copy_rows(connection, table, rows):
+    """Загружает строки в таблицу PostgreSQL через COPY"""
+    columns = [column.name for column in table.columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if row[name] is None else row[name] for name in columns])
+    buffer.seek(0)
+
+    column_list = ', '.join(f'"{name}"' for name in columns)
+    cursor = connection.connection.dbapi_connection.cursor()
+    cursor.copy_expert(f'COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def bulk_insert(model, rows):
+    """Пакетная вставка строк с явными id"""
+    table = model.__table__
+    connection = db.session.connection()
+    use_copy = connection.dialect.name == 'postgresql'
+
+    def write(batch):
+        if use_copy:
+            _copy_rows(connection, table, batch)
+        else:
+            connection.execute(table.insert(), batch)
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            write(batch)
+            batch = []
+    if batch:
+        write(batch)
+
+    if use_copy:
+        # Сдвигаем последовательность после вставки с явными id
+        connection.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+        ))
+
+
+def generate(users=200, projects=20, max_boards_per_project=4, tasks=50000, time_logs=200000, seed=42):
+    """Заполняет базу синтетическими данными; вызывается в контексте приложения"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    seed_roles()
+    roles = {role.name: role.id for role in Role.query.all()}
+    password_hash = generate_password_hash(PASSWORD)
+
+    # Пользователи: около 5% менеджеров
+    user_start = _next_id(User)
+    user_ids = list(range(user_start, user_start + users))
+    manager_ids = user_ids[:max(1, users // 20)]
+    bulk_insert(User, ({
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'password_hash': password_hash,
+        'role_id': roles['manager'] if user_id in manager_ids else roles['executor'],
+        'created_at': now - timedelta(days=rng.randint(0, 730))
+    } for user_id in user_ids))
+
+    # Проекты, доски и колонки
+    project_start = _next_id(Project)
+    board_id = _next_id(Board)
+    column_id = _next_id(Column)
+    project_rows, board_rows, column_rows = [], [], []
+    project_boards = {}
+    board_columns = {}
+    for project_id in range(project_start, project_start + projects):
+        project_rows.append({
+            'id': project_id,
+            'name': f'Project {project_id}',
+            'code': f'P{project_id}',
+            'description': f'Synthetic project {project_id}',
+            'created_at': now - timedelta(days=rng.randint(30, 730))
+        })
+        project_boards[project_id] = []
+        for _ in range(rng.randint(1, max_boards_per_project)):
+            board_rows.append({
+                'id': board_id,
+                'name': f'Board {board_id}',
+                'project_id': project_id,
+                'created_at': now - timedelta(days=rng.randint(30, 700))
+            })
+            project_boards[project_id].append(board_id)
+            board_columns[board_id] = []
+            for order, name in enumerate(DEFAULT_COLUMNS, 1):
+                column_rows.append({
+                    'id': column_id,
+                    'name': name,
+                    'order': order,
+                    'board_id': board_id,
+                    'created_at': now - timedelta(days=30)
+                })
+                board_columns[board_id].append(column_id)
+                column_id += 1
+            board_id += 1
+
+    bulk_insert(Project, project_rows)
+    bulk_insert(Board, board_rows)
+    bulk_insert(Column, column_rows)
+
+    # Задачи: перекос по проектам и исполнителям
+    project_ids = [row['id'] for row in project_rows]
+    project_weights = zipf_weights(len(project_ids))
+    user_weights = zipf_weights(len(user_ids), 0.8)
+    task_start = _next_id(Task)
+    task_numbers = {project_id: 0 for project_id in project_ids}
+    task_rows = []
+    for task_id in range(task_start, task_start + tasks):
+        project_id = rng.choices(project_ids, project_weights)[0]
+        task_numbers[project_id] += 1
+        column_index = rng.choices(range(len(DEFAULT_COLUMNS)), COLUMN_WEIGHTS)[0]
+        task_board = rng.choice(project_boards[project_id])
+        created_at = now - timedelta(minutes=rng.randint(60, 365 * 24 * 60))
+        estimated = rng.choice([1, 2, 4, 8, 16, 24, 40])
+        started_at = created_at + timedelta(hours=rng.randint(1, 240)) if column_index >= 2 else None
+        completed_at = started_at + timedelta(hours=rng.randint(1, 480)) if column_index == 6 else None
+        task_rows.append({
+            'id': task_id,
+            'code': f'P{project_id}-{task_numbers[project_id]:03d}',
+            'title': f'Task {task_id}',
+            'description': 'Lorem ipsum dolor sit amet. ' * rng.randint(1, 20),
+            'priority': rng.choice(PRIORITIES),
+            'estimated_time': estimated,
+            'remaining_time': estimated,
+            'spent_time': 0.0,
+            'author_id': rng.choice(manager_ids),
+            'assignee_id': rng.choices(user_ids, user_weights)[0] if rng.random() < 0.9 else None,
+            'column_id': board_columns[task_board][column_index],
+            'created_at': created_at,
+            'updated_at': completed_at or started_at or created_at,
+            'started_at': started_at,
+            'completed_at': completed_at
+        })
+
+    # Логи времени: часть задач получает непропорционально много записей
+    log_task_indexes = rng.choices(range(len(task_rows)), zipf_weights(len(task_rows), 0.6), k=time_logs) \
+        if task_rows else []
+    log_rows = []
+    log_id = _next_id(TimeLog)
+    for index in log_task_indexes:
+        task = task_rows[index]
+        spent = rng.choice([0.25, 0.5, 1, 2, 3, 4, 8])
+        task['spent_time'] += spent
+        task['remaining_time'] = max(0.0, task['remaining_time'] - spent)
+        user_id = task['assignee_id'] or rng.choice(user_ids)
+        log_rows.append({
+            'id': log_id,
+            'task_id': task['id'],
+            'user_id': user_id,
+            'logged_by_id': user_id if rng.random() < 0.9 else rng.choice(manager_ids),
+            'spent_hours': spent,
+            'remaining_hours': task['remaining_time'],
+            'comment': '',
+            'created_at': task['created_at'] + timedelta(hours=rng.randint(1, 2000))
+        })
+        log_id += 1
+
+    bulk_insert(Task, task_rows)
+    bulk_insert(TimeLog, log_rows)
+    db.session.commit()
+
+    # Самая большая доска — основной объект чтения в бенчмарках
+    board_sizes = {}
+    column_board = {column['id']: column['board_id'] for column in column_rows}
+    for task in task_rows:
+        board = column_board[task['column_id']]
+        board_sizes[board] = board_sizes.get(board, 0) + 1
+
+    return {
+        'users': users,
+        'projects': projects,
+        'boards': len(board_rows),
+        'tasks': tasks,
+        'time_logs': time_logs,
+        'manager_username': f'user{manager_ids[0]}',
+        'executor_username': f'user{user_ids[-1]}',
+        'password': PASSWORD,
+        'hot_board_id': max(board_sizes, key=board_sizes.get) if board_sizes else board_rows[0]['id'],
+        'hot_project_id': project_ids[0],
+        'hot_user_id': user_ids[0],
+        'sample_task_id': task_start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', required=True)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--max-boards', type=int, default=4)
+    parser.add_argument('--tasks', type=int, default=50000)
+    parser.add_argument('--time-logs', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app(make_config(args.database_uri))
+    with app.app_context():
+        init_db_schema()
+        start = time.perf_counter()
+        summary = generate(args.users, args.projects, args.max_boards, args.tasks, args.time_logs, args.seed)
+        summary['seconds'] = round(time.perf_counter() - start, 2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Сравнение задержки запросов с включенными и выключенными метриками.
+
+Запуск: python benchmarks/metrics_overhead.py [--requests 2000]
+"""
+import argparse
+import json
+import time
+
+from common import make_config, summarize
+
+from app import create_app, db
+from app.cli import init_db_schema
+
+
+def run(metrics_enabled, requests_count):
+    app = create_app(make_config(METRICS_ENABLED=metrics_enabled))
+    with app.app_context():
+        init_db_schema()
+    client = app.test_client()
+
+    response = client.post('/api/auth/register', json={
+        'username': 'bench', 'email': 'bench@example.com', 'password': 'bench', 'role': 'manager'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    client.post('/api/projects/', json={'name': 'Bench', 'code': 'BENCH'}, headers=headers)
+    for i in range(20):
+        client.post('/api/tasks/', json={'title': f'Task {i}', 'board_id': 1}, headers=headers)
+
+    # Прогрев
+    for _ in range(50):
+        client.get('/api/columns/board/1', headers=headers)
+
+    latencies = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        client.get('/api/columns/board/1', headers=headers)
+        latencies.append(time.perf_counter() - start)
+
+    with app.app_context():
+        db.engine.dispose()
+
+    return {'metrics_enabled': metrics_enabled, **summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    baseline = run(False, args.requests)
+    with_metrics = run(True, args.requests)
+    print(json.dumps({
+        'benchmark': 'metrics_overhead',
+        'results': [baseline, with_metrics],
+        'overhead_mean_ms': round(with_metrics['mean_ms'] - baseline['mean_ms'], 3)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
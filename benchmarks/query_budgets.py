@@ -0,0 +1,208 @@
+"""Проверка количества SQL-запросов на каждый эндпоинт.
+
+Для каждого эндпоинта задан бюджет запросов, который не должен зависеть
+от объема данных. Скрипт заполняет базу сначала малым, затем большим
+набором данных, выполняет все эндпоинты и сравнивает количество
+запросов: если оно растет вместе с данными (N+1) или превышает бюджет,
+скрипт завершается с кодом 1. Предназначен для запуска в CI.
+
+Запуск: python benchmarks/query_budgets.py [--small 10] [--large 1000] [-v]
+"""
+import argparse
+import sys
+
+import datagen
+from common import make_config
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.cli import init_db_schema
+from app.models import Column
+
+# (имя, метод, путь, тело, роль, ожидаемый статус, бюджет запросов).
+# В путях подставляются идентификаторы из набора данных и созданных объектов.
+ENDPOINTS = [
+    ('auth.register', 'POST', '/api/auth/register', 'register', None, 201, 6),
+    ('auth.login', 'POST', '/api/auth/login', 'login', None, 200, 2),
+    ('auth.get_me', 'GET', '/api/auth/me', None, 'manager', 200, 2),
+    ('users.get_users', 'GET', '/api/users/', None, 'manager', 200, 2),
+    ('users.get_users_page', 'GET', '/api/users/?q=user&limit=50', None, 'manager', 200, 2),
+    ('users.get_users_batch', 'GET', '/api/users/?ids=1,2,{hot_user_id}', None, 'manager', 200, 2),
+    ('users.get_user_directory', 'GET', '/api/users/directory', None, 'manager', 200, 3),
+    ('users.get_user', 'GET', '/api/users/{hot_user_id}', None, 'manager', 200, 2),
+    ('projects.get_projects', 'GET', '/api/projects/', None, 'manager', 200, 2),
+    ('projects.create_project', 'POST', '/api/projects/', {'name': 'Budget', 'code': 'BUDGET'}, 'manager', 201, 15),
+    ('projects.get_project', 'GET', '/api/projects/{hot_project_id}', None, 'manager', 200, 3),
+    ('projects.get_project_boards', 'GET', '/api/projects/{hot_project_id}/boards', None, 'manager', 200, 3),
+    ('projects.update_project', 'PUT', '/api/projects/{new_project_id}', {'name': 'Budget 2'}, 'manager', 200, 5),
+    ('boards.get_all_boards', 'GET', '/api/boards/', None, 'manager', 200, 2),
+    ('boards.get_board', 'GET', '/api/boards/{hot_board_id}', None, 'manager', 200, 5),
+    ('boards.get_board_compound', 'GET', '/api/boards/{hot_board_id}?include=columns.tasks,users,time_logs:recent',
+     None, 'manager', 200, 9),
+    ('boards.create_board', 'POST', '/api/boards/', {'name': 'Budget board', 'project_id': '{new_project_id}'},
+     'manager', 201, 13),
+    ('boards.update_board', 'PUT', '/api/boards/{new_board_id}', {'name': 'Budget board 2'}, 'manager', 200, 5),
+    ('columns.get_board_columns', 'GET', '/api/columns/board/{hot_board_id}', None, 'manager', 200, 4),
+    ('columns.create_column', 'POST', '/api/columns/', {'name': 'Extra', 'board_id': '{new_board_id}'},
+     'manager', 201, 6),
+    ('columns.update_column', 'PUT', '/api/columns/{new_column_id}', {'name': 'Extra 2'}, 'manager', 200, 5),
+    ('columns.reorder_columns', 'POST', '/api/columns/reorder',
+     {'columns': [{'id': '{new_column_id}', 'order': 1}]}, 'manager', 200, 4),
+    ('columns.delete_column', 'DELETE', '/api/columns/{new_column_id}', None, 'manager', 200, 8),
+    ('tasks.get_tasks', 'GET', '/api/tasks/', None, 'manager', 200, 2),
+    ('tasks.get_tasks_filtered', 'GET', '/api/tasks/?assignee_id={hot_user_id}', None, 'manager', 200, 2),
+    ('tasks.create_task', 'POST', '/api/tasks/', {'title': 'Budget task', 'board_id': '{new_board_id}'},
+     'manager', 201, 13),
+    ('tasks.create_task_in_column', 'POST', '/api/tasks/column/{new_backlog_id}', {'title': 'Budget task 2'},
+     'manager', 201, 13),
+    ('tasks.get_task', 'GET', '/api/tasks/{new_task_id}', None, 'manager', 200, 3),
+    ('tasks.get_task_compound', 'GET', '/api/tasks/{new_task_id}?include=board,columns.tasks,users,time_logs',
+     None, 'manager', 200, 7),
+    ('tasks.update_task', 'PUT', '/api/tasks/{new_task_id}', {'title': 'Renamed', 'column_id': '{new_backlog_id}'},
+     'manager', 200, 7),
+    ('tasks.log_task_time', 'POST', '/api/tasks/{new_task_id}/time', {'spent_hours': 1}, 'manager', 200, 10),
+    ('tasks.get_task_in_board_context', 'GET', '/api/tasks/board/{new_board_id}/task/{new_task_id}', None,
+     'manager', 200, 5),
+    ('tasks.update_task_estimate', 'POST', '/api/tasks/{new_task_id}/estimate', {'estimated_hours': 3},
+     'manager', 200, 6),
+    ('tasks.get_task_time_logs', 'GET', '/api/tasks/{sample_task_id}/time-logs?per_page=100', None,
+     'manager', 200, 4),
+    ('tasks.get_task_time_logs_cursor', 'GET', '/api/tasks/{sample_task_id}/time-logs?limit=100', None,
+     'manager', 200, 3),
+    ('tasks.get_time_log_feed', 'GET', '/api/tasks/time-logs?user_id={hot_user_id}&limit=100', None,
+     'manager', 200, 2),
+    ('tasks.get_time_summary', 'GET', '/api/tasks/time-summary?project_id={hot_project_id}', None,
+     'manager', 200, 6),
+    ('tasks.get_time_summary_archived', 'GET',
+     '/api/tasks/time-summary?project_id={hot_project_id}&include_archived=true', None, 'manager', 200, 7),
+    ('archive.get_archived_tasks', 'GET', '/api/archive/tasks?project_id={hot_project_id}', None, 'manager', 200, 2),
+    ('tasks.get_workload', 'GET', '/api/tasks/workload', None, 'manager', 200, 2),
+    ('tasks.get_workload_filtered', 'GET', '/api/tasks/workload?project_id={hot_project_id}', None,
+     'manager', 200, 2),
+    ('tasks.delete_task', 'DELETE', '/api/tasks/{new_task_id}', None, 'manager', 200, 7),
+    ('boards.delete_board', 'DELETE', '/api/boards/{new_board_id}', None, 'manager', 200, 24),
+    ('projects.delete_project', 'DELETE', '/api/projects/{new_project_id}', None, 'manager', 200, 24),
+]
+
+
+class QueryRecorder:
+    """Записывает SQL-запросы, выполненные через движок"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+
+def _substitute(value, ids):
+    if isinstance(value, str):
+        formatted = value.format(**ids)
+        return int(formatted) if formatted.isdigit() and value.startswith('{') else formatted
+    if isinstance(value, dict):
+        return {key: _substitute(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, ids) for item in value]
+    return value
+
+
+def measure(scale):
+    """Заполняет базу и возвращает SQL-запросы и статус ответа по каждому эндпоинту"""
+    app = create_app(make_config('sqlite://'))
+    with app.app_context():
+        init_db_schema()
+        dataset = datagen.generate(users=scale, projects=max(2, scale // 10), max_boards_per_project=2,
+                                   tasks=scale, time_logs=scale, seed=1)
+        engine = db.engine
+
+    client = app.test_client()
+    headers = {}
+    response = client.post('/api/auth/login', json={
+        'username': dataset['manager_username'], 'password': dataset['password']
+    })
+    headers['manager'] = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    # Первое обращение с токеном строит фильтр отзыва токенов; в замеры оно не входит
+    client.get('/api/auth/me', headers=headers['manager'])
+
+    bodies = {
+        'register': {'username': 'budget', 'email': 'budget@example.com', 'password': 'budget', 'role': 'executor'},
+        'login': {'username': dataset['manager_username'], 'password': dataset['password']}
+    }
+    ids = dict(dataset)
+    counts = {}
+    statuses = {}
+
+    for name, method, path, body, role, expected_status, budget in ENDPOINTS:
+        url = _substitute(path, ids)
+        payload = bodies[body] if isinstance(body, str) else _substitute(body, ids)
+        with QueryRecorder(engine) as recorder:
+            response = client.open(url, method=method, json=payload, headers=headers.get(role, {}))
+
+        counts[name] = recorder.statements
+        statuses[name] = response.status_code
+
+        data = response.get_json(silent=True) or {}
+        if name == 'projects.create_project':
+            ids['new_project_id'] = data['project']['id']
+        elif name == 'boards.create_board':
+            ids['new_board_id'] = data['board']['id']
+            with app.app_context():
+                ids['new_backlog_id'] = Column.query.filter_by(board_id=ids['new_board_id'], order=1).first().id
+        elif name == 'columns.create_column':
+            ids['new_column_id'] = data['column']['id']
+        elif name == 'tasks.create_task':
+            ids['new_task_id'] = data['task']['id']
+
+    return counts, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', type=int, default=10)
+    parser.add_argument('--large', type=int, default=1000)
+    parser.add_argument('-v', '--verbose', action='store_true', help='печатать SQL при нарушениях')
+    args = parser.parse_args()
+
+    small, statuses_small = measure(args.small)
+    large, statuses_large = measure(args.large)
+    failures = [
+        f'{name}: статус {statuses[name]}, ожидался {expected_status}'
+        for statuses in (statuses_small, statuses_large)
+        for name, method, path, body, role, expected_status, budget in ENDPOINTS
+        if statuses[name] != expected_status
+    ]
+
+    print(f"{'endpoint':40} {'budget':>6} {args.small:>6} {args.large:>6}")
+    for name, method, path, body, role, expected_status, budget in ENDPOINTS:
+        small_count, large_count = len(small[name]), len(large[name])
+        marker = ''
+        if small_count != large_count:
+            marker = '  <- растет с объемом данных'
+            failures.append(f'{name}: {small_count} запросов на {args.small} строк, {large_count} на {args.large}')
+        elif large_count > budget:
+            marker = '  <- превышен бюджет'
+            failures.append(f'{name}: {large_count} запросов при бюджете {budget}')
+        print(f'{name:40} {budget:>6} {small_count:>6} {large_count:>6}{marker}')
+        if marker and args.verbose:
+            for statement in large[name]:
+                print('    ' + ' '.join(statement.split()))
+
+    if failures:
+        print('\nНарушения:')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Память и время загрузки списков: ORM-сущности против read-моделей.
+
+Для 100 000 задач и 100 000 пользователей сравнивается загрузка полных
+ORM-объектов (как раньше в списковых эндпоинтах), строк SQLAlchemy Row и
+кортежей read-моделей из app.read_models. Для каждого варианта
+замеряются время, пиковая и удерживаемая память (tracemalloc) и память
+на одну строку.
+
+Запуск: python benchmarks/read_models.py [--rows 100000]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from common import git_revision, make_config
+
+from sqlalchemy.orm import joinedload
+
+from app import create_app, db
+from app.cli import init_db_schema
+from app.models import Role, Task, User
+from app.read_models import fetch_tasks, fetch_users, user_select
+from app.serializers import task_select
+
+from serialization import seed
+
+
+def seed_users(rows):
+    role_id = Role.query.filter_by(name='executor').first().id
+    db.session.execute(User.__table__.insert(), [{
+        'username': f'reader{number}',
+        'email': f'reader{number}@example.com',
+        'password_hash': 'x' * 100,
+        'role_id': role_id
+    } for number in range(rows)])
+    db.session.commit()
+
+
+def measure(load):
+    """Загружает строки и возвращает время и память"""
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    db.session.expunge_all()
+    return {
+        'rows': count,
+        'seconds': round(elapsed, 3),
+        'peak_mb': round(peak / 2 ** 20, 1),
+        'retained_mb': round(retained / 2 ** 20, 1),
+        'retained_bytes_per_row': round(retained / max(count, 1))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    app = create_app(make_config('sqlite://'))
+    with app.app_context():
+        init_db_schema()
+        seed(args.rows)
+        seed_users(args.rows)
+
+        results = {
+            'tasks': {
+                'orm_entities': measure(lambda: Task.query.options(
+                    joinedload(Task.author), joinedload(Task.assignee), joinedload(Task.column)
+                ).all()),
+                'sqlalchemy_rows': measure(lambda: db.session.execute(task_select()).all()),
+                'read_model': measure(fetch_tasks)
+            },
+            'users': {
+                'orm_entities': measure(lambda: User.query.options(joinedload(User.role)).all()),
+                'sqlalchemy_rows': measure(lambda: db.session.execute(user_select()).all()),
+                'read_model': measure(fetch_users)
+            }
+        }
+
+    print(json.dumps({
+        'benchmark': 'read_models',
+        'revision': git_revision(),
+        'rows': args.rows,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Стоимость сериализации колонок доски с большим числом задач.
+
+Сравнивает прежний способ (ORM-объекты с joinedload, словари с isoformat()
+и стандартный JSON-провайдер Flask) с общими сериализаторами
+app.serializers (запрос только нужных столбцов, строки-кортежи и orjson),
+а также запасной вариант на стандартном json. Отдельно замеряются
+загрузка и построение строк и кодирование в JSON.
+
+Запуск: python benchmarks/serialization.py [--tasks 5000] [--iterations 20]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from common import git_revision, make_config, summarize
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import joinedload
+
+from app import create_app, db, serializers
+from app.cli import init_db_schema
+from app.models import Board, Column, Project, Task, User
+from app.serializers import BOARD_TASK_FIELDS, column_select, serialize_columns, serialize_tasks, task_select
+
+
+def seed(tasks):
+    """Создает одну доску с заданным числом задач"""
+    user = User(username='bench', email='bench@example.com', password_hash='x', role_id=1)
+    project = Project(name='Bench', code='BENCH')
+    db.session.add_all([user, project])
+    db.session.flush()
+    board = Board(name='Bench', project_id=project.id)
+    db.session.add(board)
+    db.session.flush()
+    board.create_default_columns()
+    db.session.flush()
+    column_ids = [column.id for column in board.columns]
+    now = datetime.utcnow()
+    db.session.execute(Task.__table__.insert(), [{
+        'code': f'BENCH-{number:05d}',
+        'title': f'Задача {number}',
+        'description': 'Описание задачи ' * 5,
+        'priority': 'medium',
+        'column_id': column_ids[number % len(column_ids)],
+        'author_id': user.id,
+        'assignee_id': user.id,
+        'estimated_time': 8.0,
+        'remaining_time': 4.0,
+        'spent_time': 4.0,
+        'created_at': now,
+        'updated_at': now,
+        'started_at': now if number % 2 else None
+    } for number in range(tasks)])
+    db.session.commit()
+    return board.id
+
+
+def build_legacy(board_id):
+    """Прежняя реализация get_board_columns"""
+    board = Board.query.get(board_id)
+    columns = board.columns.order_by(Column.order).all()
+    tasks = Task.query.options(joinedload(Task.author), joinedload(Task.assignee)).filter(
+        Task.column_id.in_([column.id for column in columns])
+    ).order_by(Task.id).all()
+
+    tasks_by_column = {}
+    for task in tasks:
+        tasks_by_column.setdefault(task.column_id, []).append(task)
+
+    return {'columns': [{
+        'id': column.id,
+        'name': column.name,
+        'order': column.order,
+        'board_id': column.board_id,
+        'created_at': column.created_at.isoformat(),
+        'tasks': [{
+            'id': task.id,
+            'code': task.code,
+            'title': task.title,
+            'priority': task.priority,
+            'description': task.description,
+            'estimated_time': task.estimated_time,
+            'remaining_time': task.remaining_time,
+            'spent_time': task.spent_time,
+            'author': task.author.username if task.author else None,
+            'author_id': task.author_id,
+            'assignee': task.assignee.username if task.assignee else None,
+            'assignee_id': task.assignee_id,
+            'status': task.status,
+            'created_at': task.created_at.isoformat(),
+            'updated_at': task.updated_at.isoformat(),
+            'started_at': task.started_at.isoformat() if task.started_at else None,
+            'completed_at': task.completed_at.isoformat() if task.completed_at else None
+        } for task in tasks_by_column.get(column.id, [])]
+    } for column in columns]}
+
+
+def build_rows(board_id):
+    """Реализация на общих сериализаторах"""
+    columns = db.session.execute(column_select().where(Column.board_id == board_id).order_by(Column.order)).all()
+    tasks = db.session.execute(task_select().where(Column.board_id == board_id).order_by(Task.id)).all()
+
+    tasks_by_column = {}
+    for task in tasks:
+        tasks_by_column.setdefault(task.column_id, []).append(task)
+
+    columns_list = serialize_columns(columns)
+    for column in columns_list:
+        column['tasks'] = serialize_tasks(tasks_by_column.get(column['id'], []), BOARD_TASK_FIELDS)
+    return {'columns': columns_list}
+
+
+def stdlib_dumps(obj):
+    """Запасной вариант app.serializers.dumps без orjson"""
+    orjson, serializers.orjson = serializers.orjson, None
+    try:
+        return serializers.dumps(obj)
+    finally:
+        serializers.orjson = orjson
+
+
+def measure(fn, iterations):
+    durations = []
+    result = None
+    for _ in range(iterations):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(make_config('sqlite://'))
+    with app.app_context():
+        init_db_schema()
+        board_id = seed(args.tasks)
+        flask_json = DefaultJSONProvider(app)
+
+        legacy_build, legacy_data = measure(lambda: build_legacy(board_id), args.iterations)
+        rows_build, rows_data = measure(lambda: build_rows(board_id), args.iterations)
+        assert json.loads(flask_json.dumps(legacy_data)) == json.loads(serializers.dumps(rows_data))
+
+        results = {
+            'before': {
+                'build': legacy_build,
+                'encode': measure(lambda: flask_json.dumps(legacy_data).encode(), args.iterations)[0]
+            },
+            'after': {
+                'build': rows_build,
+                'encode': measure(lambda: serializers.dumps(rows_data), args.iterations)[0],
+                'encode_stdlib_fallback': measure(lambda: stdlib_dumps(rows_data), args.iterations)[0]
+            }
+        }
+
+    print(json.dumps({
+        'benchmark': 'serialization',
+        'revision': git_revision(),
+        'tasks': args.tasks,
+        'orjson': serializers.orjson is not None,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
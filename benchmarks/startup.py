@@ -0,0 +1,99 @@
+"""Время запуска: импорт и create_app, загрузка gunicorn и время до первого ответа.
+
+Сравнивает запуск gunicorn с preload_app и без него. Время до первого
+ответа измеряется запросом, который обращается к БД (вход несуществующего
+пользователя), чтобы учесть открытие первого соединения.
+
+Запуск: python benchmarks/startup.py [--runs 5] [--workers 4]
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, git_revision, summarize
+
+from bench import _free_port
+
+FACTORY_SNIPPET = (
+    'import time; start = time.perf_counter(); '
+    'from app import create_app; create_app(); '
+    'print(time.perf_counter() - start)'
+)
+
+
+def measure_factory(env, runs):
+    """Время импорта пакета и вызова create_app в новом процессе"""
+    durations = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', FACTORY_SNIPPET], cwd=ROOT, env=env, text=True)
+        durations.append(float(output.strip().splitlines()[-1]))
+    return summarize(durations)
+
+
+def _first_response(port, deadline):
+    body = json.dumps({'username': 'nobody', 'password': 'nobody'})
+    while time.perf_counter() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('POST', '/api/auth/login', body=body, headers={'Content-Type': 'application/json'})
+            status = connection.getresponse().status
+            connection.close()
+            if status == 401:
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError('gunicorn не ответил')
+
+
+def measure_gunicorn(env, runs, workers, preload):
+    """Время от запуска gunicorn до первого успешного ответа"""
+    durations = []
+    for _ in range(runs):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'run:app'],
+            cwd=ROOT, env=dict(env, GUNICORN_PRELOAD='1' if preload else '0'),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _first_response(port, started + 60)
+            durations.append(time.perf_counter() - started)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+    return summarize(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--database-uri', default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'kanban_startup.db')}")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URI=args.database_uri, SECRET_KEY='bench',
+               JWT_SECRET_KEY='bench-secret-key-with-sufficient-length')
+    subprocess.check_call([sys.executable, '-m', 'flask', '--app', 'run', 'init-db'], cwd=ROOT, env=env,
+                          stdout=subprocess.DEVNULL)
+
+    print(json.dumps({
+        'benchmark': 'startup',
+        'revision': git_revision(),
+        'create_app': measure_factory(env, args.runs),
+        'gunicorn_time_to_first_response': {
+            'preload': measure_gunicorn(env, args.runs, args.workers, True),
+            'no_preload': measure_gunicorn(env, args.runs, args.workers, False)
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""История времени задачи: пагинация page/per_page против курсора.
+
+На задаче с большим числом записей времени запрашиваются страницы на
+разной глубине: через page/per_page (COUNT(*) + OFFSET на каждой странице)
+и через cursor/limit (чтение по индексу с позиции курсора). Курсоры для
+глубоких страниц получаются проходом по всем страницам до них.
+
+Запуск: python benchmarks/time_log_pages.py [--logs 200000] [--per-page 50]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from common import git_revision, make_config, summarize
+
+from app import create_app, db
+from app.cli import init_db_schema
+from app.models import TimeLog
+
+from serialization import seed
+
+DEPTHS = (1, 10, 100, 1000)
+
+
+def seed_time_logs(task_id, user_id, logs):
+    start = datetime.utcnow() - timedelta(days=365)
+    db.session.execute(TimeLog.__table__.insert(), [{
+        'task_id': task_id,
+        'user_id': user_id,
+        'logged_by_id': user_id,
+        'spent_hours': 1.0,
+        'remaining_hours': 1.0,
+        'comment': '',
+        'created_at': start + timedelta(minutes=number)
+    } for number in range(logs)])
+    db.session.commit()
+
+
+def measure(client, headers, url, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+    return summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logs', type=int, default=200000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(make_config('sqlite://'))
+    with app.app_context():
+        init_db_schema()
+        seed(1)
+        seed_time_logs(1, 1, args.logs)
+
+    client = app.test_client()
+    token = client.post('/api/auth/register', json={
+        'username': 'bench_manager', 'email': 'bench_manager@example.com', 'password': 'password', 'role': 'manager'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    base = '/api/tasks/1/time-logs'
+
+    # Курсоры страниц на нужной глубине
+    cursors = {1: None}
+    cursor, page = None, 1
+    while page < max(DEPTHS):
+        url = f'{base}?limit={args.per_page}' + (f'&cursor={cursor}' if cursor else '')
+        cursor = client.get(url, headers=headers).get_json()['pagination']['next_cursor']
+        if cursor is None:
+            break
+        page += 1
+        cursors[page] = cursor
+
+    results = {}
+    for depth in DEPTHS:
+        if depth not in cursors:
+            continue
+        cursor_url = f'{base}?limit={args.per_page}' + (f'&cursor={cursors[depth]}' if cursors[depth] else '')
+        results[f'page_{depth}'] = {
+            'offset': measure(client, headers, f'{base}?page={depth}&per_page={args.per_page}', args.repeat),
+            'cursor': measure(client, headers, cursor_url, args.repeat)
+        }
+
+    print(json.dumps({
+        'benchmark': 'time_log_pages',
+        'revision': git_revision(),
+        'logs': args.logs,
+        'per_page': args.per_page,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
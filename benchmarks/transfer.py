@@ -0,0 +1,120 @@
+"""Выгрузка и загрузка проекта: время, размер архива и память.
+
+Проект с заданным числом задач и записей времени выгружается через
+GET /api/projects/<id>/export (ответ читается потоком в файл) и
+загружается в пустую базу через POST /api/projects/import. Пик памяти
+выгрузки измеряется отдельным проходом под tracemalloc: при чтении
+пачками он не зависит от числа записей. На PostgreSQL записи времени
+загружаются через COPY, на SQLite — executemany.
+
+Запуск: python benchmarks/transfer.py [--tasks 20000] [--time-logs 2000000]
+        [--source-uri postgresql://.../source] [--target-uri postgresql://.../target]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import git_revision, make_config
+
+from app import create_app, db, transfer
+from app.cli import init_db_schema
+from app.models import TimeLog
+
+from serialization import seed
+
+BATCH_SIZE = 50000
+
+
+def seed_time_logs(tasks, logs):
+    start = datetime.utcnow() - timedelta(days=365)
+    for offset in range(0, logs, BATCH_SIZE):
+        db.session.execute(TimeLog.__table__.insert(), [{
+            'task_id': number % tasks + 1,
+            'user_id': 1,
+            'logged_by_id': 1,
+            'spent_hours': 0.5,
+            'remaining_hours': 1.0,
+            'comment': 'Работа над задачей',
+            'created_at': start + timedelta(seconds=number)
+        } for number in range(offset, min(logs, offset + BATCH_SIZE))])
+    db.session.commit()
+
+
+def export(client, headers, path):
+    response = client.get('/api/projects/1/export', headers=headers, buffered=False)
+    assert response.status_code == 200
+    with open(path, 'wb') as archive:
+        for chunk in response.response:
+            archive.write(chunk)
+    response.close()
+
+
+def register(client):
+    token = client.post('/api/auth/register', json={
+        'username': 'bench_manager', 'email': 'bench_manager@example.com', 'password': 'password', 'role': 'manager'
+    }).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--time-logs', type=int, default=2000000)
+    parser.add_argument('--source-uri', default=None, help='пустая база для исходного проекта')
+    parser.add_argument('--target-uri', default=None, help='пустая база для импорта')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    source = create_app(make_config(args.source_uri or f'sqlite:///{os.path.join(directory, "source.db")}'))
+    with source.app_context():
+        init_db_schema()
+        seed(args.tasks)
+        seed_time_logs(args.tasks, args.time_logs)
+
+    client = source.test_client()
+    headers = register(client)
+    path = os.path.join(directory, 'project.tmx')
+    start = time.perf_counter()
+    export(client, headers, path)
+    export_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    export(client, headers, path)
+    export_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    target = create_app(make_config(args.target_uri or f'sqlite:///{os.path.join(directory, "target.db")}'))
+    with target.app_context():
+        init_db_schema()
+    client = target.test_client()
+    headers = register(client)
+    start = time.perf_counter()
+    with open(path, 'rb') as archive:
+        response = client.post('/api/projects/import', data=archive, headers=headers)
+    import_seconds = time.perf_counter() - start
+    assert response.status_code == 201, response.get_json()
+
+    print(json.dumps({
+        'benchmark': 'transfer',
+        'revision': git_revision(),
+        'codec': 'msgpack' if transfer.msgpack is not None else 'json',
+        'tasks': args.tasks,
+        'time_logs': args.time_logs,
+        'export': {
+            'seconds': round(export_seconds, 2),
+            'archive_mb': round(os.path.getsize(path) / 1024 / 1024, 2),
+            'peak_python_memory_mb': round(export_peak / 1024 / 1024, 1)
+        },
+        'import': {
+            'seconds': round(import_seconds, 2),
+            'rows': response.get_json()['imported']
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
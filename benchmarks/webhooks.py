@@ -0,0 +1,120 @@
+"""Вебхуки: задержка логирования времени и доставка через outbox.
+
+Сравнивается время ответа POST /api/tasks/<id>/time без вебхуков и с
+подписанными вебхуками (событие пишется в outbox в той же транзакции).
+Доставку принимает локальный HTTP-приемник с искусственной задержкой;
+измеряется время от последнего запроса до доставки всех событий и
+число POST-запросов к приемнику (пачки по WEBHOOK_BATCH_SIZE).
+
+Запуск: python benchmarks/webhooks.py [--requests 500] [--hooks 3] [--receiver-delay-ms 50]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import git_revision, make_config, summarize
+
+from app import create_app
+from app.cli import init_db_schema
+from app.webhooks import start_dispatcher
+
+from serialization import seed
+
+
+def start_receiver(delay):
+    """Локальный приемник вебхуков: считает запросы и события"""
+    stats = {'posts': 0, 'events': 0, 'last': None}
+    lock = threading.Lock()
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(delay)
+            with lock:
+                stats['posts'] += 1
+                stats['events'] += len(body['events'])
+                stats['last'] = time.perf_counter()
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def run(args, hooks, receiver_url, stats):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app(make_config(f'sqlite:///{path}', WEBHOOKS_ENABLED=hooks > 0, WEBHOOK_DISPATCHER_ENABLED=True,
+                                 WEBHOOK_POLL_INTERVAL=0.05))
+    with app.app_context():
+        init_db_schema()
+        seed(1)
+    start_dispatcher(app)
+
+    client = app.test_client()
+    token = client.post('/api/auth/register', json={
+        'username': 'bench_manager', 'email': 'bench_manager@example.com', 'password': 'password', 'role': 'manager'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    for number in range(hooks):
+        client.post('/api/webhooks/', json={'url': f'{receiver_url}/{number}', 'events': ['time.logged']},
+                    headers=headers)
+
+    latencies = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.post('/api/tasks/1/time', json={'spent_hours': 0.1}, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+    finished = time.perf_counter()
+
+    result = {'log_time': summarize(latencies)}
+    if hooks:
+        expected = args.requests * hooks
+        deadline = time.monotonic() + 60
+        while stats['events'] < expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        result['delivery'] = {
+            'events': stats['events'],
+            'expected': expected,
+            'posts': stats['posts'],
+            'drain_after_last_request_ms': round(max(0, stats['last'] - finished) * 1000, 1)
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--hooks', type=int, default=3)
+    parser.add_argument('--receiver-delay-ms', type=float, default=50)
+    args = parser.parse_args()
+
+    server, stats = start_receiver(args.receiver_delay_ms / 1000)
+    receiver_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    results = {
+        'without_webhooks': run(args, 0, receiver_url, stats),
+        'with_webhooks': run(args, args.hooks, receiver_url, stats)
+    }
+    server.shutdown()
+
+    print(json.dumps({
+        'benchmark': 'webhooks',
+        'revision': git_revision(),
+        'requests': args.requests,
+        'hooks': args.hooks,
+        'receiver_delay_ms': args.receiver_delay_ms,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Загрузка исполнителей: сгруппированный запрос против суммирования на клиенте.
+
+Сравнивается прежний способ (загрузить все задачи как в get_tasks и
+просуммировать время в Python) с одним сгруппированным запросом
+app.read_models.fetch_workload — без фильтров и с фильтром по проекту.
+
+На PostgreSQL запрос читает покрывающий индекс ix_tasks_workload
+(index-only scan); на SQLite цифры показывают только относительный выигрыш.
+
+Запуск: python benchmarks/workload.py [--database-uri sqlite://] [--tasks 1000000]
+"""
+import argparse
+import json
+import time
+
+from common import git_revision, make_config, summarize
+
+from app import create_app, db
+from app.cli import init_db_schema
+from app.read_models import fetch_tasks, fetch_workload, task_filters
+
+from datagen import generate
+
+
+def client_side():
+    """Прежний способ: все задачи целиком и суммирование в Python"""
+    totals = {}
+    for task in fetch_tasks():
+        key = (task.assignee_id, task.board_id, task.column_id)
+        remaining, estimated, spent = totals.get(key, (0.0, 0.0, 0.0))
+        totals[key] = (remaining + (task.remaining_time or 0), estimated + (task.estimated_time or 0),
+                       spent + (task.spent_time or 0))
+    return totals
+
+
+def measure(load, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        latencies.append(time.perf_counter() - start)
+        db.session.rollback()
+    return summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-seed', action='store_true', help='использовать уже заполненную базу')
+    args = parser.parse_args()
+
+    app = create_app(make_config(args.database_uri))
+    with app.app_context():
+        project_id = None
+        if not args.skip_seed:
+            init_db_schema()
+            project_id = generate(tasks=args.tasks, time_logs=0)['hot_project_id']
+
+        results = {
+            'client_side': measure(client_side, args.repeat),
+            'grouped_query': measure(lambda: fetch_workload(), args.repeat)
+        }
+        if project_id is not None:
+            conditions = task_filters({'project_id': str(project_id)})
+            results['grouped_query_project'] = measure(lambda: fetch_workload(conditions), args.repeat)
+
+    print(json.dumps({
+        'benchmark': 'workload',
+        'revision': git_revision(),
+        'tasks': args.tasks,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
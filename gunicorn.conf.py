@@ -0,0 +1,34 @@
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+
+# Приложение импортируется один раз в мастере; create_app не открывает
+# соединений с БД, поэтому воркеры получают его копию при fork
+preload_app = os.getenv('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes', 'on')
+
+
+def post_fork(server, worker):
+    """Сбрасывает пулы соединений, унаследованные от мастера"""
+    if server.cfg.preload_app:
+        from app import db
+        from run import app
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Запускает доставку вебхуков в воркере (при WEBHOOK_DISPATCHER_ENABLED)"""
+    from app.webhooks import start_dispatcher
+
+    # В ASGI-режиме Flask-приложение обернуто в AsyncReadApp
+    start_dispatcher(getattr(worker.wsgi, 'flask_app', worker.wsgi))
+
+
+def child_exit(server, worker):
+    """Удаляет файлы метрик завершившегося воркера (multiprocess-режим Prometheus)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,31 @@
+"""user search indexes
+
+Revision ID: fd209880bae2
+Revises: 7ddad6e02261
+Create Date: 2026-10-19 15:12:08.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fd209880bae2'
+down_revision = '7ddad6e02261'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Индексы по lower(...) для поиска по префиксу; на PostgreSQL с varchar_pattern_ops,
+    # чтобы LIKE 'prefix%' использовал индекс независимо от локали БД
+    for column in ('username', 'email'):
+        if op.get_bind().dialect.name == 'postgresql':
+            op.execute(f'CREATE INDEX ix_users_{column}_lower ON users (lower({column}) varchar_pattern_ops)')
+        else:
+            op.create_index(f'ix_users_{column}_lower', 'users', [sa.text(f'lower({column})')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_username_lower', table_name='users')
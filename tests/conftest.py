@@ -0,0 +1,84 @@
+"""Общие фикстуры тестов."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Скрипты benchmarks/ импортируют соседние модули (datagen, common) напрямую
+for path in (ROOT, os.path.join(ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from app import create_app  # noqa: E402
+from app.cli import init_db_schema  # noqa: E402
+from app.config import Config  # noqa: E402
+
+PASSWORD = 'password'
+
+
+def make_config(database_uri='sqlite://', **overrides):
+    """Конфигурация приложения для тестов: SQLite (по умолчанию в памяти), без ограничения частоты"""
+    attrs = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SECRET_KEY': 'test',
+        'JWT_SECRET_KEY': 'test-secret-key-with-sufficient-length',
+        'RATE_LIMIT_ENABLED': False,
+        'INSTRUMENTATION_ENABLED': False
+    }
+    attrs.update(overrides)
+    return type('TestConfig', (Config,), attrs)
+
+
+def make_app(database_uri='sqlite://', **overrides):
+    """Приложение с созданной схемой БД"""
+    app = create_app(make_config(database_uri, **overrides))
+    with app.app_context():
+        init_db_schema()
+    return app
+
+
+def register(client, username, role='manager'):
+    """Регистрирует пользователя; возвращает заголовки авторизации"""
+    response = client.post('/api/auth/register', json={
+        'username': username, 'email': f'{username}@example.com', 'password': PASSWORD, 'role': role
+    })
+    assert response.status_code == 201, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+async def asgi_get(app, path, headers):
+    """GET-запрос к ASGI-приложению; возвращает статус, заголовки и тело ответа"""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': path, 'root_path': '',
+        'query_string': query.encode(), 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]['status'], dict(messages[0]['headers']), messages[1]['body']
+
+
+@pytest.fixture
+def app():
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def manager(client):
+    """Заголовки авторизации менеджера"""
+    return register(client, 'manager')
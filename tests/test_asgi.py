@@ -0,0 +1,46 @@
+"""Асинхронный режим: синхронные хуки Flask не блокируют цикл событий."""
+import asyncio
+import threading
+import time
+
+from app.asgi import AsyncReadApp
+
+from conftest import asgi_get, make_app, register
+
+
+def test_hooks_run_outside_event_loop(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'asgi.db'}")
+    hook_threads = []
+
+    @app.before_request
+    def slow_hook():
+        # Блокирующий хук, например, ожидание БД при сбросе нагрузки
+        hook_threads.append(threading.get_ident())
+        time.sleep(0.2)
+
+    headers = register(app.test_client(), 'manager')
+    hook_threads.clear()
+    asgi_app = AsyncReadApp(app)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            status, *_ = await asgi_get(asgi_app, '/api/tasks/', headers)
+        finally:
+            task.cancel()
+            await asgi_app.primary.dispose()
+        return status, ticks, threading.get_ident()
+
+    status, ticks, loop_thread = asyncio.run(run())
+    assert status == 200
+    assert hook_threads and loop_thread not in hook_threads
+    # Пока хук ждет, цикл событий продолжает работать
+    assert ticks >= 5
@@ -0,0 +1,62 @@
+"""Журнал изменений: фильтры эндпоинта и события массовых операций Core."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db
+from app.archive import DONE_COLUMN, archive_tasks
+from app.audit import CREATE, DELETE
+from app.models import AuditLog, Column, Task
+
+from conftest import make_app, register
+
+
+@pytest.fixture
+def audited():
+    """Приложение с синхронным журналом: события видны сразу после запроса"""
+    app = make_app(AUDIT_MODE='sync')
+    client = app.test_client()
+    headers = register(client, 'manager')
+    assert client.post('/api/projects/', json={'name': 'Audit', 'code': 'AUD'}, headers=headers).status_code == 201
+    return app, client, headers
+
+
+def _events(app, entity, action):
+    with app.app_context():
+        return db.session.execute(
+            select(AuditLog.entity_id).where(AuditLog.entity == entity, AuditLog.action == action)
+            .order_by(AuditLog.id)
+        ).scalars().all()
+
+
+@pytest.mark.parametrize('query', ['entity_id=abc', 'user_id=1.5', 'created_from=yesterday', 'created_to=2024-13-01'])
+def test_malformed_filters_rejected(audited, query):
+    app, client, headers = audited
+    assert client.get(f'/api/audit/?{query}', headers=headers).status_code == 400
+
+
+def test_filters_applied(audited):
+    app, client, headers = audited
+    task = client.post('/api/tasks/', json={'title': 'Task', 'board_id': 1}, headers=headers).get_json()['task']
+
+    entries = client.get(f"/api/audit/?entity=tasks&entity_id={task['id']}&user_id=1"
+                         f"&created_from={(datetime.utcnow() - timedelta(hours=1)).isoformat()}",
+                         headers=headers).get_json()['entries']
+    assert [(entry['action'], entry['entity_id']) for entry in entries] == [(CREATE, task['id'])]
+
+
+def test_archive_logs_deleted_tasks(audited):
+    app, client, headers = audited
+    task = client.post('/api/tasks/', json={'title': 'Task', 'board_id': 1}, headers=headers).get_json()['task']
+    with app.app_context():
+        done = db.session.execute(select(Column.id).where(Column.name == DONE_COLUMN)).scalar()
+        db.session.execute(update(Task).where(Task.id == task['id']).values(
+            column_id=done, completed_at=datetime.utcnow() - timedelta(days=30)
+        ))
+        db.session.commit()
+
+        assert archive_tasks(older_than_days=1) == (1, 0)
+
+    # Задачи удаляются запросом Core, мимо after_flush
+    assert _events(app, 'tasks', DELETE) == [task['id']]
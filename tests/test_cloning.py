@@ -0,0 +1,60 @@
+"""Копирование проекта: соответствие досок, колонок и задач и события журнала изменений."""
+from sqlalchemy import select
+
+from app import db
+from app.audit import CREATE
+from app.models import AuditLog, Board, Column, Task
+
+from conftest import make_app, register
+
+
+def _layout(project_id):
+    """Задачи проекта как (доска, колонка, название) по возрастанию id"""
+    return db.session.execute(
+        select(Board.name, Column.name, Task.title).join(Column, Task.column_id == Column.id)
+        .join(Board, Column.board_id == Board.id).where(Board.project_id == project_id).order_by(Task.id)
+    ).all()
+
+
+def test_clone_maps_boards_columns_and_tasks():
+    app = make_app(AUDIT_MODE='sync')
+    client = app.test_client()
+    headers = register(client, 'manager')
+    source = client.post('/api/projects/', json={'name': 'Source', 'code': 'SRC'}, headers=headers).get_json()
+    with app.app_context():
+        # Вторая доска и задачи в разных колонках, добавленные не по порядку id колонок
+        board = Board(name='Second', project_id=source['project']['id'])
+        db.session.add(board)
+        db.session.flush()
+        board.create_default_columns()
+        columns = db.session.execute(
+            select(Column.id).join(Board).where(Board.project_id == source['project']['id']).order_by(Column.id.desc())
+        ).scalars().all()
+        db.session.add_all(Task(code=f'SRC-{index:03}', title=f'Task {index}', column_id=column_id, author_id=1)
+                           for index, column_id in enumerate(columns[::3], 1))
+        db.session.commit()
+        expected = _layout(source['project']['id'])
+
+    response = client.post(f"/api/projects/{source['project']['id']}/clone",
+                           json={'name': 'Copy', 'code': 'COPY', 'tasks': 'all'}, headers=headers)
+    assert response.status_code == 201
+    copy = response.get_json()
+    assert copy['copied']['tasks'] == len(expected)
+
+    with app.app_context():
+        assert _layout(copy['project']['id']) == expected
+        board_ids = db.session.execute(
+            select(Board.id).where(Board.project_id == copy['project']['id'])
+        ).scalars().all()
+        column_ids = db.session.execute(select(Column.id).where(Column.board_id.in_(board_ids))).scalars().all()
+        task_ids = db.session.execute(select(Task.id).where(Task.column_id.in_(column_ids))).scalars().all()
+
+        # Копии записаны запросами Core, но попадают в журнал
+        logged = db.session.execute(
+            select(AuditLog.entity, AuditLog.entity_id).where(AuditLog.action == CREATE,
+                                                              AuditLog.endpoint == 'projects.clone_project')
+        ).all()
+        assert sorted(logged) == sorted([('projects', copy['project']['id'])] +
+                                        [('boards', board_id) for board_id in board_ids] +
+                                        [('columns', column_id) for column_id in column_ids] +
+                                        [('tasks', task_id) for task_id in task_ids])
@@ -0,0 +1,116 @@
+"""Заголовок Idempotency-Key: повтор запроса и ожидание выполняющегося."""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import db
+from app.idempotency import HEADER
+from app.models import IdempotencyKey, Project
+
+from conftest import make_app, register
+
+BODY = json.dumps({'name': 'Idempotent', 'code': 'IDEM'}).encode()
+
+
+def _create_project(client, headers, key, body=BODY):
+    return client.post('/api/projects/', data=body, content_type='application/json',
+                       headers={**headers, HEADER: key})
+
+
+def _pending_claim(app, key, user_id=1):
+    """Ключ, занятый выполняющимся запросом (ответ еще не сохранен)"""
+    now = datetime.utcnow()
+    with app.app_context():
+        record = IdempotencyKey(user_id=user_id, key=key, created_at=now, expires_at=now + timedelta(hours=1),
+                                request_hash=hashlib.sha256(b'POST /api/projects/\n' + BODY).hexdigest())
+        db.session.add(record)
+        db.session.commit()
+        return record.id
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Приложение на файловой SQLite: ожидающий повтор и завершение запроса идут из разных потоков"""
+    return make_app(f"sqlite:///{tmp_path / 'idempotency.db'}", IDEMPOTENCY_WAIT_SECONDS=5)
+
+
+def test_replay_returns_stored_response(client, manager):
+    first = _create_project(client, manager, 'create-1')
+    second = _create_project(client, manager, 'create-1')
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    with client.application.app_context():
+        assert Project.query.filter_by(code='IDEM').count() == 1
+
+
+def test_key_reused_for_other_request(client, manager):
+    assert _create_project(client, manager, 'create-1').status_code == 201
+
+    response = _create_project(client, manager, 'create-1', json.dumps({'name': 'Other', 'code': 'OTHER'}).encode())
+    assert response.status_code == 422
+
+
+def test_client_error_is_replayed(client, manager):
+    assert _create_project(client, manager, 'create-1', b'{}').status_code == 400
+    # Ответы 4xx сохраняются (не сохраняются только 5xx): повтор получает тот же ответ
+    replay = _create_project(client, manager, 'create-1', b'{}')
+    assert replay.status_code == 400
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+
+
+def test_retry_waits_for_running_request(file_app):
+    client = file_app.test_client()
+    headers = register(client, 'manager')
+    record_id = _pending_claim(file_app, 'create-1')
+
+    def finish():
+        time.sleep(0.3)
+        with file_app.app_context():
+            db.session.execute(update(IdempotencyKey).where(IdempotencyKey.id == record_id).values(
+                status_code=201, response_body=b'{"done": true}', content_type='application/json'
+            ))
+            db.session.commit()
+
+    worker = threading.Thread(target=finish)
+    worker.start()
+    started = time.monotonic()
+    response = _create_project(client, headers, 'create-1')
+    worker.join()
+
+    assert time.monotonic() - started >= 0.3
+    assert response.status_code == 201
+    assert response.get_json() == {'done': True}
+    assert response.headers['Idempotent-Replayed'] == 'true'
+    with file_app.app_context():
+        assert Project.query.filter_by(code='IDEM').count() == 0
+
+
+def test_retry_gives_up_waiting(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'idempotency.db'}", IDEMPOTENCY_WAIT_SECONDS=0.2)
+    client = app.test_client()
+    headers = register(client, 'manager')
+    _pending_claim(app, 'create-1')
+
+    response = _create_project(client, headers, 'create-1')
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_abandoned_claim_is_taken_over(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'idempotency.db'}", IDEMPOTENCY_LOCK_TIMEOUT_SECONDS=0)
+    client = app.test_client()
+    headers = register(client, 'manager')
+    _pending_claim(app, 'create-1')
+
+    response = _create_project(client, headers, 'create-1')
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
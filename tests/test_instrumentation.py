@@ -0,0 +1,26 @@
+"""Замеры SQL-запросов для Server-Timing."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.instrumentation import current_timings
+
+from conftest import make_app
+
+
+def test_failed_statement_does_not_skew_timings():
+    app = make_app(INSTRUMENTATION_ENABLED=True)
+    with app.test_request_context('/api/tasks/'):
+        app.preprocess_request()
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM missing_table'))
+        db.session.rollback()
+
+        # Время начала упавшего запроса снято со стека соединения
+        connection = db.session.connection()
+        assert connection.info.get('_query_start') == []
+        connection.execute(text('SELECT 1'))
+        assert connection.info.get('_query_start') == []
+        assert current_timings().query_count == 1
@@ -0,0 +1,26 @@
+"""Бюджеты SQL-запросов эндпоинтов (benchmarks/query_budgets.py): число запросов
+не растет с объемом данных и не превышает бюджет."""
+import pytest
+
+from query_budgets import ENDPOINTS, measure
+
+SMALL, LARGE = 10, 1000
+
+
+@pytest.fixture(scope='module')
+def measurements():
+    """Запросы и статусы каждого эндпоинта на наборах из 10 и 1000 строк"""
+    return {scale: measure(scale) for scale in (SMALL, LARGE)}
+
+
+@pytest.mark.parametrize('name, expected_status, budget', [
+    pytest.param(name, expected_status, budget, id=name)
+    for name, method, path, body, role, expected_status, budget in ENDPOINTS
+])
+def test_query_budget(measurements, name, expected_status, budget):
+    (small, small_statuses), (large, large_statuses) = measurements[SMALL], measurements[LARGE]
+
+    assert small_statuses[name] == expected_status
+    assert large_statuses[name] == expected_status
+    assert len(small[name]) == len(large[name]), 'число запросов растет с объемом данных (N+1)'
+    assert len(large[name]) <= budget
@@ -0,0 +1,72 @@
+"""Ограничение частоты запросов: 429 с Retry-After в Flask-приложении и в асинхронном режиме."""
+import asyncio
+
+import pytest
+
+from app.asgi import AsyncReadApp
+
+from conftest import asgi_get, make_app, register
+
+LIMITS = {
+    'RATE_LIMIT_ENABLED': True,
+    'RATE_LIMIT_CHEAP_RATE': 0.1,
+    'RATE_LIMIT_CHEAP_BURST': 3,
+    'RATE_LIMIT_EXPENSIVE_RATE': 0.1,
+    'RATE_LIMIT_EXPENSIVE_BURST': 2
+}
+
+
+def _statuses(client, path, headers, count):
+    responses = [client.get(path, headers=headers) for _ in range(count)]
+    return [response.status_code for response in responses], responses[-1]
+
+
+@pytest.fixture
+def limited(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'limits.db'}", **LIMITS)
+    client = app.test_client()
+    # Регистрация расходует корзину адреса клиента, запросы с токеном — корзину пользователя
+    return app, client, register(client, 'manager')
+
+
+def test_cheap_endpoint_limited(limited):
+    app, client, headers = limited
+
+    statuses, response = _statuses(client, '/api/projects/', headers, 4)
+    assert statuses == [200, 200, 200, 429]
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_expensive_endpoint_has_own_budget(limited):
+    app, client, headers = limited
+
+    statuses, response = _statuses(client, '/api/tasks/', headers, 3)
+    assert statuses == [200, 200, 429]
+    assert int(response.headers['Retry-After']) >= 1
+    # Дешевые эндпоинты ограничены отдельно
+    assert client.get('/api/projects/', headers=headers).status_code == 200
+
+
+def test_limits_are_per_user(limited):
+    app, client, headers = limited
+    other = register(client, 'other')
+
+    _statuses(client, '/api/tasks/', headers, 3)
+    assert client.get('/api/tasks/', headers=other).status_code == 200
+
+
+def test_async_endpoint_limited(limited):
+    app, client, headers = limited
+    asgi_app = AsyncReadApp(app)
+
+    async def run():
+        try:
+            return [await asgi_get(asgi_app, '/api/tasks/', headers) for _ in range(3)]
+        finally:
+            await asgi_app.primary.dispose()
+
+    responses = asyncio.run(run())
+    assert [status for status, *_ in responses] == [200, 200, 429]
+    assert int(responses[-1][1][b'retry-after']) >= 1
+    # Асинхронный режим расходует ту же корзину, что и Flask-приложение
+    assert client.get('/api/tasks/', headers=headers).status_code == 429
@@ -0,0 +1,134 @@
+"""Маршрутизация чтения между основной БД и репликой (две базы SQLite)."""
+import asyncio
+import json
+import shutil
+
+import pytest
+
+from app.asgi import AsyncReadApp
+from app.database import STICKY_COOKIE, STICKY_HEADER
+
+from conftest import asgi_get, make_app, register
+
+
+def _codes(client, headers, cookie=None):
+    if cookie is not None:
+        headers = {**headers, 'Cookie': f'{STICKY_COOKIE}={cookie}'}
+    response = client.get('/api/projects/', headers=headers)
+    assert response.status_code == 200
+    return {project['code'] for project in response.get_json()['projects']}
+
+
+def _sticky_cookie(response):
+    for header in response.headers.getlist('Set-Cookie'):
+        name, _, rest = header.partition('=')
+        if name == STICKY_COOKIE:
+            return rest.split(';', 1)[0]
+    return None
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    """Основная БД с проектом OLD и ее копия в роли реплики; два приложения — как два воркера"""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = make_app(f'sqlite:///{primary}')
+    client = app.test_client(use_cookies=False)
+    writer, reader = register(client, 'writer'), register(client, 'reader')
+    assert client.post('/api/projects/', json={'name': 'Old', 'code': 'OLD'}, headers=writer).status_code == 201
+    shutil.copy(primary, replica)
+
+    config = {'DATABASE_REPLICA_URIS': [f'sqlite:///{replica}'], 'REPLICA_STICKY_SECONDS': 60}
+    return make_app(f'sqlite:///{primary}', **config), make_app(f'sqlite:///{primary}', **config), writer, reader
+
+
+def test_reads_go_to_replica(replicated):
+    app, _, headers, _ = replicated
+    client = app.test_client(use_cookies=False)
+
+    # Запись идет в основную БД, реплика ее не видит
+    response = client.post('/api/projects/', json={'name': 'New', 'code': 'NEW'}, headers=headers)
+    assert response.status_code == 201
+    assert _codes(client, headers) == {'OLD'}
+
+
+def test_read_your_writes_across_processes(replicated):
+    app, other_worker, headers, _ = replicated
+    response = app.test_client(use_cookies=False).post('/api/projects/', json={'name': 'New', 'code': 'NEW'},
+                                                       headers=headers)
+    cookie = _sticky_cookie(response)
+    assert cookie is not None
+
+    # Окно read-your-writes действует и в другом экземпляре приложения (другом воркере)
+    assert _codes(other_worker.test_client(use_cookies=False), headers, cookie) == {'OLD', 'NEW'}
+
+
+def test_sticky_cookie_is_bound_to_user(replicated):
+    app, other_worker, headers, reader = replicated
+    client = app.test_client(use_cookies=False)
+    cookie = _sticky_cookie(client.post('/api/projects/', json={'name': 'New', 'code': 'NEW'}, headers=headers))
+
+    assert _codes(other_worker.test_client(use_cookies=False), reader, cookie) == {'OLD'}
+    assert _codes(other_worker.test_client(use_cookies=False), headers, 'forged') == {'OLD'}
+
+
+def test_failed_write_is_not_sticky(replicated):
+    app, _, headers, _ = replicated
+    response = app.test_client(use_cookies=False).post('/api/projects/', json={'name': 'Dup', 'code': 'OLD'},
+                                                       headers=headers)
+    assert response.status_code >= 400
+    assert _sticky_cookie(response) is None
+
+
+def test_read_your_writes_via_header(replicated):
+    app, other_worker, headers, reader = replicated
+    response = app.test_client(use_cookies=False).post('/api/projects/', json={'name': 'New', 'code': 'NEW'},
+                                                       headers={**headers, 'Origin': 'http://spa.example.com'})
+    token = response.headers[STICKY_HEADER]
+    # Заголовок доступен скриптам на другом домене
+    assert STICKY_HEADER in response.headers['Access-Control-Expose-Headers']
+
+    # Клиент без cookie возвращает токен в заголовке запроса
+    client = other_worker.test_client(use_cookies=False)
+    assert _codes(client, {**headers, STICKY_HEADER: token}) == {'OLD', 'NEW'}
+    assert _codes(client, {**reader, STICKY_HEADER: token}) == {'OLD'}
+
+
+def _column_names(client, headers):
+    response = client.get('/api/columns/board/1', headers=headers)
+    assert response.status_code == 200
+    return [column['name'] for column in response.get_json()['columns']]
+
+
+def test_writer_skips_replica_snapshot(replicated):
+    app, other_worker, headers, reader = replicated
+    response = app.test_client(use_cookies=False).post('/api/columns/', json={'name': 'New', 'board_id': 1},
+                                                       headers=headers)
+    assert response.status_code == 201
+    token = response.headers[STICKY_HEADER]
+
+    # Снимок доски в другом воркере построен по реплике, где колонки еще нет
+    client = other_worker.test_client(use_cookies=False)
+    assert 'New' not in _column_names(client, reader)
+    # Автор записи читает основную БД мимо снимка, а его чтение не попадает к читающим с реплики
+    assert 'New' in _column_names(client, {**headers, STICKY_HEADER: token})
+    assert 'New' not in _column_names(client, reader)
+
+
+def test_async_writer_skips_replica_snapshot(replicated):
+    app, other_worker, headers, reader = replicated
+    token = app.test_client(use_cookies=False).post('/api/columns/', json={'name': 'New', 'board_id': 1},
+                                                    headers=headers).headers[STICKY_HEADER]
+    asgi_app = AsyncReadApp(other_worker)
+
+    async def run():
+        try:
+            return [json.loads((await asgi_get(asgi_app, '/api/columns/board/1', request_headers))[2])
+                    for request_headers in (reader, {**headers, STICKY_HEADER: token})]
+        finally:
+            await asgi_app.primary.dispose()
+            for _, replica in asgi_app.replicas:
+                await replica.dispose()
+
+    stale, fresh = asyncio.run(run())
+    assert 'New' not in [column['name'] for column in stale['columns']]
+    assert 'New' in [column['name'] for column in fresh['columns']]
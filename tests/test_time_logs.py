@@ -0,0 +1,47 @@
+"""Записи времени задачи: постраничная выдача по курсору."""
+import pytest
+
+from conftest import register
+
+
+@pytest.fixture
+def task_with_logs(client, manager):
+    assert client.post('/api/projects/', json={'name': 'Logs', 'code': 'LOGS'}, headers=manager).status_code == 201
+    task = client.post('/api/tasks/', json={'title': 'Task', 'board_id': 1}, headers=manager).get_json()['task']
+    task_id = task['id']
+    for _ in range(5):
+        assert client.post(f'/api/tasks/{task_id}/time', json={'spent_hours': 0.5}, headers=manager).status_code == 200
+    return task_id
+
+
+def test_cursor_pages_cover_all_logs(client, manager, task_with_logs):
+    ids, cursor = [], None
+    while True:
+        path = f'/api/tasks/{task_with_logs}/time-logs?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(path, headers=manager).get_json()
+        ids.extend(log['id'] for log in data['time_logs'])
+        cursor = data['pagination']['next_cursor']
+        if cursor is None:
+            break
+
+    assert ids == [5, 4, 3, 2, 1]
+
+
+def test_cursor_and_page_entries_match(client, manager, task_with_logs):
+    by_cursor = client.get(f'/api/tasks/{task_with_logs}/time-logs?limit=5', headers=manager).get_json()
+    by_page = client.get(f'/api/tasks/{task_with_logs}/time-logs?per_page=5', headers=manager).get_json()
+
+    # Обе выдачи возвращают записи в одном формате (created_at — строка ISO 8601)
+    assert by_cursor['time_logs'] == by_page['time_logs']
+    assert isinstance(by_cursor['time_logs'][0]['created_at'], str)
+
+
+def test_bad_cursor_rejected(client, manager, task_with_logs):
+    response = client.get(f'/api/tasks/{task_with_logs}/time-logs?cursor=abc', headers=manager)
+    assert response.status_code == 400
+    assert client.get(f'/api/tasks/{task_with_logs}/time-logs?limit=x', headers=manager).status_code == 400
+
+
+def test_feed_limited_to_own_logs(client, manager, task_with_logs):
+    executor = register(client, 'executor', role='executor')
+    assert client.get('/api/tasks/time-logs?user_id=1', headers=executor).status_code == 403
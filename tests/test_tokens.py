@@ -0,0 +1,76 @@
+"""Отзыв JWT: выход с текущего токена и отзыв всех токенов увеличением версии."""
+from app import db
+from app.models import User
+
+from conftest import PASSWORD, make_app, register
+
+
+def _login(client, username='manager'):
+    response = client.post('/api/auth/login', json={'username': username, 'password': PASSWORD})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_current_token(client, manager):
+    other = _bearer(_login(client)['access_token'])
+
+    assert client.post('/api/auth/logout', headers=manager).status_code == 200
+
+    response = client.get('/api/auth/me', headers=manager)
+    assert response.status_code == 401
+    assert response.get_json() == {'msg': 'Token has been revoked'}
+    # Другие токены пользователя продолжают действовать
+    assert client.get('/api/auth/me', headers=other).status_code == 200
+
+
+def test_logout_revokes_passed_refresh_token(client, manager):
+    tokens = _login(client)
+    headers = _bearer(tokens['access_token'])
+
+    assert client.post('/api/auth/logout', json={'refresh_token': tokens['refresh_token']},
+                       headers=headers).status_code == 200
+    assert client.post('/api/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 401
+
+
+def test_logout_all_bumps_token_version(client, manager):
+    tokens = _login(client)
+    with client.application.app_context():
+        version = db.session.execute(db.select(User.token_version).filter_by(username='manager')).scalar()
+
+    assert client.post('/api/auth/logout?all=true', headers=manager).status_code == 200
+
+    with client.application.app_context():
+        assert db.session.execute(db.select(User.token_version).filter_by(username='manager')).scalar() == version + 1
+    # Все выданные ранее токены отозваны, включая refresh-токены
+    assert client.get('/api/auth/me', headers=_bearer(tokens['access_token'])).status_code == 401
+    assert client.post('/api/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 401
+
+    # Новые токены выдаются с новой версией и действуют
+    fresh = _login(client)
+    assert client.get('/api/auth/me', headers=_bearer(fresh['access_token'])).status_code == 200
+    refreshed = client.post('/api/auth/refresh', headers=_bearer(fresh['refresh_token']))
+    assert refreshed.status_code == 200
+    assert client.get('/api/auth/me', headers=_bearer(refreshed.get_json()['access_token'])).status_code == 200
+
+
+def test_revocation_seen_by_other_worker(tmp_path):
+    # Второй экземпляр приложения (другой воркер) узнает об отзыве при перестроении фильтра
+    uri = f"sqlite:///{tmp_path / 'tokens.db'}"
+    worker = make_app(uri).test_client()
+    other_worker = make_app(uri, JWT_REVOCATION_REFRESH_SECONDS=0).test_client()
+    headers = register(worker, 'manager')
+    assert other_worker.get('/api/auth/me', headers=headers).status_code == 200
+
+    assert worker.post('/api/auth/logout', headers=headers).status_code == 200
+    assert other_worker.get('/api/auth/me', headers=headers).status_code == 401
+
+
+def test_other_user_tokens_unaffected(client, manager):
+    executor = register(client, 'executor', role='executor')
+
+    assert client.post('/api/auth/logout?all=true', headers=manager).status_code == 200
+    assert client.get('/api/auth/me', headers=executor).status_code == 200
@@ -0,0 +1,92 @@
+"""Выгрузка и загрузка проекта: архивные задачи переносятся вместе с живыми."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db, transfer
+from app.archive import DONE_COLUMN, archive_tasks
+from app.audit import CREATE
+from app.models import ArchivedTask, ArchivedTimeLog, AuditLog, Column, Task
+from app.utils import generate_task_code
+
+from conftest import make_app, register
+
+
+@pytest.fixture
+def exported():
+    """Проект с архивной задачей (с записью времени) и живой задачей; возвращает архив выгрузки"""
+    app = make_app(AUDIT_MODE='sync')
+    client = app.test_client()
+    headers = register(client, 'manager')
+    assert client.post('/api/projects/', json={'name': 'Source', 'code': 'SRC'}, headers=headers).status_code == 201
+    done = client.post('/api/tasks/', json={'title': 'Done', 'board_id': 1}, headers=headers).get_json()['task']
+    assert client.post(f"/api/tasks/{done['id']}/time", json={'spent_hours': 2}, headers=headers).status_code == 200
+    with app.app_context():
+        done_column = db.session.execute(select(Column.id).where(Column.name == DONE_COLUMN)).scalar()
+        db.session.execute(update(Task).where(Task.id == done['id']).values(
+            column_id=done_column, completed_at=datetime.utcnow() - timedelta(days=30)
+        ))
+        db.session.commit()
+        assert archive_tasks(older_than_days=1) == (1, 1)
+    assert client.post('/api/tasks/', json={'title': 'Live', 'board_id': 1}, headers=headers).status_code == 201
+
+    response = client.get('/api/projects/1/export', headers=headers)
+    assert response.status_code == 200
+    return app, client, headers, response.data
+
+
+def _import(client, headers, data, code):
+    return client.post(f'/api/projects/import?code={code}', data=data, headers=headers,
+                       content_type='application/octet-stream')
+
+
+def test_archived_tasks_round_trip(exported):
+    app, client, headers, data = exported
+
+    response = _import(client, headers, data, 'NEW')
+    assert response.status_code == 201
+    imported = response.get_json()
+    assert imported['imported']['archived_tasks'] == 1
+    assert imported['imported']['archived_time_logs'] == 1
+
+    with app.app_context():
+        source, copy = db.session.execute(select(ArchivedTask).order_by(ArchivedTask.id)).scalars().all()
+        assert copy.project_id == imported['project']['id']
+        assert copy.id not in (source.id, *db.session.execute(select(Task.id)).scalars())
+        assert copy.code == 'NEW-001'
+        assert (copy.title, copy.spent_time) == (source.title, source.spent_time)
+        logs = db.session.execute(select(ArchivedTimeLog.task_id, ArchivedTimeLog.spent_hours)
+                                  .order_by(ArchivedTimeLog.id)).all()
+        assert logs[1] == (copy.id, 2)
+        # Код архивной задачи занят и после загрузки
+        assert generate_task_code('NEW') == 'NEW-003'
+
+
+def test_import_is_audited(exported):
+    app, client, headers, data = exported
+
+    assert _import(client, headers, data, 'NEW').status_code == 201
+    with app.app_context():
+        tasks = db.session.execute(select(Task.id).where(Task.code.like('NEW-%'))).scalars().all()
+        logged = db.session.execute(select(AuditLog.entity_id).where(
+            AuditLog.entity == 'tasks', AuditLog.action == CREATE, AuditLog.endpoint == 'projects.import_project'
+        )).scalars().all()
+        assert logged == tasks
+        assert db.session.execute(select(AuditLog.id).where(
+            AuditLog.entity == 'boards', AuditLog.endpoint == 'projects.import_project'
+        )).first() is not None
+
+
+def test_archive_without_archived_frames_loads(exported, monkeypatch):
+    app, client, headers, data = exported
+    # Архив в формате до появления кадров архивных задач
+    queries = transfer._export_queries
+    monkeypatch.setattr(transfer, '_export_queries', lambda project_id: [
+        query for query in queries(project_id) if not query[0].startswith('archived_')
+    ])
+    old = client.get('/api/projects/1/export', headers=headers).data
+
+    response = _import(client, headers, old, 'OLD')
+    assert response.status_code == 201
+    assert response.get_json()['imported']['tasks'] == 1
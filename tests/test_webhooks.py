@@ -0,0 +1,178 @@
+"""Вебхуки: событие пишется в outbox вместе с изменением и доставляется диспетчером
+на локальный HTTP-приемник."""
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models import WebhookEvent
+from app.webhooks import DELIVERED, FAILED, PENDING, TIME_LOGGED, WebhookDispatcher, sign
+
+from conftest import make_app, register
+
+SECRET = 'webhook-secret'
+
+
+@pytest.fixture
+def receiver():
+    """Локальный приемник вебхуков; отвечает кодом из failures (по умолчанию 204)"""
+    state = {'requests': [], 'failures': []}
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            state['requests'].append((self.path, dict(self.headers), body))
+            self.send_response(state['failures'].pop(0) if state['failures'] else 204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state['url'] = f'http://127.0.0.1:{server.server_address[1]}'
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    """Приложение с задачей и менеджером; фоновый диспетчер не запускается, доставку ведет тест"""
+    app = make_app(f"sqlite:///{tmp_path / 'webhooks.db'}", WEBHOOK_BATCH_SIZE=2, WEBHOOK_BACKOFF_BASE=0,
+                   WEBHOOK_MAX_ATTEMPTS=2)
+    client = app.test_client()
+    headers = register(client, 'manager')
+    assert client.post('/api/projects/', json={'name': 'Hooks', 'code': 'HOOK'}, headers=headers).status_code == 201
+    task = client.post('/api/tasks/', json={'title': 'Task', 'board_id': 1}, headers=headers).get_json()['task']
+    return app, client, headers, task['id']
+
+
+def _subscribe(client, headers, url, **fields):
+    response = client.post('/api/webhooks/', json={'url': url, 'events': [TIME_LOGGED], **fields}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['webhook']['id']
+
+
+def _log_time(client, headers, task_id, count):
+    for _ in range(count):
+        assert client.post(f'/api/tasks/{task_id}/time', json={'spent_hours': 1}, headers=headers).status_code == 200
+
+
+def _statuses(app):
+    with app.app_context():
+        return [event.status for event in WebhookEvent.query.order_by(WebhookEvent.id)]
+
+
+def test_events_delivered_in_batches(outbox, receiver):
+    app, client, headers, task_id = outbox
+    _subscribe(client, headers, f"{receiver['url']}/hook", secret=SECRET)
+    _log_time(client, headers, task_id, 3)
+    assert _statuses(app) == [PENDING] * 3
+
+    assert WebhookDispatcher(app).run_once() == 3
+
+    assert _statuses(app) == [DELIVERED] * 3
+    # Пачки по WEBHOOK_BATCH_SIZE, по порядку событий, с подписью тела
+    events = []
+    for path, request_headers, body in receiver['requests']:
+        assert path == '/hook'
+        assert request_headers['X-Webhook-Signature'] == sign(SECRET, body)
+        events.append([event['id'] for event in json.loads(body)['events']])
+    assert events == [[1, 2], [3]]
+    assert json.loads(receiver['requests'][0][2])['events'][0]['event'] == TIME_LOGGED
+
+    # Доставленные события повторно не отправляются
+    assert WebhookDispatcher(app).run_once() == 0
+    assert len(receiver['requests']) == 2
+
+
+def test_failed_delivery_is_retried(outbox, receiver):
+    app, client, headers, task_id = outbox
+    _subscribe(client, headers, f"{receiver['url']}/hook")
+    _log_time(client, headers, task_id, 1)
+    receiver['failures'].append(500)
+    dispatcher = WebhookDispatcher(app)
+
+    assert dispatcher.run_once() == 0
+    assert _statuses(app) == [PENDING]
+    assert dispatcher.run_once() == 1
+    assert _statuses(app) == [DELIVERED]
+    assert len(receiver['requests']) == 2
+
+
+def test_delivery_gives_up_after_max_attempts(outbox, receiver):
+    app, client, headers, task_id = outbox
+    _subscribe(client, headers, f"{receiver['url']}/hook")
+    _log_time(client, headers, task_id, 1)
+    receiver['failures'].extend([500, 500])
+    dispatcher = WebhookDispatcher(app)
+
+    dispatcher.run_once()
+    dispatcher.run_once()
+    assert _statuses(app) == [FAILED]
+    assert dispatcher.run_once() == 0
+
+
+def test_other_project_not_notified(outbox, receiver):
+    app, client, headers, task_id = outbox
+    other = client.post('/api/projects/', json={'name': 'Other', 'code': 'OTHER'}, headers=headers).get_json()
+    _subscribe(client, headers, f"{receiver['url']}/hook", project_id=other['project']['id'])
+    _log_time(client, headers, task_id, 1)
+
+    assert WebhookDispatcher(app).run_once() == 0
+    assert _statuses(app) == []
+    assert receiver['requests'] == []
+
+
+def test_claimed_events_not_sent_twice(outbox, receiver):
+    app, client, headers, task_id = outbox
+    _subscribe(client, headers, f"{receiver['url']}/hook")
+    _log_time(client, headers, task_id, 2)
+
+    # Второй диспетчер (другой воркер) не берет события, арендованные первым
+    first, second = WebhookDispatcher(app), WebhookDispatcher(app)
+    with app.app_context():
+        rows, _ = first._claim(datetime.utcnow())
+        assert len(rows) == 2
+        assert second._claim(datetime.utcnow())[0] == []
+
+
+@pytest.mark.parametrize('body', [None, [], {'url': 5, 'events': [TIME_LOGGED]},
+                                  {'url': 'http://example.com', 'events': [TIME_LOGGED], 'project_id': 'x'}])
+def test_create_rejects_malformed_body(outbox, body):
+    app, client, headers, task_id = outbox
+    response = client.post('/api/webhooks/', data='null' if body is None else json.dumps(body),
+                           content_type='application/json', headers=headers)
+    assert response.status_code == 400
+
+
+def test_create_requires_existing_project(outbox):
+    app, client, headers, task_id = outbox
+    response = client.post('/api/webhooks/', json={'url': 'http://example.com', 'events': [TIME_LOGGED],
+                                                   'project_id': 999}, headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('body', [None, 'text', [], {}, {'is_active': 'false'}])
+def test_update_rejects_malformed_body(outbox, body):
+    app, client, headers, task_id = outbox
+    webhook_id = _subscribe(client, headers, 'http://example.com/hook')
+
+    if body is None:
+        response = client.put(f'/api/webhooks/{webhook_id}', headers=headers)
+    else:
+        response = client.put(f'/api/webhooks/{webhook_id}', data=json.dumps(body), content_type='application/json',
+                              headers=headers)
+    assert response.status_code == 400
+
+
+def test_update_toggles_webhook(outbox):
+    app, client, headers, task_id = outbox
+    webhook_id = _subscribe(client, headers, 'http://example.com/hook')
+
+    response = client.put(f'/api/webhooks/{webhook_id}', json={'is_active': False}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['webhook']['is_active'] is False